@@ -0,0 +1,41 @@
+"""
+Chunking throughput of lib.rag_chunking.SpanChunker against LangChain's
+RecursiveCharacterTextSplitter on the sample paper.
+
+    python -m bench.bench_chunker [repeat]
+"""
+import sys
+import time
+
+from pypdf import PdfReader
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from bench.bench_pdf_parallel import SAMPLE_PDF
+from lib.rag_chunking import SpanChunker
+
+
+def _throughput(fn, pages, repeat):
+    size = sum(len(page.encode("utf-8")) for page in pages) * repeat
+    chunks = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        chunks += fn(pages)
+    elapsed = time.perf_counter() - start
+    return {"chunks_per_sec": chunks / elapsed, "mb_per_sec": size / elapsed / 1e6}
+
+
+def run(repeat=50, chunk_size=1000, chunk_overlap=100):
+    pages = [page.extract_text() or "" for page in PdfReader(SAMPLE_PDF).pages]
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    chunker = SpanChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    return {
+        "langchain": _throughput(lambda ps: sum(len(splitter.split_text(p)) for p in ps), pages, repeat),
+        "spans": _throughput(lambda ps: sum(1 for _ in chunker.iter_spans(ps)), pages, repeat),
+        "span_documents": _throughput(lambda ps: sum(1 for _ in chunker.iter_documents(ps)), pages, repeat),
+    }
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    for name, result in run(repeat).items():
+        print(f"{name:15}: {result['chunks_per_sec']:10.0f} chunks/s {result['mb_per_sec']:8.2f} MB/s")
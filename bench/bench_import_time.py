@@ -0,0 +1,87 @@
+"""
+Cold import time of the job entry point and the main library modules,
+measured in fresh interpreters with `python -X importtime`.
+
+    python -m bench.bench_import_time [--repeat N] [--budget-ms MS] [module ...]
+
+Prints the median cumulative import time per module and the heaviest
+imports it pulls in. With --budget-ms the exit status is 1 when any module
+goes over budget, so the check can gate CI on start up regressions.
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+MODULES = [
+    "bin.python_elastic_logging",
+    "lib.logger",
+    "lib.elastic_rag",
+    "lib.arxiv_journal",
+    "lib.ingest_pipeline",
+    "core.custom_completions",
+]
+# The entry point builds the logger at import, which needs these set.
+ENV = {"ES_HOST": "http://localhost:9200", "ES_INDEX": "bench-"}
+
+
+def parse_importtime(stderr: str) -> dict:
+    """
+    {module: (self_us, cumulative_us)} from `-X importtime` output.
+    """
+    timings = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def measure(module: str) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env={**os.environ, **ENV}, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def run(modules=None, repeat=5, top=5) -> dict:
+    results = {}
+    for module in modules or MODULES:
+        samples = [measure(module) for _ in range(repeat)]
+        totals = [sample[module][1] / 1000 for sample in samples]
+        heaviest = sorted(samples[-1].items(), key=lambda item: item[1][1], reverse=True)
+        results[module] = {
+            "median_ms": statistics.median(totals),
+            "min_ms": min(totals),
+            "heaviest": [
+                (name, cumulative / 1000) for name, (_, cumulative) in heaviest
+                if name != module and "." not in name
+            ][:top],
+        }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("modules", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    over_budget = False
+    for module, result in run(args.modules, args.repeat).items():
+        print(f"{module:30} {result['median_ms']:8.1f} ms (min {result['min_ms']:.1f})")
+        for name, ms in result["heaviest"]:
+            print(f"    {name:26} {ms:8.1f} ms")
+        if args.budget_ms is not None and result["median_ms"] > args.budget_ms:
+            over_budget = True
+            print(f"    over budget of {args.budget_ms:.0f} ms")
+    sys.exit(1 if over_budget else 0)
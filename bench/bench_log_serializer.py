@@ -0,0 +1,62 @@
+"""
+Records/sec of LogRecordSerializer against the previous `record.__dict__` path.
+
+    python -m bench.bench_log_serializer
+"""
+import json
+import logging
+import socket
+import sys
+import time
+from datetime import datetime
+
+from lib.log_serializer import LogRecordSerializer
+
+
+def _records(n):
+    records = []
+    for i in range(n):
+        record = logging.LogRecord(
+            "app_logger", logging.INFO, __file__, i, "Paper found: %s", (f"title {i}",), None
+        )
+        record.job_id = f"job-{i}"
+        records.append(record)
+    return records
+
+
+def legacy_encode(record, hostname, formatter):
+    # What ElasticsearchHandler.emit used to do per record.
+    formatter.format(record)
+    document = {
+        "@timestamp": datetime.utcnow().isoformat(),
+        "host": hostname,
+        **record.__dict__
+    }
+    return json.dumps(document, default=str).encode("utf-8")
+
+
+def run(n=50000):
+    hostname = socket.gethostname()
+    formatter = logging.Formatter("%(message)s")
+    serializer = LogRecordSerializer(hostname)
+    records = _records(n)
+
+    start = time.perf_counter()
+    for record in records:
+        legacy_encode(record, hostname, formatter)
+    legacy = n / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for record in records:
+        serializer.encode(record)
+    fast = n / (time.perf_counter() - start)
+
+    return {"legacy_records_per_sec": legacy, "serializer_records_per_sec": fast}
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    result = run(n)
+    print(f"legacy     : {result['legacy_records_per_sec']:>12,.0f} records/sec")
+    print(f"serializer : {result['serializer_records_per_sec']:>12,.0f} records/sec")
+    print(f"speedup    : {result['serializer_records_per_sec'] / result['legacy_records_per_sec']:.1f}x")
@@ -0,0 +1,47 @@
+"""
+PDF text extraction throughput with 1..N worker processes.
+
+    python -m bench.bench_pdf_parallel [copies]
+
+The sample paper in local/docs is copied `copies` times to simulate a
+daily batch of papers.
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from lib.pdf_parallel import extract_pages
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "local", "docs", "arxiv_2507.15846.pdf")
+
+
+def run(copies=8, worker_counts=None):
+    cores = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, cores})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(copies):
+            path = os.path.join(tmp, f"paper_{i}.pdf")
+            shutil.copy(SAMPLE_PDF, path)
+            paths.append(path)
+
+        for workers in worker_counts:
+            start = time.perf_counter()
+            pages = extract_pages(paths, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            results.append({"workers": workers, "pages": len(pages), "seconds": elapsed,
+                            "pages_per_sec": len(pages) / elapsed})
+    return results
+
+
+if __name__ == "__main__":
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    results = run(copies)
+    baseline = results[0]["seconds"]
+    print(f"{os.cpu_count()} cores, {copies} papers")
+    for result in results:
+        print(f"workers={result['workers']:<3} {result['pages']:>5} pages  {result['seconds']:6.2f}s  "
+              f"{result['pages_per_sec']:8.1f} pages/sec  speedup {baseline / result['seconds']:.2f}x")
@@ -0,0 +1,196 @@
+"""
+End-to-end throughput benchmarks against local stand-in servers.
+
+    python -m bench.bench_suite [--latency-ms 2] [--output results.json]
+                                [--baseline bench/baseline.json] [--tolerance 0.25]
+                                [--update-baseline] [--only NAME ...] [--repeat 5]
+
+Every scenario talks HTTP to bench.stub_servers (Elasticsearch and the
+OpenAI compatible API) with a fixed workload and `--latency-ms` of
+simulated network latency per request, so results are comparable between
+runs on the same machine. Each metric is the best of `--repeat` runs, which
+is far less sensitive to a noisy host than the mean.
+Results are printed as JSON. When a baseline exists, any metric that
+dropped by more than `--tolerance` is reported and the exit status is 1.
+`--update-baseline` stores the current results; baselines are only
+meaningful on the machine that recorded them.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import uuid
+
+from bench.stub_servers import ElasticsearchStub, OpenAIStub
+from config.config import Config
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+WORDS = (
+    "retrieval augmented generation indexes chunks of research papers and answers "
+    "questions with the most similar passages as context for the language model"
+).split()
+
+
+def _texts(count: int, words: int = 60):
+    return [
+        " ".join(WORDS[(i + j) % len(WORDS)] for j in range(words)) + f" #{i}"
+        for i in range(count)
+    ]
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds else 0.0
+
+
+def bench_handler(es_url: str, records: int = 2000, async_shipping: bool = False) -> float:
+    from lib.logger import ElasticsearchHandler
+
+    handler = ElasticsearchHandler(
+        hosts=[es_url], index="bench-logs-", async_shipping=async_shipping,
+        shipper_options={"max_queue_size": records, "flush_interval": 0.05},
+    )
+    logger = logging.Logger(f"bench.handler.{async_shipping}")
+    logger.addHandler(handler)
+    started_at = time.perf_counter()
+    for i in range(records):
+        logger.info("benchmark record %d", i, extra={"job_id": "bench"})
+    handler.flush()
+    elapsed = time.perf_counter() - started_at
+    handler.close()
+    return _rate(records, elapsed)
+
+
+def _embeddings(api_url: str):
+    from core.custom_embeddings import NewEmbeddings
+
+    return NewEmbeddings(base_url=api_url, api_key="bench", model="stub", batch_size=64, max_concurrency=4)
+
+
+def _llm(api_url: str):
+    from core.custom_completions import NewGPT
+
+    return NewGPT(base_url=api_url, api_key="bench", model="stub", max_retries=0)
+
+
+def bench_embeddings(api_url: str, texts: int = 2048) -> float:
+    embeddings = _embeddings(api_url)
+    inputs = _texts(texts)
+    started_at = time.perf_counter()
+    embeddings.embed_documents(inputs)
+    elapsed = time.perf_counter() - started_at
+    embeddings.close()
+    return _rate(texts, elapsed)
+
+
+def bench_completions(api_url: str, calls: int = 200) -> dict:
+    from langchain_core.messages import HumanMessage
+    from core.batch_executor import BatchExecutor
+
+    llm = _llm(api_url)
+    prompts = [[HumanMessage(content=text)] for text in _texts(calls, words=20)]
+
+    started_at = time.perf_counter()
+    for prompt in prompts:
+        llm.invoke(prompt)
+    sequential = _rate(calls, time.perf_counter() - started_at)
+
+    started_at = time.perf_counter()
+    results = BatchExecutor(max_in_flight=8).invoke_all(llm, prompts)
+    batched = _rate(sum(result.ok for result in results), time.perf_counter() - started_at)
+    return {"newgpt_calls_per_sec": sequential, "newgpt_batched_calls_per_sec": batched}
+
+
+def bench_rag(es_url: str, api_url: str, documents: int = 200, questions: int = 20) -> dict:
+    from lib.elastic_rag import ElasticRAG
+
+    # A fresh index per run, re-ingesting would only skip known chunks.
+    os.environ.update({"ES_HOST": es_url, "RAG_INDEX": f"bench-rag-{uuid.uuid4().hex[:8]}"})
+    Config.load(reload=True)
+    rag = ElasticRAG("bench", "bench", _embeddings(api_url), _llm(api_url))
+
+    report = rag.ingest_documents(_texts(documents, words=200))
+    asked = [f"What does paper {i} say about retrieval?" for i in range(questions)]
+    started_at = time.perf_counter()
+    batch = rag.query_many(asked)
+    elapsed = time.perf_counter() - started_at
+    if any(result.error for result in batch.results):
+        raise RuntimeError(f"query failed: {batch.results[0].error}")
+    return {
+        "rag_ingest_chunks_per_sec": report.chunks_per_sec,
+        "rag_query_questions_per_sec": _rate(questions, elapsed),
+    }
+
+
+def run(latency: float = 0.002, only=None, repeat: int = 3) -> dict:
+    """
+    Best of `repeat` runs of every scenario, per metric.
+    """
+    samples = {}
+    with ElasticsearchStub(latency) as es, OpenAIStub(latency) as api:
+        scenarios = {
+            "handler_sync": lambda: {"handler_sync_records_per_sec": bench_handler(es.url, 500)},
+            "handler_async": lambda: {"handler_async_records_per_sec": bench_handler(es.url, 5000, True)},
+            "embeddings": lambda: {"embeddings_texts_per_sec": bench_embeddings(api.url)},
+            "completions": lambda: bench_completions(api.url),
+            "rag": lambda: bench_rag(es.url, api.url),
+        }
+        for name, scenario in scenarios.items():
+            if only and name not in only:
+                continue
+            for _ in range(repeat):
+                for metric, value in scenario().items():
+                    samples.setdefault(metric, []).append(value)
+    return {metric: max(values) for metric, values in samples.items()}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Metrics (all higher-is-better rates) that fell more than `tolerance`
+    below the baseline, as (metric, baseline, current) tuples.
+    """
+    regressions = []
+    for metric, expected in baseline.get("metrics", {}).items():
+        current = results.get(metric)
+        if current is not None and current < expected * (1 - tolerance):
+            regressions.append((metric, expected, current))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=2.0)
+    parser.add_argument("--output")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--only", nargs="*")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    logging.getLogger("elastic_transport").setLevel(logging.WARNING)
+    results = run(args.latency_ms / 1000, args.only, args.repeat)
+    document = {"latency_ms": args.latency_ms, "metrics": results}
+    print(json.dumps(document, indent=2, sort_keys=True))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(document, f, indent=2, sort_keys=True)
+            f.write("\n")
+        sys.exit(0)
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("latency_ms") != args.latency_ms:
+            print(f"baseline was recorded at {baseline.get('latency_ms')} ms latency, not comparing", file=sys.stderr)
+            sys.exit(0)
+        regressions = compare(results, baseline, args.tolerance)
+        for metric, expected, current in regressions:
+            print(f"REGRESSION {metric}: {current:.1f} < {expected:.1f} (-{1 - current / expected:.0%})", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
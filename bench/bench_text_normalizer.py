@@ -0,0 +1,47 @@
+"""
+MB/s of lib.text_normalizer against the previous ArxivClient.clean_text.
+
+    python -m bench.bench_text_normalizer [repeat]
+"""
+import re
+import sys
+import time
+import unicodedata
+
+from pypdf import PdfReader
+
+from bench.bench_pdf_parallel import SAMPLE_PDF
+from lib.text_normalizer import normalize_text, normalize_texts
+
+
+def legacy_clean_text(text: str) -> str:
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(ch for ch in text if ch.isprintable())
+    text = re.sub(r'[^\w\s.,;:?!\'\"-]', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def _throughput(fn, pages, repeat):
+    size = sum(len(page.encode("utf-8")) for page in pages) * repeat
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(pages)
+    return size / (time.perf_counter() - start) / 1e6
+
+
+def run(repeat=20):
+    pages = [page.extract_text() or "" for page in PdfReader(SAMPLE_PDF).pages]
+    assert [legacy_clean_text(p) for p in pages] == list(normalize_texts(pages))
+    return {
+        "legacy_mb_per_sec": _throughput(lambda ps: [legacy_clean_text(p) for p in ps], pages, repeat),
+        "normalizer_mb_per_sec": _throughput(lambda ps: [normalize_text(p) for p in ps], pages, repeat),
+    }
+
+
+if __name__ == "__main__":
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    result = run(repeat)
+    print(f"legacy     : {result['legacy_mb_per_sec']:8.2f} MB/s")
+    print(f"normalizer : {result['normalizer_mb_per_sec']:8.2f} MB/s")
+    print(f"speedup    : {result['normalizer_mb_per_sec'] / result['legacy_mb_per_sec']:.1f}x")
@@ -0,0 +1,228 @@
+"""
+Local stand-ins for Elasticsearch and the OpenAI compatible API, for
+benchmarks. Both answer just enough of the protocol for the clients in this
+repo and sleep `latency` seconds per request to simulate the network.
+
+    with ElasticsearchStub(latency=0.002) as es, OpenAIStub(dims=64) as api:
+        Elasticsearch([es.url]) ...
+        NewEmbeddings(base_url=api.url, ...) ...
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import orjson
+
+_ES_HEADERS = {
+    "X-Elastic-Product": "Elasticsearch",
+    "Content-Type": "application/vnd.elasticsearch+json; compatible-with=8",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this, Nagle and
+    # delayed ACKs add ~40ms to every keep-alive request.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send(self, status: int, payload=None, headers=None):
+        body = b"" if payload is None else orjson.dumps(payload)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _dispatch(self):
+        server = self.server
+        body = self._body()
+        with server.lock:
+            server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        server.stub.handle(self, body)
+
+    do_GET = do_POST = do_PUT = do_HEAD = do_DELETE = _dispatch
+
+
+class _StubServer:
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._server.latency = self.latency
+        self._server.lock = threading.Lock()
+        self._server.requests = 0
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def handle(self, request: _Handler, body: bytes):
+        raise NotImplementedError
+
+
+class ElasticsearchStub(_StubServer):
+    """
+    Single node Elasticsearch: index, _bulk, _mget, _search, _msearch,
+    index creation and templates. Documents are kept in memory and searches
+    return the first `size` documents of the index.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        super().__init__(latency)
+        self.indices = {}
+        self._lock = threading.Lock()
+        self._ids = 0
+
+    def _next_id(self) -> str:
+        with self._lock:
+            self._ids += 1
+            return str(self._ids)
+
+    def _store(self, index: str, doc_id, source: dict) -> str:
+        doc_id = doc_id or self._next_id()
+        with self._lock:
+            self.indices.setdefault(index, {})[doc_id] = source
+        return doc_id
+
+    def _bulk(self, body: bytes, default_index=None) -> dict:
+        lines = [line for line in body.split(b"\n") if line.strip()]
+        items = []
+        for action_line, source_line in zip(lines[::2], lines[1::2]):
+            op, meta = next(iter(orjson.loads(action_line).items()))
+            index = meta.get("_index", default_index)
+            doc_id = self._store(index, meta.get("_id"), orjson.loads(source_line))
+            items.append({op: {"_index": index, "_id": doc_id, "status": 201, "result": "created"}})
+        return {"took": 1, "errors": False, "items": items}
+
+    def _hits(self, index: str, query: dict) -> dict:
+        size = query.get("size", 10)
+        with self._lock:
+            docs = list(self.indices.get(index, {}).items())[:size]
+        hits = [{"_index": index, "_id": doc_id, "_score": 1.0, "_source": source} for doc_id, source in docs]
+        return {"took": 1, "timed_out": False, "hits": {"total": {"value": len(hits), "relation": "eq"}, "hits": hits}}
+
+    def handle(self, request: _Handler, body: bytes):
+        path = request.path.split("?", 1)[0]
+        parts = [p for p in path.split("/") if p]
+        method = request.command
+
+        if not parts:
+            return request._send(200, {"version": {"number": "8.19.0"}, "tagline": "You Know, for Search"}, _ES_HEADERS)
+        if parts[-1] == "_bulk":
+            return request._send(200, self._bulk(body, parts[0] if len(parts) > 1 else None), _ES_HEADERS)
+        if parts[-1] == "_msearch":
+            lines = [orjson.loads(line) for line in body.split(b"\n") if line.strip()]
+            responses = [
+                {**self._hits(header.get("index", parts[0]), query), "status": 200}
+                for header, query in zip(lines[::2], lines[1::2])
+            ]
+            return request._send(200, {"took": 1, "responses": responses}, _ES_HEADERS)
+        if parts[-1] == "_search":
+            return request._send(200, self._hits(parts[0], orjson.loads(body or b"{}")), _ES_HEADERS)
+        if parts[-1] == "_mget":
+            ids = orjson.loads(body).get("ids", [])
+            with self._lock:
+                stored = self.indices.get(parts[0], {})
+                docs = [{"_index": parts[0], "_id": i, "found": i in stored} for i in ids]
+            return request._send(200, {"docs": docs}, _ES_HEADERS)
+        if parts[-1] == "_refresh":
+            return request._send(200, {"_shards": {"total": 1, "successful": 1, "failed": 0}}, _ES_HEADERS)
+        if parts[0] == "_index_template":
+            return request._send(200, {"acknowledged": True}, _ES_HEADERS)
+        if len(parts) >= 2 and parts[1] in ("_doc", "_create"):
+            doc_id = self._store(parts[0], parts[2] if len(parts) > 2 else None, orjson.loads(body))
+            return request._send(201, {"_index": parts[0], "_id": doc_id, "result": "created"}, _ES_HEADERS)
+        if len(parts) == 1:
+            if method == "HEAD":
+                return request._send(200 if parts[0] in self.indices else 404, None, _ES_HEADERS)
+            if method == "PUT":
+                with self._lock:
+                    self.indices.setdefault(parts[0], {})
+                return request._send(200, {"acknowledged": True, "index": parts[0]}, _ES_HEADERS)
+        return request._send(404, {"error": f"unsupported: {method} {path}", "status": 404}, _ES_HEADERS)
+
+
+class OpenAIStub(_StubServer):
+    """
+    `/v1/embeddings` with deterministic vectors of `dims` dimensions and
+    `/v1/chat/completions` answering with a fixed sentence.
+    """
+
+    def __init__(self, latency: float = 0.0, dims: int = 64, answer: str = "A stub answer."):
+        super().__init__(latency)
+        self.dims = dims
+        self.answer = answer
+
+    def _vector(self, text: str):
+        digest = hashlib.sha256(text.encode("utf-8")).digest()
+        return [(digest[i % len(digest)] - 128) / 128.0 for i in range(self.dims)]
+
+    def handle(self, request: _Handler, body: bytes):
+        path = request.path.split("?", 1)[0]
+        headers = {"Content-Type": "application/json"}
+        if path.endswith("/v1/embeddings"):
+            inputs = orjson.loads(body)["input"]
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            data = [{"object": "embedding", "index": i, "embedding": self._vector(text)} for i, text in enumerate(inputs)]
+            return request._send(200, {"object": "list", "data": data}, headers)
+        if path.endswith("/v1/chat/completions"):
+            payload = orjson.loads(body)
+            if payload.get("stream"):
+                return self._stream(request)
+            return request._send(200, {
+                "id": "stub", "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": self.answer}}],
+            }, headers)
+        return request._send(404, {"error": {"message": f"unsupported: {path}"}}, headers)
+
+    def _stream(self, request: _Handler):
+        events = [
+            "data: " + json.dumps({"choices": [{"index": 0, "delta": {"content": word + " "}}]})
+            for word in re.findall(r"\S+", self.answer)
+        ] + ["data: [DONE]"]
+        body = ("\n\n".join(events) + "\n\n").encode()
+        request.send_response(200)
+        request.send_header("Content-Type", "text/event-stream")
+        request.send_header("Content-Length", str(len(body)))
+        request.end_headers()
+        request.wfile.write(body)
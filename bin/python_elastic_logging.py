@@ -1,109 +1,231 @@
+import os
 import uuid
-from langchain_core.messages import SystemMessage, HumanMessage
-from config.config import Config
-from lib.logger import get_logger
-from core import custom_completions
 import schedule
 import time
-from lib.arxiv_journal import ArxivClient
-from lib.hface import HuggingFaceClient
 from datetime import date
-from langchain.document_loaders import PyPDFLoader
-from core.custom_completions import NewGPT
-from core.custom_embeddings import NewEmbeddings
-from lib.elastic_rag import ElasticRAG
-import os
-from lib.pdf_loader import pdf_loader
-from lib.rag_chunking import chunk_documents
+from config.config import Config
+from lib import tracing
+from lib.logger import get_logger
+from lib.pipeline_orchestrator import exclusive
+
+# Heavy dependencies (LangChain, arxiv, PDF parsers, HTTP clients) are
+# imported inside job(), keeping start up cheap for the scheduler loop.
 
+settings = Config.load()
 logger = get_logger()
 
+@exclusive(settings.job_lock_path)
 def job():
-    logger.info("Job started", extra={"job_id": str(uuid.uuid4())})
-    arxiv_client = ArxivClient()
-    hface_client = HuggingFaceClient()
+    from langchain_core.messages import SystemMessage, HumanMessage
+    from core.batch_executor import BatchExecutor, RateLimiter
+    from core.completion_cache import CompletionCache
+    from core.custom_completions import NewGPT
+    from core.custom_embeddings import NewEmbeddings
+    from core.embedding_cache import CachedEmbeddings
+    from lib.arxiv_journal import ArxivClient
+    from lib.elastic_rag import ElasticRAG
+    from lib.hface import HuggingFaceClient
+    from lib.ingest_pipeline import ingest_pdf
+    from lib.pipeline_orchestrator import CheckpointStore, Orchestrator, PaperTask, Stage
+
+    run_id = str(uuid.uuid4())
+    if settings.tracing_enabled:
+        tracing.reset()
+        tracing.enable()
+    logger.info("Job started", extra={"job_id": run_id})
+    arxiv_client = ArxivClient(max_downloads=settings.download_concurrency)
+    hface_client = HuggingFaceClient(cache_dir=settings.hf_cache_dir)
     embedding_model = NewEmbeddings(
-        base_url=os.getenv("OPENAI_BASE_URL"),
-        api_key=os.getenv("OPENAI_RAG_API_SECRET"),
-        model=os.getenv("EMBEDDING_MODEL"),
+        base_url=settings.openai_base_url,
+        api_key=settings.openai_rag_api_secret,
+        model=settings.embedding_model,
+        batch_size=settings.embedding_batch_size,
+        max_concurrency=settings.embedding_concurrency,
     )
+    if settings.embedding_cache_dir:
+        embedding_model = CachedEmbeddings(
+            embedding_model,
+            settings.embedding_cache_dir,
+            max_entries=settings.embedding_cache_max_entries,
+        )
     llm = NewGPT(
-        base_url=os.getenv("OPENAI_BASE_URL"),
-        api_key=os.getenv("OPENAI_RAG_API_SECRET"),
-        model=os.getenv("OPENAI_CHAT_MODEL"),
+        base_url=settings.openai_base_url,
+        api_key=settings.openai_rag_api_secret,
+        model=settings.openai_chat_model,
+        timeout=settings.openai_timeout,
+        max_retries=settings.openai_max_retries,
+        response_cache=(
+            CompletionCache(settings.completion_cache_path, ttl=settings.completion_cache_ttl)
+            if settings.completion_cache_path else None
+        ),
+    )
+    question_executor = BatchExecutor(
+        max_in_flight=settings.llm_max_in_flight,
+        rate_limiter=RateLimiter(
+            requests_per_minute=settings.llm_requests_per_minute or None,
+            tokens_per_minute=settings.llm_tokens_per_minute or None,
+        ),
+    )
+    vector_store = None
+    if settings.vector_store_mode:
+        from lib.vector_store import NumpyVectorStore
+        vector_store = NumpyVectorStore(
+            settings.vector_store_path, max_entries=settings.vector_store_max_entries or None
+        )
+    answer_cache = None
+    if settings.answer_cache_enabled:
+        from lib.answer_cache import SemanticAnswerCache
+        answer_cache = SemanticAnswerCache(
+            settings.answer_cache_path, threshold=settings.answer_cache_threshold,
+            max_entries=settings.answer_cache_max_entries, model=settings.openai_chat_model,
+        )
+    elastic_rag = ElasticRAG(
+        settings.es_username, settings.es_password, embedding_model, llm,
+        batch_size=settings.rag_batch_size,
+        vector_store=vector_store,
+        vector_store_mode=settings.vector_store_mode or "cache",
+        local_min_score=settings.vector_store_min_score,
+        answer_cache=answer_cache,
+    )
+    download_path = settings.download_path
+    # One process pool for the whole run, shared by all papers and their pages.
+    pdf_executor = None
+    if settings.pdf_parse_workers:
+        from concurrent.futures import ProcessPoolExecutor
+        pdf_executor = ProcessPoolExecutor(max_workers=settings.pdf_parse_workers)
+
+    def download_stage(task):
+        return arxiv_client.download_file(task.paper['id'], task.paper['pdf_url'], download_path)
+
+    def ingest_stage(task):
+        # Pages are parsed, chunked and indexed in micro-batches as they
+        # stream in; only the chunk texts are kept for question generation.
+        chunk_texts = []
+        report = ingest_pdf(
+            task.results["download"], elastic_rag,
+            on_chunk=lambda chunk: chunk_texts.append(chunk.page_content),
+            executor=pdf_executor,
+        )
+        logger.info(
+            f"Ingested {report.indexed} chunks, skipped {report.skipped}, failed {report.failed} "
+            f"({report.chunks_per_sec:.1f} chunks/sec)",
+            extra={"job_id": str(uuid.uuid4())}
+        )
+        for error in report.errors:
+            logger.error(f"Ingestion error: {error}", extra={"job_id": str(uuid.uuid4())})
+        if report.failed:
+            # Not checkpointed: the next run retries, known chunks are skipped.
+            raise RuntimeError(f"{report.failed} of {report.chunks} chunks failed to ingest")
+        return chunk_texts
+
+    def questions_stage(task):
+        prompts = [
+            [
+                SystemMessage(
+                    content=(
+                        "You are a helpful assistant. Based on the context provided, "
+                        "generate a clear, insightful, and easy-to-understand question "
+                        "that relates closely to the key information in the text. "
+                        "Provide the question in plain text only—no styling, formatting, or markdown."
+                    )
+                ),
+                HumanMessage(
+                    content=f"Context:\n{chunk}\n\nPlease generate a relevant question based on the above context."),
+            ]
+            for chunk in task.results["ingest"]
+        ]
+        questions = []
+        for result in question_executor.invoke_all(llm, prompts):
+            if result.ok:
+                questions.append(result.value.content)
+            else:
+                logger.error(f"Question generation failed: {result.error}", extra={"job_id": str(uuid.uuid4())})
+
+        unique_questions = llm.invoke(
+            [
+                SystemMessage(
+                    content=(
+                        "You are a helpful assistant. Based on the list of questions provided, "
+                        "generate 5 short and simple questions that together form a logical flow, starting with an introduction, "
+                        "then moving to more detailed aspects, and finally concluding, as if explaining the topic in an article. "
+                        "Ensure each question is clear, insightful, and in plain text only—no styling, formatting, or markdown. "
+                        "Return the questions as a comma separated list of strings."
+                    )
+                ),
+                HumanMessage(
+                    content=f"Questions:\n{questions}\n\nPlease generate 5 logically ordered questions (introduction, details, conclusion) based on the above questions."
+                ),
+            ]
+        )
+        return unique_questions.content.split(",")
+
+    def query_stage(task):
+        answers = elastic_rag.query_many(task.results["questions"])
+        for result in answers.results:
+            if result.error:
+                logger.error(f"Question: {result.question} | Error: {result.error}", extra={"job_id": str(uuid.uuid4())})
+            else:
+                logger.info(f"Question: {result.question} | Answer: {result.answer}", extra={"job_id": str(uuid.uuid4())})
+        logger.info(f"Query stage timings: {answers.timings}", extra={"job_id": str(uuid.uuid4())})
+        return [{"question": r.question, "answer": r.answer, "error": r.error} for r in answers.results]
+
+    orchestrator = Orchestrator(
+        [
+            Stage("download", download_stage, workers=settings.download_concurrency, still_valid=os.path.isfile),
+            Stage("ingest", ingest_stage, workers=settings.ingest_concurrency),
+            Stage("questions", questions_stage, workers=settings.question_concurrency),
+            Stage("query", query_stage, workers=settings.query_concurrency),
+        ],
+        checkpoints=CheckpointStore(settings.checkpoint_path),
+        queue_size=settings.stage_queue_size,
     )
-    elastic_rag = ElasticRAG(Config.get("ES_USERNAME"), Config.get("ES_PASSWORD"),embedding_model, llm)
     try:
         today_date_str = date.today().strftime("%Y-%m-%d")
 
         research_papers = hface_client.get_research_papers(today_date_str)
         for res_paper in research_papers:
             logger.info(f"Paper found: {res_paper.get('title', 'No title')}", extra={"job_id": str(uuid.uuid4())})
-            paper = arxiv_client.get_paper_by_id(res_paper['paper']['id'])
-            arxiv_client.download_file(paper['id'], paper['pdf_url'], Config.get("DOWNLOAD_PATH", "local/docs/"))
-
-            pages = pdf_loader(Config.get("DOWNLOAD_PATH", "local/docs/") + f"{paper['id']}.pdf")
-            chunks = chunk_documents(pages)
-
-            chunk_texts = []
-            questions = []
-            for chunk in chunks:
-                question = llm.invoke(
-                    [
-                        SystemMessage(
-                            content=(
-                                "You are a helpful assistant. Based on the context provided, "
-                                "generate a clear, insightful, and easy-to-understand question "
-                                "that relates closely to the key information in the text. "
-                                "Provide the question in plain text only—no styling, formatting, or markdown."
-                            )
-                        ),
-                        HumanMessage(
-                            content=f"Context:\n{chunk}\n\nPlease generate a relevant question based on the above context."),
-                    ]
-                )
-                questions.append(question.content)
-                chunk_texts.append(chunk.page_content)
-
-
-            unique_questions = llm.invoke(
-                [
-                    SystemMessage(
-                        content=(
-                            "You are a helpful assistant. Based on the list of questions provided, "
-                            "generate 5 short and simple questions that together form a logical flow, starting with an introduction, "
-                            "then moving to more detailed aspects, and finally concluding, as if explaining the topic in an article. "
-                            "Ensure each question is clear, insightful, and in plain text only—no styling, formatting, or markdown. "
-                            "Return the questions as a comma separated list of strings."
-                        )
-                    ),
-                    HumanMessage(
-                        content=f"Questions:\n{questions}\n\nPlease generate 5 logically ordered questions (introduction, details, conclusion) based on the above questions."
-                    ),
-                ]
-            )
-
-            elastic_rag.ingest_documents(chunk_texts)
-
-            ques = unique_questions.content.split(",")
-
-            for q in ques:
-                answer = elastic_rag.query(q)
-                logger.info(f"Question: {q} | Answer: {answer}", extra={"job_id": str(uuid.uuid4())})
-                a = 10
-
 
+        # One arXiv query for all papers; each then runs through the stages.
+        papers = arxiv_client.get_papers_by_ids([res_paper['paper']['id'] for res_paper in research_papers])
+        report = orchestrator.run(PaperTask(paper['id'], paper) for paper in papers.values())
+        for paper_id, (stage, error) in report.failed.items():
+            logger.error(f"Paper {paper_id} failed in {stage}: {error}", extra={"job_id": str(uuid.uuid4())})
+        logger.info(
+            f"Completed {len(report.completed)} papers, failed {len(report.failed)}, "
+            f"skipped stages {report.skipped}, stage seconds {report.stage_seconds}",
+            extra={"job_id": str(uuid.uuid4())}
+        )
     except Exception as e:
         logger.error(f"Error fetching paper: {e}", extra={"job_id": str(uuid.uuid4())})
+    finally:
+        orchestrator.checkpoints.close()
+        question_executor.run(llm.aclose())
+        question_executor.close()
+        if pdf_executor is not None:
+            pdf_executor.shutdown()
+        if vector_store is not None:
+            vector_store.close()
+        if answer_cache is not None:
+            logger.info(f"Answer cache: {answer_cache.stats()}", extra={"job_id": run_id})
+            answer_cache.close()
+    if settings.tracing_enabled:
+        # One summary per run; shipped as a single metrics document.
+        logger.info(tracing.format_summary(), extra={"job_id": run_id})
+        if settings.tracing_ship:
+            tracing.ship(logger, job_id=run_id)
     logger.info("Job finished")
 
 
 if __name__ == '__main__':
-    x = 1  # Replace with your desired interval in minutes
+    x = settings.job_interval_minutes  # 0 runs the job once
     job()
 
-    # schedule.every(x).minutes.do(job)
-    #
-    # while True:
-    #     schedule.run_pending()
-    #     time.sleep(1)
\ No newline at end of file
+    if x:
+        # job() is exclusive: a tick that fires while a run is still going
+        # (or while another process holds JOB_LOCK_PATH) is skipped.
+        schedule.every(x).minutes.do(job)
+
+        while True:
+            schedule.run_pending()
+            time.sleep(1)
@@ -1,23 +1,131 @@
 import os
-from dotenv import load_dotenv
+import threading
+from dataclasses import dataclass, field, fields
+from types import MappingProxyType
+from typing import Mapping, Optional
+
+
+@dataclass(frozen=True)
+class Settings:
+    """
+    Immutable, typed snapshot of the configuration. Each field is read from
+    the environment variable of the same name in upper case.
+    """
+    es_host: Optional[str] = None
+    es_index: Optional[str] = None
+    es_username: Optional[str] = None
+    es_password: Optional[str] = None
+    es_manage_template: bool = False
+    es_spool_dir: Optional[str] = None
+    es_spool_max_bytes: int = 256 * 1024 * 1024
+    es_async_shipping: bool = False
+    es_queue_size: int = 10000
+    es_bulk_size: int = 500
+    es_bulk_bytes: int = 5 * 1024 * 1024
+    es_flush_interval: float = 1.0
+    es_queue_overflow: str = "drop_oldest"
+
+    rag_index: Optional[str] = None
+    rag_batch_size: int = 128
+    # "cache" or "standalone" puts a NumpyVectorStore in front of / instead of Elasticsearch.
+    vector_store_mode: Optional[str] = None
+    vector_store_path: Optional[str] = None
+    vector_store_max_entries: int = 0
+    vector_store_min_score: float = 0.8
+    answer_cache_enabled: bool = False
+    answer_cache_path: Optional[str] = None
+    answer_cache_threshold: float = 0.95
+    answer_cache_max_entries: int = 10000
+    openai_base_url: Optional[str] = None
+    openai_rag_api_secret: Optional[str] = None
+    openai_chat_model: Optional[str] = None
+    openai_timeout: float = 60.0
+    openai_max_retries: int = 3
+    embedding_model: Optional[str] = None
+    embedding_batch_size: int = 64
+    embedding_concurrency: int = 4
+    embedding_cache_dir: Optional[str] = None
+    embedding_cache_max_entries: int = 200000
+    completion_cache_path: Optional[str] = None
+    completion_cache_ttl: int = 7 * 24 * 60 * 60
+    llm_max_in_flight: int = 8
+    llm_requests_per_minute: int = 0
+    llm_tokens_per_minute: int = 0
+
+    hugging_face_read_only_token: Optional[str] = None
+    hf_cache_dir: Optional[str] = None
+    download_path: str = "local/docs/"
+    download_concurrency: int = 4
+    pdf_parse_workers: int = 0
+    ingest_concurrency: int = 1
+    question_concurrency: int = 2
+    query_concurrency: int = 2
+    stage_queue_size: int = 4
+    checkpoint_path: str = "local/checkpoints.db"
+    job_lock_path: Optional[str] = None
+    job_interval_minutes: int = 0
+    tracing_enabled: bool = False
+    tracing_ship: bool = False
+
+    # Every variable, for keys without a typed field.
+    env: Mapping[str, str] = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_env(cls, env: Mapping[str, str]) -> "Settings":
+        values = {}
+        for f in fields(cls):
+            raw = env.get(f.name.upper())
+            if f.name == "env" or raw is None:
+                continue
+            if f.type is bool:
+                values[f.name] = _to_bool(raw)
+            elif f.type in (int, float):
+                try:
+                    values[f.name] = f.type(raw)
+                except ValueError:
+                    pass
+            else:
+                values[f.name] = raw
+        return cls(env=MappingProxyType(dict(env)), **values)
+
+
+def _to_bool(val: str) -> bool:
+    return val.lower() in ["1", "true", "yes"]
 
-load_dotenv()  # Loads values from .env into os.environ
 
 class Config:
-    @staticmethod
-    def get(key: str, default=None):
-        return os.getenv(key, default)
+    _settings: Optional[Settings] = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def load(cls, reload: bool = False) -> Settings:
+        """
+        The configuration snapshot. `.env` is read into os.environ and the
+        snapshot taken on first use; later calls return the same object
+        until `reload=True`.
+        """
+        if cls._settings is None or reload:
+            with cls._lock:
+                if cls._settings is None or reload:
+                    from dotenv import load_dotenv
+                    load_dotenv()  # Loads values from .env into os.environ
+                    cls._settings = Settings.from_env(os.environ)
+        return cls._settings
 
-    @staticmethod
-    def get_bool(key: str, default=False):
-        val = os.getenv(key)
+    @classmethod
+    def get(cls, key: str, default=None):
+        return cls.load().env.get(key, default)
+
+    @classmethod
+    def get_bool(cls, key: str, default=False):
+        val = cls.load().env.get(key)
         if val is None:
             return default
-        return val.lower() in ["1", "true", "yes"]
+        return _to_bool(val)
 
-    @staticmethod
-    def get_int(key: str, default=0):
+    @classmethod
+    def get_int(cls, key: str, default=0):
         try:
-            return int(os.getenv(key, default))
+            return int(cls.load().env.get(key, default))
         except ValueError:
-            return default
\ No newline at end of file
+            return default
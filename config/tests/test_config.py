@@ -0,0 +1,52 @@
+import dataclasses
+import unittest
+from unittest.mock import patch
+
+from config.config import Config, Settings
+
+
+class TestSettings(unittest.TestCase):
+
+    def test_typed_fields_are_parsed_from_env(self):
+        settings = Settings.from_env({
+            "ES_HOST": "http://es:9200",
+            "ES_BULK_SIZE": "250",
+            "ES_FLUSH_INTERVAL": "0.5",
+            "ES_ASYNC_SHIPPING": "yes",
+            "RAG_BATCH_SIZE": "not a number",
+            "SOMETHING_ELSE": "x",
+        })
+        self.assertEqual(settings.es_host, "http://es:9200")
+        self.assertEqual(settings.es_bulk_size, 250)
+        self.assertEqual(settings.es_flush_interval, 0.5)
+        self.assertTrue(settings.es_async_shipping)
+        self.assertEqual(settings.rag_batch_size, 128)
+        self.assertEqual(settings.env["SOMETHING_ELSE"], "x")
+
+    def test_snapshot_is_immutable(self):
+        settings = Settings.from_env({"ES_HOST": "http://es:9200"})
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            settings.es_host = "other"
+        with self.assertRaises(TypeError):
+            settings.env["ES_HOST"] = "other"
+
+
+class TestConfig(unittest.TestCase):
+
+    def tearDown(self):
+        Config.load(reload=True)
+
+    def test_env_is_read_once_until_reload(self):
+        with patch.dict("os.environ", {"CONFIG_TEST_KEY": "1"}):
+            Config.load(reload=True)
+            self.assertEqual(Config.get_int("CONFIG_TEST_KEY"), 1)
+            with patch.dict("os.environ", {"CONFIG_TEST_KEY": "2"}):
+                self.assertIs(Config.load(), Config.load())
+                self.assertEqual(Config.get("CONFIG_TEST_KEY"), "1")
+                Config.load(reload=True)
+                self.assertEqual(Config.get("CONFIG_TEST_KEY"), "2")
+        self.assertFalse(Config.get_bool("MISSING_KEY"))
+
+
+if __name__ == "__main__":
+    unittest.main()
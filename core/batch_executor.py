@@ -0,0 +1,169 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, List, NamedTuple, Optional
+
+
+def estimate_tokens(item: Any) -> int:
+    """
+    Rough token count (~4 characters per token) used for rate limiting.
+    """
+    if isinstance(item, (list, tuple)):
+        return sum(estimate_tokens(part) for part in item)
+    content = getattr(item, "content", item)
+    return max(1, len(str(content)) // 4)
+
+
+class _TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def wait_time(self, amount: float) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float):
+        self.tokens -= min(amount, self.capacity)
+
+
+class RateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute limits as token buckets.
+    Either limit may be None to disable it.
+    """
+
+    def __init__(self, requests_per_minute: Optional[float] = None, tokens_per_minute: Optional[float] = None):
+        self._requests = _TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = _TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._lock = None
+        self._lock_loop = None
+        # Guards the buckets themselves, which loops in other threads may share.
+        self._buckets_lock = threading.Lock()
+
+    def _loop_lock(self) -> asyncio.Lock:
+        # asyncio locks are bound to one event loop; the limiter may outlive it.
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    async def acquire(self, tokens: int = 0):
+        async with self._loop_lock():
+            while True:
+                with self._buckets_lock:
+                    wait = 0.0
+                    if self._requests is not None:
+                        wait = max(wait, self._requests.wait_time(1))
+                    if self._tokens is not None:
+                        wait = max(wait, self._tokens.wait_time(tokens))
+                    if wait <= 0:
+                        if self._requests is not None:
+                            self._requests.take(1)
+                        if self._tokens is not None:
+                            self._tokens.take(tokens)
+                        return
+                await asyncio.sleep(wait)
+
+
+class BatchItemResult(NamedTuple):
+    value: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class BatchExecutor:
+    """
+    Runs one async call per item with at most `max_in_flight` running at
+    once. Results come back in input order; a failing item is returned as a
+    `BatchItemResult` with `error` set instead of failing the batch.
+
+    `map` and `invoke_all` run on one long-lived event loop in a background
+    thread, so loop-bound resources such as pooled async HTTP clients are
+    reused across calls instead of being recreated for every batch. The
+    `max_in_flight` limit is shared by every batch on that loop, so several
+    threads calling `map` at once still stay within it.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 8,
+        rate_limiter: Optional[RateLimiter] = None,
+        token_estimator: Callable[[Any], int] = estimate_tokens,
+    ):
+        self.max_in_flight = max_in_flight
+        self.rate_limiter = rate_limiter
+        self.token_estimator = token_estimator
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._semaphore = None
+        self._semaphore_loop = None
+
+    def _loop_semaphore(self) -> asyncio.Semaphore:
+        # One semaphore per loop, shared by all batches running on it.
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(max(self.max_in_flight, 1))
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def amap(self, fn: Callable[[Any], Awaitable[Any]], items: List[Any]) -> List[BatchItemResult]:
+        semaphore = self._loop_semaphore()
+
+        async def run(item):
+            async with semaphore:
+                try:
+                    if self.rate_limiter is not None:
+                        await self.rate_limiter.acquire(self.token_estimator(item))
+                    return BatchItemResult(value=await fn(item))
+                except Exception as e:
+                    return BatchItemResult(error=e)
+
+        return list(await asyncio.gather(*(run(item) for item in items)))
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="batch-executor", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine on the executor's loop and wait for its result.
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("Cannot block on the executor's own loop; await the coroutine instead.")
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    def map(self, fn: Callable[[Any], Awaitable[Any]], items: List[Any]) -> List[BatchItemResult]:
+        return self.run(self.amap(fn, items))
+
+    def invoke_all(self, llm, prompts: List[Any]) -> List[BatchItemResult]:
+        """
+        `llm.ainvoke` every prompt, e.g. a list of messages per chunk.
+        """
+        return self.map(llm.ainvoke, prompts)
+
+    def close(self):
+        with self._start_lock:
+            if self._loop is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._loop = None
+            self._thread = None
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import orjson
+
+
+class CompletionCache:
+    """
+    Two-tier cache for deterministic chat completions.
+
+    Entries are keyed on (model, normalized messages, stop, parameters).
+    Lookups hit an in-process LRU first and an optional SQLite file second;
+    disk entries expire after `ttl` seconds and the least recently used are
+    evicted beyond `max_disk_entries`.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_memory_entries: int = 1024,
+        max_disk_entries: int = 100_000,
+        ttl: float = 7 * 24 * 60 * 60,
+    ):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.saved_latency = 0.0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS completions (key TEXT PRIMARY KEY, content TEXT NOT NULL, "
+                "latency REAL NOT NULL, created_at REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+            self._db.execute("DELETE FROM completions WHERE created_at < ?", (time.time() - ttl,))
+            self._db.commit()
+            self._disk_entries = self._db.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+
+    @staticmethod
+    def make_key(model: str, messages: List[dict], stop: Optional[List[str]] = None, params: Optional[dict] = None) -> str:
+        normalized = [
+            {"role": message["role"], "content": " ".join(str(message["content"]).split())}
+            for message in messages
+        ]
+        payload = orjson.dumps(
+            {"model": model, "messages": normalized, "stop": stop or [], "params": params or {}},
+            option=orjson.OPT_SORT_KEYS,
+            default=str,
+        )
+        return hashlib.sha256(payload).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and time.time() - entry[2] < self.ttl:
+                self._memory.move_to_end(key)
+                return self._hit(entry)
+            if entry is not None:
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT content, latency, created_at FROM completions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    if time.time() - row[2] < self.ttl:
+                        self._db.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+                        self._db.commit()
+                        self._remember(key, row)
+                        return self._hit(row)
+                    self._db.execute("DELETE FROM completions WHERE key = ?", (key,))
+                    self._db.commit()
+                    self._disk_entries -= 1
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, content: str, latency: float):
+        now = time.time()
+        entry = (content, latency, now)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is None:
+                return
+            exists = self._db.execute("SELECT 1 FROM completions WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO completions VALUES (?, ?, ?, ?, ?)", (key, content, latency, now, now)
+            )
+            if not exists:
+                self._disk_entries += 1
+            overflow = self._disk_entries - self.max_disk_entries
+            if overflow > 0:
+                self._db.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self._disk_entries -= overflow
+            self._db.commit()
+
+    def _remember(self, key: str, entry):
+        self._memory[key] = tuple(entry)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _hit(self, entry) -> str:
+        self.hits += 1
+        self.saved_latency += entry[1]
+        return entry[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "saved_latency": self.saved_latency,
+            "memory_entries": len(self._memory),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,23 +1,99 @@
-from typing import List, Optional, Any
-import requests
-from langchain_core.callbacks import CallbackManagerForLLMRun
+import asyncio
+import json
+import time
+from typing import List, Optional, Any, Iterator, AsyncIterator
+
+import httpx
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
 
 from langchain_core.language_models import BaseChatModel
-from langchain_core.messages import BaseMessage, AIMessage
-from langchain_core.outputs import ChatResult, ChatGeneration
-from pydantic import BaseModel, Field
+from langchain_core.messages import BaseMessage, AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatResult, ChatGeneration, ChatGenerationChunk
+from pydantic import BaseModel, Field, PrivateAttr
 from config.config import Config
+from core.completion_cache import CompletionCache
+from lib import tracing
+from core.http_retry import (
+    RETRY_STATUSES,
+    asend_with_retry,
+    backoff_delay,
+    send_with_retry,
+)
 
 
 class NewGPT(BaseChatModel):
     base_url: str = Field(..., description="The base URL of the LLM API")
     api_key: str = Field(..., description="The API key for authentication")
     model: str = Field("gpt-4", description="The model name to use")
+    timeout: float = Field(60.0, description="Request timeout in seconds")
+    connect_timeout: float = Field(10.0, description="Connect timeout in seconds")
+    max_retries: int = Field(3, description="Retries on rate limits and 5xx responses")
+    max_connections: int = Field(10, description="Size of the HTTP connection pool")
+    response_cache: Optional[CompletionCache] = Field(
+        None, description="Opt-in cache of completions for identical requests", exclude=True
+    )
+
+    _client: Optional[httpx.Client] = PrivateAttr(default=None)
+    _async_client: Optional[httpx.AsyncClient] = PrivateAttr(default=None)
+    _async_loop: Any = PrivateAttr(default=None)
 
     @property
     def _llm_type(self) -> str:
         return "new-gpt"
 
+    @property
+    def _url(self) -> str:
+        return f"{self.base_url}/v1/chat/completions"
+
+    @property
+    def _headers(self) -> dict:
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.api_key}",
+        }
+
+    def _client_options(self) -> dict:
+        return {
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "limits": httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_connections,
+            ),
+        }
+
+    @property
+    def client(self) -> httpx.Client:
+        # Persistent pooled client, connections are reused across calls.
+        if self._client is None:
+            self._client = httpx.Client(**self._client_options())
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # Async clients are bound to the event loop they were created on.
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            previous, previous_loop = self._async_client, self._async_loop
+            if previous is not None and previous_loop is not None and previous_loop.is_running():
+                # Its connections belong to the other loop: close it there.
+                asyncio.run_coroutine_threadsafe(previous.aclose(), previous_loop)
+            self._async_client = httpx.AsyncClient(**self._client_options())
+            self._async_loop = loop
+        return self._async_client
+
+    async def aclose(self):
+        """
+        Close the async client. Call it on the loop that used it, e.g.
+        `executor.run(llm.aclose())` for a BatchExecutor.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
+
     def _convert_messages_to_openai_format(
         self, messages: List[BaseMessage]
     ) -> List[dict]:
@@ -38,30 +114,200 @@ class NewGPT(BaseChatModel):
             formatted.append({"role": role, "content": msg.content})
         return formatted
 
-    def _generate(
+    def _build_payload(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        stream: bool = False,
         **kwargs: Any,
-    ) -> ChatResult:
+    ) -> dict:
         payload = {
             "model": self.model,
             "messages": self._convert_messages_to_openai_format(messages),
+            **kwargs,
         }
         if stop:
             payload["stop"] = stop
+        if stream:
+            payload["stream"] = True
+        return payload
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
-
-        url = f"{self.base_url}/v1/chat/completions"
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
+    @staticmethod
+    def _trace(span, response, body: dict):
+        span.add("response_bytes", len(response.content))
+        usage = body.get("usage") or {}
+        for key in ("prompt_tokens", "completion_tokens"):
+            if key in usage:
+                span.add(key, usage[key])
 
-        content = response.json()["choices"][0]["message"]["content"]
+    @staticmethod
+    def _to_chat_result(body: dict) -> ChatResult:
+        content = body["choices"][0]["message"]["content"]
         return ChatResult(
             generations=[ChatGeneration(message=AIMessage(content=content))]
-        )
\ No newline at end of file
+        )
+
+    @staticmethod
+    def _parse_sse_line(line: str) -> Optional[ChatGenerationChunk]:
+        """
+        Turn one server-sent event line into a chunk. Returns None for
+        keep-alives, comments and the final `[DONE]` marker.
+        """
+        if not line.startswith("data:"):
+            return None
+        data = line[5:].strip()
+        if not data or data == "[DONE]":
+            return None
+        choices = json.loads(data).get("choices") or [{}]
+        content = (choices[0].get("delta") or {}).get("content")
+        if not content:
+            return None
+        return ChatGenerationChunk(message=AIMessageChunk(content=content))
+
+    def _cache_lookup(self, payload: dict):
+        """
+        Returns (key, cached result). Both are None when caching is off.
+        """
+        if self.response_cache is None:
+            return None, None
+        params = {k: v for k, v in payload.items() if k not in ("model", "messages", "stop")}
+        key = CompletionCache.make_key(self.model, payload["messages"], payload.get("stop"), params)
+        content = self.response_cache.get(key)
+        if content is None:
+            return key, None
+        return key, ChatResult(generations=[ChatGeneration(message=AIMessage(content=content))])
+
+    def _cache_store(self, key, result: ChatResult, started_at: float):
+        if key is not None:
+            self.response_cache.put(
+                key, result.generations[0].message.content, time.perf_counter() - started_at
+            )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        payload = self._build_payload(messages, stop, **kwargs)
+        key, cached = self._cache_lookup(payload)
+        if cached is not None:
+            tracing.observe("llm.cache_hit", count=1)
+            return cached
+        started_at = time.perf_counter()
+        with tracing.span("llm.generate") as span:
+            response = send_with_retry(
+                self.client, "POST", self._url, max_retries=self.max_retries,
+                json=payload, headers=self._headers,
+            )
+            body = response.json()
+            if tracing.is_enabled():
+                self._trace(span, response, body)
+        result = self._to_chat_result(body)
+        self._cache_store(key, result, started_at)
+        return result
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        payload = self._build_payload(messages, stop, **kwargs)
+        key, cached = self._cache_lookup(payload)
+        if cached is not None:
+            tracing.observe("llm.cache_hit", count=1)
+            return cached
+        started_at = time.perf_counter()
+        with tracing.span("llm.generate") as span:
+            response = await asend_with_retry(
+                self.async_client, "POST", self._url, max_retries=self.max_retries,
+                json=payload, headers=self._headers,
+            )
+            body = response.json()
+            if tracing.is_enabled():
+                self._trace(span, response, body)
+        result = self._to_chat_result(body)
+        self._cache_store(key, result, started_at)
+        return result
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        payload = self._build_payload(messages, stop, stream=True, **kwargs)
+        started_at = time.perf_counter()
+        attempt = 0
+        chunks = 0
+        while True:
+            # Retries are only possible before the first token was yielded.
+            try:
+                with self.client.stream("POST", self._url, json=payload, headers=self._headers) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = backoff_delay(attempt, response)
+                    else:
+                        response.raise_for_status()
+                        for line in response.iter_lines():
+                            chunk = self._parse_sse_line(line)
+                            if chunk is None:
+                                continue
+                            chunks += 1
+                            if run_manager:
+                                run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                            yield chunk
+                        # Spans do not survive yields, the stream is recorded at the end.
+                        tracing.observe(
+                            "llm.stream", duration_ms=(time.perf_counter() - started_at) * 1000,
+                            chunks=chunks, retries=attempt,
+                        )
+                        return
+            except httpx.TransportError:
+                if chunks or attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+            time.sleep(delay)
+            attempt += 1
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        payload = self._build_payload(messages, stop, stream=True, **kwargs)
+        started_at = time.perf_counter()
+        attempt = 0
+        chunks = 0
+        while True:
+            try:
+                async with self.async_client.stream("POST", self._url, json=payload, headers=self._headers) as response:
+                    if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                        delay = backoff_delay(attempt, response)
+                    else:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            chunk = self._parse_sse_line(line)
+                            if chunk is None:
+                                continue
+                            chunks += 1
+                            if run_manager:
+                                await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                            yield chunk
+                        # Spans do not survive yields, the stream is recorded at the end.
+                        tracing.observe(
+                            "llm.stream", duration_ms=(time.perf_counter() - started_at) * 1000,
+                            chunks=chunks, retries=attempt,
+                        )
+                        return
+            except httpx.TransportError:
+                if chunks or attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+            await asyncio.sleep(delay)
+            attempt += 1
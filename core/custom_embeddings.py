@@ -1,31 +1,160 @@
-from typing import List
-import requests
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import httpx
 from langchain_core.embeddings import Embeddings
 
+from core.http_retry import asend_with_retry, send_with_retry
+from lib import tracing
+
 
 class NewEmbeddings(Embeddings):
     def __init__(
-        self, base_url: str, api_key: str, model: str = "text-embedding-ada-002"
+        self,
+        base_url: str,
+        api_key: str,
+        model: str = "text-embedding-ada-002",
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        timeout: float = 60.0,
+        max_retries: int = 3,
     ):
         self.base_url = base_url
         self.api_key = api_key
         self.model = model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._async_client: Optional[httpx.AsyncClient] = None
+        self._async_loop = None
 
-    def _call_embedding_api(self, text: str) -> List[float]:
-        headers = {
+    @property
+    def _url(self) -> str:
+        return f"{self.base_url}/v1/embeddings"
+
+    @property
+    def _headers(self) -> dict:
+        return {
             "Content-Type": "application/json",
             "Authorization": f"Bearer {self.api_key}",
         }
-        data = {"model": self.model, "input": text, "encoding_format": "float"}
 
-        response = requests.post(
-            f"{self.base_url}/v1/embeddings", json=data, headers=headers
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_concurrency,
+            max_keepalive_connections=self.max_concurrency,
         )
-        response.raise_for_status()
-        return response.json()["data"][0]["embedding"]
+
+    @property
+    def client(self) -> httpx.Client:
+        # One pooled client per instance so batches reuse TLS connections.
+        # embed_documents calls this from several threads at once.
+        with self._client_lock:
+            if self._client is None:
+                self._client = httpx.Client(limits=self._limits(), timeout=self.timeout)
+            return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # Async clients are bound to the event loop they were created on.
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(limits=self._limits(), timeout=self.timeout)
+            self._async_loop = loop
+        return self._async_client
+
+    def _payload(self, texts: List[str]) -> dict:
+        return {"model": self.model, "input": texts, "encoding_format": "float"}
+
+    @staticmethod
+    def _parse_embeddings(body: dict, count: int) -> List[List[float]]:
+        data = sorted(body["data"], key=lambda item: item.get("index", 0))
+        if len(data) != count:
+            raise ValueError(f"Expected {count} embeddings, got {len(data)}")
+        return [item["embedding"] for item in data]
+
+    def _batches(self, texts: List[str]) -> List[List[str]]:
+        return [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+
+    @staticmethod
+    def _trace(span, texts: List[str], response, body: dict):
+        span.add("texts", len(texts))
+        span.add("response_bytes", len(response.content))
+        usage = body.get("usage") or {}
+        if "total_tokens" in usage:
+            span.add("tokens", usage["total_tokens"])
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        with tracing.span("embeddings.batch") as span:
+            response = send_with_retry(
+                self.client, "POST", self._url, max_retries=self.max_retries,
+                json=self._payload(texts), headers=self._headers,
+            )
+            body = response.json()
+            if tracing.is_enabled():
+                self._trace(span, texts, response, body)
+            return self._parse_embeddings(body, len(texts))
+
+    async def _aembed_batch(self, texts: List[str]) -> List[List[float]]:
+        with tracing.span("embeddings.batch") as span:
+            response = await asend_with_retry(
+                self.async_client, "POST", self._url, max_retries=self.max_retries,
+                json=self._payload(texts), headers=self._headers,
+            )
+            body = response.json()
+            if tracing.is_enabled():
+                self._trace(span, texts, response, body)
+            return self._parse_embeddings(body, len(texts))
+
+    def _call_embedding_api(self, text: str) -> List[float]:
+        return self._embed_batch([text])[0]
 
     def embed_query(self, text: str) -> List[float]:
         return self._call_embedding_api(text)
 
     def embed_documents(self, texts: List[str]) -> List[List[float]]:
-        return [self._call_embedding_api(text) for text in texts]
\ No newline at end of file
+        """
+        Embed texts in `batch_size` requests, up to `max_concurrency` in flight.
+        Output order matches the input order.
+        """
+        batches = self._batches(list(texts))
+        if len(batches) <= 1 or self.max_concurrency <= 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            workers = min(self.max_concurrency, len(batches))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(self._embed_batch, batches))
+        return [embedding for batch in results for embedding in batch]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return (await self._aembed_batch([text]))[0]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        semaphore = asyncio.Semaphore(max(self.max_concurrency, 1))
+
+        async def run(batch):
+            async with semaphore:
+                return await self._aembed_batch(batch)
+
+        results = await asyncio.gather(*(run(batch) for batch in self._batches(list(texts))))
+        return [embedding for batch in results for embedding in batch]
+
+    def close(self):
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+    async def aclose(self):
+        """
+        Close the async client. Call it on the loop that used it.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+            self._async_loop = None
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+_SQLITE_MAX_VARS = 500
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Persistent, content-addressed cache in front of any `Embeddings`.
+
+    Vectors are stored as float32 rows of a memory-mapped matrix
+    (`vectors.f32`); a small SQLite index maps sha256(model, text) to its row
+    and last use time. Once `max_entries` is reached the least recently used
+    rows are evicted and reused.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_dir: str,
+        model: Optional[str] = None,
+        max_entries: int = 200_000,
+    ):
+        self.embeddings = embeddings
+        self.cache_dir = cache_dir
+        self.model = model or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._vectors_path = os.path.join(cache_dir, "vectors.f32")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries "
+            "(key TEXT PRIMARY KEY, row INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+        self._db.commit()
+
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim = row[0] if row else None
+        self._vectors = None
+        self._capacity = 0
+        if self.dim is not None and os.path.exists(self._vectors_path):
+            self._open_vectors()
+
+        used = {r for (r,) in self._db.execute("SELECT row FROM entries")}
+        self._next_row = max(used) + 1 if used else 0
+        self._free = sorted(set(range(self._next_row)) - used, reverse=True)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _open_vectors(self):
+        self._capacity = os.path.getsize(self._vectors_path) // (self.dim * 4)
+        if self._capacity:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dim)
+            )
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity * 2, 1024)
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self._open_vectors()
+
+    def _lookup(self, keys: List[str]) -> dict:
+        found = {}
+        for start in range(0, len(keys), _SQLITE_MAX_VARS):
+            chunk = keys[start:start + _SQLITE_MAX_VARS]
+            placeholders = ",".join("?" * len(chunk))
+            found.update(self._db.execute(
+                f"SELECT key, row FROM entries WHERE key IN ({placeholders})", chunk
+            ))
+        return found
+
+    def _allocate_rows(self, count: int) -> List[int]:
+        live = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        overflow = live + count - self.max_entries
+        if overflow > 0:
+            evicted = self._db.execute(
+                "SELECT key, row FROM entries ORDER BY last_used LIMIT ?", (overflow,)
+            ).fetchall()
+            self._db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in evicted])
+            self._free.extend(row for _, row in evicted)
+            self.evictions += len(evicted)
+        rows = []
+        while self._free and len(rows) < count:
+            rows.append(self._free.pop())
+        while len(rows) < count:
+            rows.append(self._next_row)
+            self._next_row += 1
+        return rows
+
+    def _store(self, keys: List[str], vectors: np.ndarray):
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (self.dim,))
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {vectors.shape[1]} does not match cache dimension {self.dim}")
+        if len(keys) > self.max_entries:
+            # Only the last `max_entries` of an oversized batch can be kept.
+            keys, vectors = keys[-self.max_entries:], vectors[-self.max_entries:]
+        rows = self._allocate_rows(len(keys))
+        # Evictions are committed before their rows are overwritten, so a
+        # crash in between never leaves a key pointing at another vector.
+        self._db.commit()
+        self._ensure_capacity(max(rows) + 1)
+        self._vectors[rows] = vectors
+        self._vectors.flush()
+        now = time.time()
+        self._db.executemany(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+            [(key, row, now) for key, row in zip(keys, rows)],
+        )
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        keys = [self._key(text) for text in texts]
+        with self._lock:
+            found = self._lookup(list(set(keys)))
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE entries SET last_used = ? WHERE key = ?", [(now, key) for key in found]
+                )
+                self._db.commit()
+            cached = {key: np.array(self._vectors[row]) for key, row in found.items()}
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        hits = sum(1 for key in keys if key in cached)
+        self.hits += hits
+        self.misses += len(keys) - hits
+
+        if missing:
+            vectors = np.asarray(self.embeddings.embed_documents(list(missing.values())), dtype=np.float32)
+            with self._lock:
+                self._store(list(missing), vectors)
+                self._db.commit()
+            cached.update(zip(missing, vectors))
+
+        return [cached[key].tolist() for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                self._vectors = None
+            self._db.close()
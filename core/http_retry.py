@@ -0,0 +1,78 @@
+import asyncio
+import random
+import time
+
+import httpx
+
+from lib import tracing
+
+# Rate limited or transient server side failures worth retrying.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def backoff_delay(attempt: int, response=None, base: float = 0.5, cap: float = 30.0) -> float:
+    """
+    Seconds to wait before retry `attempt` (0-based). A `Retry-After` header
+    on the response wins over the exponential backoff.
+    """
+    if response is not None:
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), cap)
+            except ValueError:
+                pass
+    delay = min(cap, base * (2 ** attempt))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _should_retry(response, attempt: int, max_retries: int) -> bool:
+    return response.status_code in RETRY_STATUSES and attempt < max_retries
+
+
+def send_with_retry(client: httpx.Client, method: str, url: str, max_retries: int = 3, **kwargs):
+    """
+    Send a request, retrying on 429/5xx and connection errors with backoff.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt >= max_retries:
+                raise
+            time.sleep(backoff_delay(attempt))
+            attempt += 1
+            tracing.add("retries")
+            continue
+        if _should_retry(response, attempt, max_retries):
+            time.sleep(backoff_delay(attempt, response))
+            attempt += 1
+            tracing.add("retries")
+            continue
+        response.raise_for_status()
+        return response
+
+
+async def asend_with_retry(client: httpx.AsyncClient, method: str, url: str, max_retries: int = 3, **kwargs):
+    """
+    Async counterpart of `send_with_retry`.
+    """
+    attempt = 0
+    while True:
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt >= max_retries:
+                raise
+            await asyncio.sleep(backoff_delay(attempt))
+            attempt += 1
+            tracing.add("retries")
+            continue
+        if _should_retry(response, attempt, max_retries):
+            await asyncio.sleep(backoff_delay(attempt, response))
+            attempt += 1
+            tracing.add("retries")
+            continue
+        response.raise_for_status()
+        return response
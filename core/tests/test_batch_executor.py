@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from core.batch_executor import BatchExecutor, RateLimiter, estimate_tokens
+
+
+class TestBatchExecutor(unittest.TestCase):
+
+    def test_preserves_order_and_isolates_failures(self):
+        async def work(n):
+            await asyncio.sleep(0.01 * (5 - n))
+            if n == 2:
+                raise RuntimeError("bad item")
+            return n * 10
+
+        results = BatchExecutor(max_in_flight=5).map(work, [0, 1, 2, 3, 4])
+        self.assertEqual([r.value for r in results], [0, 10, None, 30, 40])
+        self.assertFalse(results[2].ok)
+        self.assertIsInstance(results[2].error, RuntimeError)
+
+    def test_limits_in_flight(self):
+        state = {"running": 0, "peak": 0}
+
+        async def work(n):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return n
+
+        BatchExecutor(max_in_flight=3).map(work, list(range(12)))
+        self.assertEqual(state["peak"], 3)
+
+    def test_concurrency_cuts_wall_clock(self):
+        async def work(n):
+            await asyncio.sleep(0.05)
+            return n
+
+        start = time.perf_counter()
+        BatchExecutor(max_in_flight=10).map(work, list(range(20)))
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+    def test_rate_limiter_spaces_requests(self):
+        async def work(n):
+            return n
+
+        executor = BatchExecutor(max_in_flight=10, rate_limiter=RateLimiter(requests_per_minute=600))
+        executor.map(work, [0])
+        start = time.perf_counter()
+        # The bucket starts full (600), so drain it first and measure the refill.
+        executor.rate_limiter._requests.tokens = 0
+        executor.map(work, [1, 2, 3])
+        self.assertGreaterEqual(time.perf_counter() - start, 0.25)
+
+    def test_limit_is_shared_by_concurrent_callers(self):
+        state = {"running": 0, "peak": 0}
+
+        async def work(n):
+            state["running"] += 1
+            state["peak"] = max(state["peak"], state["running"])
+            await asyncio.sleep(0.01)
+            state["running"] -= 1
+            return n
+
+        executor = BatchExecutor(max_in_flight=3)
+        threads = [threading.Thread(target=executor.map, args=(work, list(range(12)))) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        executor.close()
+        self.assertEqual(state["peak"], 3)
+
+    def test_rate_limiter_is_shared_across_loops(self):
+        limiter = RateLimiter(requests_per_minute=600)
+        limiter._requests.tokens = 2
+        taken = []
+
+        def worker():
+            async def take():
+                await limiter.acquire()
+                taken.append(time.perf_counter())
+            asyncio.run(take())
+
+        start = time.perf_counter()
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Two tokens available, then one every 0.1s: the last one waits ~0.2s.
+        self.assertGreaterEqual(max(taken) - start, 0.15)
+
+    def test_calls_share_one_loop(self):
+        loops = []
+
+        async def work(n):
+            loops.append(asyncio.get_running_loop())
+            return n
+
+        executor = BatchExecutor()
+        for _ in range(3):
+            executor.map(work, [0, 1])
+        self.assertEqual(len(set(map(id, loops))), 1)
+        executor.close()
+        self.assertTrue(loops[0].is_closed())
+
+    def test_estimate_tokens(self):
+        self.assertEqual(estimate_tokens("a" * 40), 10)
+        self.assertEqual(estimate_tokens(["a" * 40, "b" * 8]), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
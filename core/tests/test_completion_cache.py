@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from core.completion_cache import CompletionCache
+from core.custom_completions import NewGPT
+
+
+class TestCompletionCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "completions.db")
+
+    def test_key_normalizes_whitespace_and_param_order(self):
+        a = CompletionCache.make_key("m", [{"role": "user", "content": "hello   world\n"}], None, {"a": 1, "b": 2})
+        b = CompletionCache.make_key("m", [{"role": "user", "content": "hello world"}], [], {"b": 2, "a": 1})
+        c = CompletionCache.make_key("m", [{"role": "user", "content": "hello world"}], ["\n"], {"a": 1, "b": 2})
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, c)
+
+    def test_disk_tier_survives_restart(self):
+        cache = CompletionCache(self.path)
+        cache.put("k", "answer", 1.5)
+        cache.close()
+
+        reopened = CompletionCache(self.path)
+        self.assertEqual(reopened.get("k"), "answer")
+        self.assertEqual(reopened.stats()["saved_latency"], 1.5)
+
+    def test_ttl_expiry(self):
+        cache = CompletionCache(self.path, ttl=10)
+        with patch("core.completion_cache.time.time", return_value=1000.0):
+            cache.put("k", "answer", 0.1)
+        with patch("core.completion_cache.time.time", return_value=1011.0):
+            self.assertIsNone(cache.get("k"))
+
+    def test_memory_lru_and_disk_size_bound(self):
+        cache = CompletionCache(self.path, max_memory_entries=1, max_disk_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, key.upper(), 0.1)
+        self.assertEqual(cache.stats()["memory_entries"], 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("b"), "B")
+        self.assertEqual(cache.get("c"), "C")
+
+
+class TestNewGPTResponseCache(unittest.TestCase):
+
+    @patch("core.custom_completions.send_with_retry")
+    def test_identical_prompts_skip_the_network(self, mock_send):
+        response = MagicMock()
+        response.json.return_value = {"choices": [{"message": {"content": "What is RAG?"}}]}
+        mock_send.return_value = response
+        gpt = NewGPT(base_url="http://llm.local", api_key="key", model="m", response_cache=CompletionCache())
+
+        messages = [SystemMessage(content="Ask a question."), HumanMessage(content="Context: RAG")]
+        first = gpt.invoke(messages)
+        second = gpt.invoke(messages)
+
+        self.assertEqual(first.content, second.content)
+        self.assertEqual(mock_send.call_count, 1)
+        self.assertEqual(gpt.response_cache.stats()["hits"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
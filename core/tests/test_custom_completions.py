@@ -1,6 +1,9 @@
+import asyncio
 import os
 import unittest
 from unittest.mock import patch, MagicMock
+
+import httpx
 from langchain_core.messages import BaseMessage, AIMessage
 
 from core.custom_completions import NewGPT
@@ -26,7 +29,7 @@ class TestNewGPT(unittest.TestCase):
             {"role": "system", "content": "System message."},
         ])
 
-    @patch("core.custom_completions.requests.post")
+    @patch("core.custom_completions.send_with_retry")
     def test_generate_success(self, mock_post):
         mock_response = MagicMock()
         mock_response.status_code = 200
@@ -44,5 +47,99 @@ class TestNewGPT(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.gpt._convert_messages_to_openai_format(messages)
 
+    def test_stream_parses_server_sent_events(self):
+        events = (
+            'data: {"choices": [{"delta": {"role": "assistant"}}]}\n\n'
+            'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+            ': keep-alive\n\n'
+            'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+            'data: [DONE]\n\n'
+        )
+        requests_seen = []
+
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, text=events, headers={"Content-Type": "text/event-stream"})
+
+        self.gpt._client = httpx.Client(transport=httpx.MockTransport(handler))
+        chunks = [chunk.content for chunk in self.gpt.stream([BaseMessage(type="human", content="Say hi")])]
+        self.assertEqual("".join(chunks), "Hello")
+        self.assertIn(b'"stream":true', requests_seen[0].content.replace(b" ", b""))
+
+    @patch("core.custom_completions.time.sleep")
+    def test_stream_retries_rate_limit(self, mock_sleep):
+        responses = [
+            httpx.Response(429),
+            httpx.Response(200, text='data: {"choices": [{"delta": {"content": "ok"}}]}\n\n'),
+        ]
+        self.gpt._client = httpx.Client(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        chunks = [chunk.content for chunk in self.gpt.stream([BaseMessage(type="human", content="Say hi")])]
+        self.assertEqual(chunks, ["ok"])
+        mock_sleep.assert_called_once()
+
+    @patch("core.custom_completions.time.sleep")
+    def test_stream_retries_connection_errors_before_first_token(self, mock_sleep):
+        def handler(request):
+            if not mock_sleep.called:
+                raise httpx.ConnectError("connection reset")
+            return httpx.Response(200, text='data: {"choices": [{"delta": {"content": "ok"}}]}\n\n')
+
+        self.gpt._client = httpx.Client(transport=httpx.MockTransport(handler))
+        chunks = [chunk.content for chunk in self.gpt.stream([BaseMessage(type="human", content="Say hi")])]
+        self.assertEqual(chunks, ["ok"])
+        mock_sleep.assert_called_once()
+
+    @patch("core.custom_completions.asyncio.sleep")
+    def test_astream_retries_connection_errors_before_first_token(self, mock_sleep):
+        attempts = []
+
+        async def handler(request):
+            attempts.append(request)
+            if len(attempts) == 1:
+                raise httpx.ConnectError("connection reset")
+            return httpx.Response(200, text='data: {"choices": [{"delta": {"content": "ok"}}]}\n\n')
+
+        async def run():
+            await self._mock_async_client(handler)
+            return [chunk.content async for chunk in self.gpt.astream([BaseMessage(type="human", content="Say hi")])]
+
+        self.assertEqual(asyncio.run(run()), ["ok"])
+        self.assertEqual(len(attempts), 2)
+
+    def test_agenerate_success(self):
+        async def handler(request):
+            return httpx.Response(200, json={"choices": [{"message": {"content": "Async response"}}]})
+
+        async def run():
+            self.gpt._async_loop = asyncio.get_running_loop()
+            self.gpt._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            return await self.gpt._agenerate([BaseMessage(type="human", content="Say hi")])
+
+        result = asyncio.run(run())
+        self.assertEqual(result.generations[0].message.content, "Async response")
+
+    def test_batches_reuse_the_async_client(self):
+        from core.batch_executor import BatchExecutor
+
+        clients = []
+
+        async def handler(request):
+            return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+        executor = BatchExecutor()
+        executor.run(self._mock_async_client(handler))
+        for _ in range(3):
+            results = executor.invoke_all(self.gpt, [[BaseMessage(type="human", content="hi")]])
+            self.assertTrue(results[0].ok)
+            clients.append(self.gpt._async_client)
+        self.assertEqual(len(set(map(id, clients))), 1)
+        executor.run(self.gpt.aclose())
+        self.assertTrue(clients[0].is_closed)
+        executor.close()
+
+    async def _mock_async_client(self, handler):
+        self.gpt._async_loop = asyncio.get_running_loop()
+        self.gpt._async_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
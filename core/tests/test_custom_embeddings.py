@@ -0,0 +1,111 @@
+import asyncio
+import json
+import threading
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from core.custom_embeddings import NewEmbeddings
+
+
+def _embedding_handler(calls):
+    lock = threading.Lock()
+
+    def handler(request):
+        body = json.loads(request.content)
+        with lock:
+            calls.append(body["input"])
+        # Return items out of order, the client must sort them by index.
+        data = [
+            {"index": i, "embedding": [float(len(text)), float(i)]}
+            for i, text in enumerate(body["input"])
+        ]
+        return httpx.Response(200, json={"data": list(reversed(data))})
+
+    return handler
+
+
+class TestNewEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.embeddings = NewEmbeddings(
+            base_url="http://embeddings.local", api_key="key", model="test-model",
+            batch_size=3, max_concurrency=2,
+        )
+        self.embeddings._client = httpx.Client(transport=httpx.MockTransport(_embedding_handler(self.calls)))
+
+    def test_embed_documents_batches_and_keeps_order(self):
+        texts = ["a" * n for n in range(1, 8)]
+        vectors = self.embeddings.embed_documents(texts)
+        self.assertEqual([v[0] for v in vectors], [float(n) for n in range(1, 8)])
+        self.assertEqual(sorted(len(batch) for batch in self.calls), [1, 3, 3])
+
+    def test_embed_query(self):
+        self.assertEqual(self.embeddings.embed_query("abcd"), [4.0, 0.0])
+        self.assertEqual(self.calls, [["abcd"]])
+
+    @patch("core.http_retry.time.sleep")
+    def test_retries_rate_limited_requests(self, mock_sleep):
+        responses = [
+            httpx.Response(429, headers={"Retry-After": "1"}),
+            httpx.Response(503),
+            httpx.Response(200, json={"data": [{"index": 0, "embedding": [1.0]}]}),
+        ]
+        self.embeddings._client = httpx.Client(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+        self.assertEqual(self.embeddings.embed_query("hi"), [1.0])
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(mock_sleep.call_args_list[0].args[0], 1.0)
+
+    @patch("core.http_retry.time.sleep")
+    def test_gives_up_after_max_retries(self, mock_sleep):
+        self.embeddings.max_retries = 1
+        self.embeddings._client = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(500)))
+        with self.assertRaises(httpx.HTTPStatusError):
+            self.embeddings.embed_query("hi")
+
+    def test_aembed_documents(self):
+        async def run():
+            handler = _embedding_handler(self.calls)
+
+            async def async_handler(request):
+                return handler(request)
+
+            self.embeddings._async_loop = asyncio.get_running_loop()
+            self.embeddings._async_client = httpx.AsyncClient(transport=httpx.MockTransport(async_handler))
+            return await self.embeddings.aembed_documents(["a", "bb", "ccc", "dddd"])
+
+        vectors = asyncio.run(run())
+        self.assertEqual([v[0] for v in vectors], [1.0, 2.0, 3.0, 4.0])
+
+
+    def test_concurrent_batches_share_one_client(self):
+        created = []
+        transport = httpx.MockTransport(_embedding_handler(self.calls))
+        real_client = httpx.Client
+
+        def make_client(**kwargs):
+            client = real_client(transport=transport)
+            created.append(client)
+            return client
+
+        self.embeddings._client = None
+        with patch("core.custom_embeddings.httpx.Client", side_effect=make_client):
+            self.embeddings.embed_documents(["a"] * 12)
+        self.assertEqual(len(created), 1)
+
+        self.embeddings.close()
+        self.assertTrue(created[0].is_closed)
+
+        async def run():
+            self.embeddings._async_loop = asyncio.get_running_loop()
+            self.embeddings._async_client = httpx.AsyncClient(transport=transport)
+            client = self.embeddings._async_client
+            await self.embeddings.aclose()
+            return client
+
+        self.assertTrue(asyncio.run(run()).is_closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
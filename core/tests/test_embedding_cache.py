@@ -0,0 +1,87 @@
+import tempfile
+import unittest
+
+from langchain_core.embeddings import Embeddings
+
+from core.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    model = "counting-model"
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 0.5, -1.0] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.inner = CountingEmbeddings()
+
+    def test_repeat_texts_do_not_call_the_api(self):
+        cache = CachedEmbeddings(self.inner, self.tmp.name)
+        first = cache.embed_documents(["a", "bb", "a"])
+        second = cache.embed_documents(["bb", "a"])
+        self.assertEqual(self.inner.calls, [["a", "bb"]])
+        self.assertEqual(first, [[1.0, 0.5, -1.0], [2.0, 0.5, -1.0], [1.0, 0.5, -1.0]])
+        self.assertEqual(second, [[2.0, 0.5, -1.0], [1.0, 0.5, -1.0]])
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 3)
+
+    def test_persists_across_instances(self):
+        cache = CachedEmbeddings(self.inner, self.tmp.name)
+        cache.embed_documents(["hello", "world"])
+        cache.close()
+
+        reopened = CachedEmbeddings(self.inner, self.tmp.name)
+        self.assertEqual(reopened.embed_query("world"), [5.0, 0.5, -1.0])
+        self.assertEqual(len(self.inner.calls), 1)
+
+    def test_model_is_part_of_the_key(self):
+        CachedEmbeddings(self.inner, self.tmp.name).embed_query("x")
+        CachedEmbeddings(self.inner, self.tmp.name, model="other").embed_query("x")
+        self.assertEqual(len(self.inner.calls), 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = CachedEmbeddings(self.inner, self.tmp.name, max_entries=2)
+        cache.embed_documents(["a"])
+        cache.embed_documents(["bb"])
+        cache.embed_documents(["a"])
+        cache.embed_documents(["ccc"])
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+        cache.embed_documents(["a"])
+        self.assertEqual(len(self.inner.calls), 3)
+        cache.embed_documents(["bb"])
+        self.assertEqual(len(self.inner.calls), 4)
+
+
+    def test_oversized_batch_stays_within_bound(self):
+        cache = CachedEmbeddings(self.inner, self.tmp.name, max_entries=2)
+        cache.embed_documents(["x"])
+        vectors = cache.embed_documents(["a", "bb", "ccc", "dddd", "eeeee"])
+        self.assertEqual([v[0] for v in vectors], [1.0, 2.0, 3.0, 4.0, 5.0])
+        stats = cache.stats()
+        self.assertEqual(stats["entries"], 2)
+        self.assertEqual(stats["evictions"], 1)
+
+        cache.embed_documents(["dddd", "eeeee"])
+        self.assertEqual(len(self.inner.calls), 2)
+        cache.close()
+        reopened = CachedEmbeddings(self.inner, self.tmp.name, max_entries=2)
+        self.assertEqual(reopened.embed_query("eeeee"), [5.0, 0.5, -1.0])
+        self.assertEqual(len(self.inner.calls), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
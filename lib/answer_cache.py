@@ -0,0 +1,234 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+from lib import tracing
+
+
+class SemanticAnswerCache:
+    """
+    Generated answers, looked up by question similarity.
+
+    An entry is keyed on the question embedding and the set of chunk IDs
+    the answer was generated from. A lookup hits when a stored question has
+    a cosine similarity of at least `threshold` and was answered from
+    exactly the chunks retrieved now. Chunk IDs are content hashes, so
+    edited or newly ingested chunks change the set and miss.
+
+    Embeddings are rows of one float32 matrix, indexed by chunk set: a
+    lookup scores only the entries answered from the same chunks, with one
+    matrix-vector product, so its cost does not grow with the cache.
+    Beyond `max_entries` the least recently used entry is replaced. With
+    `path` entries are kept in SQLite and survive restarts.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        threshold: float = 0.95,
+        max_entries: int = 10_000,
+        model: Optional[str] = None,
+    ):
+        self.path = path
+        self.threshold = threshold
+        self.max_entries = max_entries
+        # Answers of different models never match each other.
+        self.model = model or ""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.dims: Optional[int] = None
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.ndarray] = None
+        self._fingerprints = np.zeros(0, dtype=np.int64)
+        self._keys: List[str] = []
+        self._answers: List[str] = []
+        self._rows: Dict[str, int] = {}
+        # Chunk set fingerprint -> rows answered from that set.
+        self._groups: Dict[int, Set[int]] = {}
+        # Row -> None, least recently used first.
+        self._lru: "OrderedDict[int, None]" = OrderedDict()
+        self._db = None
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, question TEXT NOT NULL, "
+                "fingerprint INTEGER NOT NULL, answer TEXT NOT NULL, vector BLOB NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _load(self):
+        rows = self._db.execute(
+            "SELECT key, fingerprint, answer, vector FROM answers ORDER BY last_used DESC LIMIT ?",
+            (self.max_entries,),
+        ).fetchall()
+        self._db.execute(
+            "DELETE FROM answers WHERE key NOT IN (SELECT key FROM answers ORDER BY last_used DESC LIMIT ?)",
+            (self.max_entries,),
+        )
+        self._db.commit()
+        for key, fingerprint, answer, vector in reversed(rows):
+            vector = np.frombuffer(vector, dtype=np.float32)
+            if self.dims is None:
+                self.dims = len(vector)
+            elif len(vector) != self.dims:
+                continue
+            self._put(key, vector, fingerprint, answer)
+
+    def _fingerprint(self, chunk_ids: List[str]) -> int:
+        payload = "\n".join([self.model, *sorted(set(chunk_ids))]).encode("utf-8")
+        return int.from_bytes(hashlib.sha256(payload).digest()[:8], "little", signed=True)
+
+    @staticmethod
+    def _key(question: str, fingerprint: int) -> str:
+        return hashlib.sha256(f"{fingerprint}\0{' '.join(question.split())}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def _ensure_capacity(self, rows: int):
+        capacity = 0 if self._vectors is None else len(self._vectors)
+        if rows <= capacity:
+            return
+        new_capacity = min(max(rows, capacity * 2, 1024), max(self.max_entries, rows))
+        vectors = np.zeros((new_capacity, self.dims), dtype=np.float32)
+        fingerprints = np.zeros(new_capacity, dtype=np.int64)
+        if capacity:
+            vectors[:capacity] = self._vectors
+            fingerprints[:capacity] = self._fingerprints
+        self._vectors = vectors
+        self._fingerprints = fingerprints
+
+    def _put(self, key: str, vector: np.ndarray, fingerprint: int, answer: str) -> Optional[str]:
+        """
+        Store one entry in memory. Returns the key it evicted, if any.
+        """
+        evicted = None
+        row = self._rows.get(key)
+        if row is None and len(self._keys) < self.max_entries:
+            row = len(self._keys)
+            self._ensure_capacity(row + 1)
+            self._keys.append(key)
+            self._answers.append(answer)
+        else:
+            if row is None:
+                row = next(iter(self._lru))
+                evicted = self._keys[row]
+                del self._rows[evicted]
+                self._keys[row] = key
+                self.evictions += 1
+            group = self._groups[int(self._fingerprints[row])]
+            group.discard(row)
+            if not group:
+                del self._groups[int(self._fingerprints[row])]
+        self._rows[key] = row
+        self._vectors[row] = vector
+        self._fingerprints[row] = fingerprint
+        self._answers[row] = answer
+        self._groups.setdefault(fingerprint, set()).add(row)
+        self._lru[row] = None
+        self._lru.move_to_end(row)
+        return evicted
+
+    def get_many(self, vectors, chunk_ids: List[List[str]]) -> List[Optional[str]]:
+        """
+        Cached answer, or None, for each question embedding and the IDs of
+        the chunks retrieved for it.
+        """
+        if not len(vectors):
+            return []
+        started_at = time.perf_counter()
+        queries = self._normalize(vectors)
+        fingerprints = [self._fingerprint(ids) for ids in chunk_ids]
+        answers: List[Optional[str]] = [None] * len(queries)
+        with self._lock:
+            if queries.shape[1] == self.dims:
+                used = []
+                for i, (query, fingerprint) in enumerate(zip(queries, fingerprints)):
+                    group = self._groups.get(fingerprint)
+                    if not group:
+                        continue
+                    rows = np.fromiter(group, dtype=np.intp, count=len(group))
+                    scores = self._vectors[rows] @ query
+                    best = int(scores.argmax())
+                    if scores[best] >= self.threshold:
+                        row = int(rows[best])
+                        answers[i] = self._answers[row]
+                        self._lru.move_to_end(row)
+                        used.append(self._keys[row])
+                if used and self._db is not None:
+                    now = time.time()
+                    self._db.executemany("UPDATE answers SET last_used = ? WHERE key = ?", [(now, key) for key in used])
+                    self._db.commit()
+            hits = sum(answer is not None for answer in answers)
+            self.hits += hits
+            self.misses += len(answers) - hits
+        tracing.observe(
+            "rag.answer_cache", lookups=len(answers), hits=hits,
+            lookup_ms=(time.perf_counter() - started_at) * 1000,
+        )
+        return answers
+
+    def get(self, vector, chunk_ids: List[str]) -> Optional[str]:
+        return self.get_many([vector], [chunk_ids])[0]
+
+    def put_many(self, questions: List[str], vectors, chunk_ids: List[List[str]], answers: List[str]):
+        if not questions:
+            return
+        vectors = self._normalize(vectors)
+        with self._lock:
+            if self.dims is None:
+                self.dims = int(vectors.shape[1])
+            elif vectors.shape[1] != self.dims:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match cache dimension {self.dims}")
+            now = time.time()
+            rows = []
+            for question, vector, ids, answer in zip(questions, vectors, chunk_ids, answers):
+                fingerprint = self._fingerprint(ids)
+                key = self._key(question, fingerprint)
+                evicted = self._put(key, vector, fingerprint, answer)
+                if self._db is not None:
+                    if evicted is not None:
+                        self._db.execute("DELETE FROM answers WHERE key = ?", (evicted,))
+                    rows.append((key, question, fingerprint, answer, vector.tobytes(), now))
+            if self._db is not None:
+                # An entry can be evicted again by a later one of the same batch.
+                rows = [row for row in rows if row[0] in self._rows]
+                self._db.executemany("INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?)", rows)
+                self._db.commit()
+
+    def put(self, question: str, vector, chunk_ids: List[str], answer: str):
+        self.put_many([question], [vector], [chunk_ids], [answer])
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
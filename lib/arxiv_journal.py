@@ -1,28 +1,52 @@
-import arxiv
-import pdfplumber
 import io
-import requests
-from langchain.document_loaders import PyPDFLoader
 import re
-import unicodedata
+
+from lib import tracing
+from lib.downloader import Downloader
+from lib.text_normalizer import normalize_text, normalize_texts
+
+_VERSION = re.compile(r"v\d+$")
 
 
 class ArxivClient:
-    def __init__(self):
+    def __init__(self, max_downloads: int = 4, download_timeout=(10.0, 60.0)):
+        import arxiv
         self.client = arxiv.Client()
+        self.downloader = Downloader(max_workers=max_downloads, timeout=download_timeout)
+
+    @staticmethod
+    def _to_paper(arxiv_paper_id, result):
+        return {
+            "id": f"arxiv_{arxiv_paper_id}",
+            "title": result.title,
+            "authors": [author.name for author in result.authors],
+            "summary": result.summary,
+            "published": result.published,
+            "pdf_url": result.pdf_url
+        }
 
     def get_paper_by_id(self, arxiv_paper_id):
-        search = arxiv.Search(id_list=[arxiv_paper_id])
-        for result in self.client.results(search):
-            return {
-                "id": f"arxiv_{arxiv_paper_id}",
-                "title": result.title,
-                "authors": [author.name for author in result.authors],
-                "summary": result.summary,
-                "published": result.published,
-                "pdf_url": result.pdf_url
-            }
-        return None
+        return self.get_papers_by_ids([arxiv_paper_id]).get(arxiv_paper_id)
+
+    def get_papers_by_ids(self, arxiv_paper_ids):
+        """
+        Resolve many IDs with a single `id_list` query.
+        Returns {id: paper} in request order; unknown IDs are left out.
+        """
+        ids = list(dict.fromkeys(arxiv_paper_ids))
+        if not ids:
+            return {}
+        import arxiv
+        search = arxiv.Search(id_list=ids, max_results=len(ids))
+        found = {}
+        with tracing.span("arxiv.lookup") as span:
+            span.add("ids", len(ids))
+            for result in self.client.results(search):
+                # Short IDs carry a version suffix ("2507.15846v1") unless one was requested.
+                short_id = result.get_short_id()
+                found[short_id] = result
+                found.setdefault(_VERSION.sub("", short_id), result)
+        return {i: self._to_paper(i, found[i]) for i in ids if i in found}
 
     def get_pdf_content(self, pdf_url):
         import requests
@@ -33,40 +57,74 @@ class ArxivClient:
             raise Exception(f"Failed to download PDF: {response.status_code}")
 
     def download_file(self, id, url, local_path):
-        response = requests.get(url)
-        if response.status_code == 200:
-            with open(local_path + f"{id}.pdf", "wb") as f:
-                f.write(response.content)
-        else:
-            raise Exception(f"Failed to download file: {response.status_code}")
+        # Streamed to a .part file and renamed; skipped if already on disk.
+        file_path = local_path + f"{id}.pdf"
+        with tracing.span("arxiv.download") as span:
+            result = self.downloader.download(url, file_path)
+            span.add("bytes", result.bytes).add("skipped", int(result.skipped))
+        return file_path
+
+    def download_papers(self, papers, local_path):
+        """
+        Download the PDFs of many papers concurrently.
+        Returns one DownloadResult per paper, in order; failures are
+        reported in `error` instead of raising.
+        """
+        with tracing.span("arxiv.download_many") as span:
+            results = self.downloader.download_many(
+                (paper["pdf_url"], local_path + f"{paper['id']}.pdf") for paper in papers
+            )
+            span.add("papers", len(results)).add("bytes", sum(result.bytes for result in results))
+            span.add("failed", sum(not result.ok for result in results))
+        return results
 
+    @staticmethod
     def extract_text_from_pdf(pdf_bytes):
-        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
-            text = ""
-            for page in pdf.pages:
-                text += page.extract_text() or ""
-        return text
+        # Same parser as extract_text_from_pdfs (pypdf, pdfplumber as the
+        # fallback), so serial and parallel extraction agree.
+        try:
+            from pypdf import PdfReader
+            return "".join(page.extract_text() or "" for page in PdfReader(io.BytesIO(pdf_bytes)).pages)
+        except Exception:
+            import pdfplumber
+            with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+                return "".join(page.extract_text() or "" for page in pdf.pages)
+
+    @staticmethod
+    def extract_text_from_pdfs(file_paths, max_workers=None):
+        """
+        Text of many downloaded PDFs, parsed across a process pool.
+        Returns {file_path: text}; unreadable files map to "".
+        """
+        from lib.pdf_parallel import extract_pages
+        texts = {path: [] for path in file_paths}
+        for page in extract_pages(file_paths, max_workers):
+            texts[page.source].append(page.text)
+        return {path: "".join(parts) for path, parts in texts.items()}
 
 
+    @staticmethod
     def clean_text(text: str) -> str:
-        # Normalize Unicode characters
-        text = unicodedata.normalize('NFKD', text)
-        # Remove non-printable characters
-        text = ''.join(ch for ch in text if ch.isprintable())
-        # Remove unwanted special chars except common punctuation
-        text = re.sub(r'[^\w\s.,;:?!\'\"-]', '', text)
-        # Replace multiple spaces and newlines with a single space
-        text = re.sub(r'\s+', ' ', text)
-        return text.strip()
+        # NFKD-normalize, strip non-printable/special chars, collapse whitespace
+        return normalize_text(text)
+
+    @staticmethod
+    def clean_texts(texts):
+        """
+        Clean a list or stream of texts (e.g. pages), lazily.
+        """
+        return normalize_texts(texts)
 
 if __name__ == "__main__":
+    from langchain_community.document_loaders import PyPDFLoader
+
     # Example usage
     client = ArxivClient()
     arxiv_id = '2507.15846'
     paper = client.get_paper_by_id(arxiv_id)
     if paper:
         download_path = "/Users/preethamnagesh8/MyProjects/python_elastic_logging/elastic_python/local/docs/"
-        ArxivClient.download_file(paper['id'], paper['pdf_url'], download_path)
+        client.download_file(paper['id'], paper['pdf_url'], download_path)
         loader = PyPDFLoader(download_path + f"{paper['id']}.pdf")
         documents = loader.load()
 
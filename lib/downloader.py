@@ -0,0 +1,150 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Rate limited or transient server side failures worth retrying.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class DownloadResult(NamedTuple):
+    url: str
+    path: str
+    bytes: int = 0
+    skipped: bool = False
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class Downloader:
+    """
+    Concurrent file downloader over one pooled `requests.Session`.
+
+    Bodies are streamed to `<path>.part` and renamed into place once
+    complete, so a crash never leaves a truncated file under the final name.
+    A file that is already present is skipped when its size matches the
+    server's Content-Length (checked with a HEAD request).
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        timeout: Tuple[float, float] = (10.0, 60.0),
+        chunk_size: int = 1024 * 1024,
+        max_retries: int = 3,
+        verify_size: bool = True,
+    ):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.verify_size = verify_size
+        self._session = None
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        # One pool sized to the worker count, connections are reused.
+        with self._lock:
+            if self._session is None:
+                retry = Retry(
+                    total=self.max_retries,
+                    backoff_factor=0.5,
+                    status_forcelist=RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET", "HEAD"}),
+                    raise_on_status=False,
+                )
+                adapter = HTTPAdapter(
+                    pool_connections=self.max_workers,
+                    pool_maxsize=self.max_workers,
+                    max_retries=retry,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._session = session
+            return self._session
+
+    @staticmethod
+    def _decoded_size(response) -> Optional[int]:
+        # Content-Length counts encoded bytes; with gzip & co. the size on
+        # disk is unknown up front.
+        length = response.headers.get("Content-Length")
+        if length is None or response.headers.get("Content-Encoding", "identity") != "identity":
+            return None
+        return int(length)
+
+    def _remote_size(self, url: str) -> Optional[int]:
+        response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        if response.status_code != 200:
+            return None
+        return self._decoded_size(response)
+
+    def _is_present(self, url: str, path: str) -> bool:
+        if not os.path.isfile(path) or os.path.getsize(path) == 0:
+            return False
+        if not self.verify_size:
+            return True
+        remote = self._remote_size(url)
+        return remote is None or remote == os.path.getsize(path)
+
+    def download(self, url: str, path: str) -> DownloadResult:
+        """
+        Download `url` to `path`. Raises on HTTP errors and short reads.
+        """
+        if self._is_present(url, path):
+            return DownloadResult(url, path, os.path.getsize(path), skipped=True)
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        part = path + ".part"
+        try:
+            with self.session.get(url, stream=True, timeout=self.timeout) as response:
+                if response.status_code != 200:
+                    raise Exception(f"Failed to download file: {response.status_code}")
+                expected = self._decoded_size(response)
+                written = 0
+                with open(part, "wb") as f:
+                    for block in response.iter_content(chunk_size=self.chunk_size):
+                        f.write(block)
+                        written += len(block)
+            if expected is not None and written != expected:
+                raise Exception(f"Incomplete download: {written} of {expected} bytes")
+            os.replace(part, path)
+        except BaseException:
+            if os.path.exists(part):
+                os.remove(part)
+            raise
+        return DownloadResult(url, path, written)
+
+    def _download_safe(self, item: Tuple[str, str]) -> DownloadResult:
+        url, path = item
+        try:
+            return self.download(url, path)
+        except Exception as e:
+            return DownloadResult(url, path, error=f"{type(e).__name__}: {e}")
+
+    def download_many(self, items: Iterable[Tuple[str, str]]) -> List[DownloadResult]:
+        """
+        Download (url, path) pairs concurrently. Results keep input order and
+        a failed download is reported in its result instead of raising.
+        """
+        items = list(items)
+        if len(items) <= 1 or self.max_workers == 1:
+            return [self._download_safe(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(self._download_safe, items))
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
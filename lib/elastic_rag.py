@@ -1,42 +1,308 @@
-from typing import List, Optional
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import ElasticsearchStore
-from langchain.chains import RetrievalQA
-from langchain.llms import OpenAI
-from langchain.schema import Document
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch, NotFoundError
+from elasticsearch.helpers import streaming_bulk
 
 from config.config import Config
+from lib import tracing
+
+if TYPE_CHECKING:
+    from lib.answer_cache import SemanticAnswerCache
+    from lib.vector_store import MetadataFilter, NumpyVectorStore
+    from langchain_community.llms import OpenAI
+    from langchain_community.vectorstores import ElasticsearchStore
+
+# LangChain's vector store, chains and splitters are imported on first use,
+# they dominate start up time otherwise.
+
+
+def content_id(text: str) -> str:
+    """
+    Deterministic document ID for a chunk, so re-ingesting it is a no-op.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class IngestReport:
+    chunks: int = 0
+    indexed: int = 0
+    skipped: int = 0
+    failed: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def chunks_per_sec(self) -> float:
+        return self.chunks / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class QueryResult:
+    question: str
+    answer: Optional[str] = None
+    sources: List[Document] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+@dataclass
+class QueryBatch:
+    results: List[QueryResult]
+    # Seconds spent per stage: "embed", "retrieve", "generate".
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    @property
+    def answers(self) -> List[Optional[str]]:
+        return [result.answer for result in self.results]
 
 
 class ElasticRAG:
+    """
+    Retrieval augmented generation over an Elasticsearch vector index.
+
+    An optional NumpyVectorStore can take part in retrieval. With
+    `vector_store_mode="cache"` ingested chunks are written to both (chunks
+    already indexed are copied from Elasticsearch), and questions whose `k`
+    best local hits all score at least `local_min_score` never reach
+    Elasticsearch. With `"standalone"` the local store is the only backend
+    and no cluster is needed.
+
+    With an `answer_cache`, a question similar to one answered before from
+    the same retrieved chunks reuses that answer instead of calling the LLM.
+    """
+
+    VECTOR_STORE_MODES = ("cache", "standalone")
+
     def __init__(
         self,
         es_username: str,
         es_password,
         embedding_model: Optional[Embeddings] = None,  # Accepts any embedding model
-        llm_model: Optional[OpenAI] = None,
+        llm_model: Optional["OpenAI"] = None,
         chunk_size: int = 500,
         chunk_overlap: int = 50,
+        batch_size: int = 128,
+        k: int = 4,
+        num_candidates: int = 50,
+        max_concurrency: int = 5,
+        vector_store: Optional["NumpyVectorStore"] = None,
+        vector_store_mode: str = "cache",
+        answer_cache: Optional["SemanticAnswerCache"] = None,
+        local_min_score: float = 0.8,
     ):
-        self.index_name = Config.get("RAG_INDEX")
+        if vector_store_mode not in self.VECTOR_STORE_MODES:
+            raise ValueError(f"vector_store_mode must be one of {self.VECTOR_STORE_MODES}, not {vector_store_mode!r}")
+        if vector_store is None and vector_store_mode == "standalone":
+            raise ValueError("The standalone mode needs a vector_store.")
+        settings = Config.load()
+        self.index_name = settings.rag_index
         self.embedding_model = embedding_model
-        self.llm_model = llm_model or OpenAI(temperature=0)
+        if llm_model is None:
+            from langchain_community.llms import OpenAI
+            llm_model = OpenAI(temperature=0)
+        self.llm_model = llm_model
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.batch_size = batch_size
+        self.k = k
+        self.num_candidates = num_candidates
+        self.max_concurrency = max_concurrency
+        self._text_splitter = None
         self.vectorstore = None
         self.qa_chain = None
+        self.local_store = vector_store
+        self.standalone = vector_store_mode == "standalone"
+        self.local_min_score = local_min_score
+        self.answer_cache = answer_cache
+        self._combine_chain = None
+        self._index_ready = False
         self.es_client = Elasticsearch(
-            [Config.get("ES_HOST")],
+            [settings.es_host],
             basic_auth=(es_username, es_password),
             verify_certs=False
         )
 
-    def ingest_documents(self, documents: List[str]):
+    @property
+    def text_splitter(self):
+        if self._text_splitter is None:
+            from langchain_text_splitters import RecursiveCharacterTextSplitter
+            self._text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
+            )
+        return self._text_splitter
+
+    def _get_vectorstore(self) -> "ElasticsearchStore":
+        # One long-lived store per instance, created on first use.
+        if self.vectorstore is None:
+            from langchain_community.vectorstores import ElasticsearchStore
+            self.vectorstore = ElasticsearchStore(
+                index_name=self.index_name,
+                embedding=self.embedding_model,
+                es_connection=self.es_client,
+            )
+        return self.vectorstore
+
+    def _get_qa_chain(self):
+        if self.qa_chain is None:
+            from langchain.chains import RetrievalQA
+            self.qa_chain = RetrievalQA.from_chain_type(
+                llm=self.llm_model, retriever=self._get_vectorstore().as_retriever()
+            )
+        return self.qa_chain
+
+    def _get_combine_chain(self):
+        if self.qa_chain is not None or not self.standalone:
+            return self._get_qa_chain().combine_documents_chain
+        # Standalone: the "stuff" chain alone, without an Elasticsearch retriever.
+        if self._combine_chain is None:
+            from langchain.chains.question_answering import load_qa_chain
+            self._combine_chain = load_qa_chain(self.llm_model, chain_type="stuff")
+        return self._combine_chain
+
+    def _index_exists(self) -> bool:
+        if self.standalone:
+            return len(self.local_store) > 0
+        if not self._index_ready:
+            self._index_ready = bool(self.es_client.indices.exists(index=self.index_name))
+        return self._index_ready
+
+    def _existing_ids(self, ids: List[str]) -> set:
+        if self.standalone:
+            return self.local_store.contains(ids)
+        if not self._index_ready:
+            return set()
+        try:
+            response = self.es_client.mget(index=self.index_name, ids=ids, source=False)
+        except NotFoundError:
+            return set()
+        return {doc["_id"] for doc in response["docs"] if doc.get("found")}
+
+    def _copy_to_local_store(self, ids: List[str]):
+        # Chunks indexed by an earlier run: the local store needs them too,
+        # or questions about them would be answered from other chunks.
+        if not ids:
+            return
+        store = self._get_vectorstore()
+        response = self.es_client.mget(
+            index=self.index_name, ids=ids,
+            source=[store.query_field, store.vector_query_field, "metadata"],
+        )
+        found = [
+            (doc["_id"], doc["_source"]) for doc in response["docs"]
+            if doc.get("found") and store.vector_query_field in doc.get("_source", {})
+        ]
+        if found:
+            self.local_store.add(
+                [doc_id for doc_id, _ in found],
+                [source.get(store.query_field, "") for _, source in found],
+                [source[store.vector_query_field] for _, source in found],
+                [source.get("metadata", {}) for _, source in found],
+            )
+
+    def _ensure_index(self, dims_length: int):
+        if not self.standalone and not self._index_ready:
+            self._get_vectorstore()._create_index_if_not_exists(
+                index_name=self.index_name, dims_length=dims_length
+            )
+            self._index_ready = True
+
+    def _ingest_batch(self, chunks: List[Document], report: IngestReport):
+        ids = [content_id(chunk.page_content) for chunk in chunks]
+        unique = dict(zip(ids, chunks))
+        existing = self._existing_ids(list(unique))
+        new = {doc_id: chunk for doc_id, chunk in unique.items() if doc_id not in existing}
+        report.skipped += len(chunks) - len(new)
+        if existing and self.local_store is not None and not self.standalone:
+            self._copy_to_local_store(list(existing - self.local_store.contains(existing)))
+        if not new:
+            return
+
+        texts = [chunk.page_content for chunk in new.values()]
+        with tracing.span("rag.embed") as span:
+            vectors = self.embedding_model.embed_documents(texts)
+            span.add("texts", len(texts))
+        if self.local_store is not None:
+            added = self.local_store.add(
+                list(new), texts, vectors, [chunk.metadata for chunk in new.values()]
+            )
+            if self.standalone:
+                report.indexed += added
+                return
+        self._ensure_index(len(vectors[0]))
+
+        store = self._get_vectorstore()
+        actions = (
+            {
+                "_op_type": "index",
+                "_index": self.index_name,
+                "_id": doc_id,
+                store.query_field: text,
+                store.vector_query_field: vector,
+                "metadata": chunk.metadata,
+            }
+            for (doc_id, chunk), text, vector in zip(new.items(), texts, vectors)
+        )
+        with tracing.span("rag.bulk") as span:
+            span.add("docs", len(new))
+            for ok, item in streaming_bulk(
+                self.es_client, actions, chunk_size=self.batch_size,
+                raise_on_error=False, raise_on_exception=False,
+            ):
+                if ok:
+                    report.indexed += 1
+                else:
+                    report.failed += 1
+                    report.errors.append(str(item.get("index", item).get("error")))
+
+    def ingest_chunks(self, chunks: Iterable[Document]) -> IngestReport:
+        """
+        Append already chunked documents to the vector store in batches of
+        `batch_size`. Chunks are keyed by content hash; chunks already in the
+        index are neither re-embedded nor re-indexed.
+        """
+        if self.embedding_model is None:
+            raise ValueError("An embedding model must be provided.")
+
+        report = IngestReport()
+        started_at = time.perf_counter()
+        self._index_exists()
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                self._run_batch(batch, report)
+                batch = []
+        if batch:
+            self._run_batch(batch, report)
+
+        if report.indexed and not self.standalone:
+            self.es_client.indices.refresh(index=self.index_name)
+        report.seconds = time.perf_counter() - started_at
+        tracing.observe(
+            "rag.ingest", duration_ms=report.seconds * 1000, chunks=report.chunks,
+            indexed=report.indexed, skipped=report.skipped, failed=report.failed,
+        )
+        return report
+
+    def _run_batch(self, batch: List[Document], report: IngestReport):
+        report.chunks += len(batch)
+        report.batches += 1
+        try:
+            self._ingest_batch(batch, report)
+        except Exception as e:
+            report.failed += len(batch)
+            report.errors.append(f"batch {report.batches}: {e}")
+
+    def ingest_documents(self, documents: List[str]) -> IngestReport:
         """
         Ingest raw text documents (list of strings),
-        chunk them and create Elasticsearch vector store.
+        chunk them and append them to the Elasticsearch vector store.
         """
         if self.embedding_model is None:
             raise ValueError("An embedding model must be provided.")
@@ -45,35 +311,212 @@ class ElasticRAG:
         docs = [Document(page_content=d) for d in documents]
 
         # Split documents into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size, chunk_overlap=self.chunk_overlap
-        )
-        split_docs = text_splitter.split_documents(docs)
-
-        # Create Elasticsearch vector store
-        self.vectorstore = ElasticsearchStore.from_documents(
-            split_docs,
-            embedding=self.embedding_model,
-            index_name=self.index_name,
-            es_connection=self.es_client,
-        )
-
-        # Create RetrievalQA chain
-        self.qa_chain = RetrievalQA.from_chain_type(
-            llm=self.llm_model, retriever=self.vectorstore.as_retriever()
-        )
+        split_docs = self.text_splitter.split_documents(docs)
+        return self.ingest_chunks(split_docs)
 
     def ingest_from_loader(self, loader):
         """
         Ingest documents from a LangChain Document Loader
         """
         docs = loader.load()
-        self.ingest_documents([doc.page_content for doc in docs])
+        return self.ingest_documents([doc.page_content for doc in docs])
 
     def query(self, question: str) -> str:
         """
         Query the RAG system with a question string.
         """
-        if not self.qa_chain:
+        if not self._index_exists():
             raise ValueError("No documents ingested. Please call ingest_documents first.")
-        return self.qa_chain.run(question)
\ No newline at end of file
+        with tracing.span("rag.query"):
+            if self.local_store is None and self.answer_cache is None:
+                return self._get_qa_chain().run(question)
+            vector = self.embedding_model.embed_query(question)
+            documents, error = self._retrieve([vector], self.k, self.num_candidates)[0]
+            if error is not None:
+                raise RuntimeError(f"Retrieval failed: {error}")
+            cached = self._cached_answers([vector], [documents])[0]
+            if cached is not None:
+                return cached
+            combine_chain = self._get_combine_chain()
+            output = combine_chain.invoke({"input_documents": documents, "question": question})
+            answer = output[combine_chain.output_key]
+            self._remember_answers([question], [vector], [documents], [answer])
+            return answer
+
+    @staticmethod
+    def _chunk_ids(documents: List[Document]) -> List[str]:
+        return [document.metadata.get("_id") for document in documents]
+
+    def _cached_answers(self, vectors: List[List[float]], documents: List[List[Document]]) -> List[Optional[str]]:
+        if self.answer_cache is None:
+            return [None] * len(vectors)
+        return self.answer_cache.get_many(vectors, [self._chunk_ids(docs) for docs in documents])
+
+    def _remember_answers(self, questions, vectors, documents, answers):
+        if self.answer_cache is None:
+            return
+        # Only answers grounded in retrieved chunks are worth reusing.
+        keep = [i for i, (docs, answer) in enumerate(zip(documents, answers)) if docs and answer is not None]
+        if keep:
+            self.answer_cache.put_many(
+                [questions[i] for i in keep], [vectors[i] for i in keep],
+                [self._chunk_ids(documents[i]) for i in keep], [answers[i] for i in keep],
+            )
+
+    @staticmethod
+    def _metadata_query(metadata_filter: Optional[dict]) -> List[dict]:
+        # {key: value or [values]} as term(s) queries on the stored metadata.
+        clauses = []
+        for key, expected in (metadata_filter or {}).items():
+            if isinstance(expected, (list, tuple, set, frozenset)):
+                values = list(expected)
+                suffix = ".keyword" if values and all(isinstance(v, str) for v in values) else ""
+                clauses.append({"terms": {f"metadata.{key}{suffix}": values}})
+            else:
+                suffix = ".keyword" if isinstance(expected, str) else ""
+                clauses.append({"term": {f"metadata.{key}{suffix}": expected}})
+        return clauses
+
+    def _knn_search(
+        self, vector: List[float], k: int, num_candidates: int, source_includes, metadata_filter: Optional[dict] = None
+    ) -> dict:
+        store = self._get_vectorstore()
+        source = {"excludes": [store.vector_query_field]}
+        if source_includes is not None:
+            source = {"includes": list(source_includes)}
+        knn = {
+            "field": store.vector_query_field,
+            "query_vector": vector,
+            "k": k,
+            "num_candidates": num_candidates,
+        }
+        clauses = self._metadata_query(metadata_filter)
+        if clauses:
+            knn["filter"] = clauses
+        return {"knn": knn, "size": k, "_source": source}
+
+    @staticmethod
+    def _local_document(hit) -> Document:
+        return Document(page_content=hit.text, metadata={**hit.metadata, "_id": hit.id, "_score": hit.score})
+
+    def _retrieve(
+        self,
+        vectors: List[List[float]],
+        k: int,
+        num_candidates: int,
+        source_includes: Optional[List[str]] = None,
+        metadata_filter: Optional["MetadataFilter"] = None,
+    ) -> List[Tuple[Optional[List[Document]], Optional[str]]]:
+        """
+        (documents, error) per query vector. The local store answers first;
+        in cache mode a query with fewer than `k` local hits, or a hit below
+        `local_min_score`, goes on to a single `_msearch` together with the
+        other misses.
+        """
+        results = [None] * len(vectors)
+        remote = list(range(len(vectors)))
+        if self.local_store is not None:
+            remote = []
+            for i, hits in enumerate(self.local_store.search(vectors, k, metadata_filter)):
+                if self.standalone or (len(hits) >= k and hits[-1].score >= self.local_min_score):
+                    results[i] = ([self._local_document(hit) for hit in hits], None)
+                else:
+                    remote.append(i)
+            tracing.observe("rag.local_search", queries=len(vectors), local=len(vectors) - len(remote))
+        if not remote:
+            return results
+
+        searches = []
+        for i in remote:
+            searches.append({"index": self.index_name})
+            searches.append(self._knn_search(vectors[i], k, num_candidates, source_includes, metadata_filter))
+        responses = self.es_client.msearch(searches=searches)["responses"]
+        for i, response in zip(remote, responses):
+            if "error" in response:
+                results[i] = (None, str(response["error"]))
+            else:
+                results[i] = (self._hits_to_documents(response), None)
+        return results
+
+    def _hits_to_documents(self, response: dict) -> List[Document]:
+        store = self._get_vectorstore()
+        documents = []
+        for hit in response.get("hits", {}).get("hits", []):
+            source = hit.get("_source", {})
+            documents.append(Document(
+                page_content=source.get(store.query_field, ""),
+                metadata={**source.get("metadata", {}), "_id": hit.get("_id"), "_score": hit.get("_score")},
+            ))
+        return documents
+
+    def _answer(self, question: str, documents: List[Document]) -> QueryResult:
+        try:
+            combine_chain = self._get_combine_chain()
+            output = combine_chain.invoke({"input_documents": documents, "question": question})
+            return QueryResult(question, output[combine_chain.output_key], documents)
+        except Exception as e:
+            return QueryResult(question, None, documents, str(e))
+
+    def query_many(
+        self,
+        questions: List[str],
+        k: Optional[int] = None,
+        num_candidates: Optional[int] = None,
+        source_includes: Optional[List[str]] = None,
+        metadata_filter: Optional["MetadataFilter"] = None,
+    ) -> QueryBatch:
+        """
+        Answer several questions at once: one batched embedding call, one
+        `_msearch` for all kNN retrievals, and concurrent answer generation.
+        Vectors are excluded from the returned `_source` unless
+        `source_includes` says otherwise. `metadata_filter` restricts
+        retrieval to chunks whose metadata matches {key: value or [values]};
+        a predicate over the metadata works with the standalone store only.
+        """
+        if not questions:
+            return QueryBatch(results=[])
+        if callable(metadata_filter) and not self.standalone:
+            raise ValueError("Predicate metadata filters need the standalone vector store.")
+        if not self._index_exists():
+            raise ValueError("No documents ingested. Please call ingest_documents first.")
+        k = k or self.k
+        num_candidates = max(num_candidates or self.num_candidates, k)
+        timings = {}
+
+        started_at = time.perf_counter()
+        vectors = self.embedding_model.embed_documents(list(questions))
+        timings["embed"] = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        retrieved = self._retrieve(vectors, k, num_candidates, source_includes, metadata_filter)
+        timings["retrieve"] = time.perf_counter() - started_at
+
+        started_at = time.perf_counter()
+        results = [None] * len(questions)
+        pending = []
+        for i, (question, (documents, error)) in enumerate(zip(questions, retrieved)):
+            if error is not None:
+                results[i] = QueryResult(question, error=error)
+            else:
+                pending.append((i, question, documents))
+        cached = self._cached_answers([vectors[i] for i, _, _ in pending], [docs for _, _, docs in pending])
+        for (i, question, docs), answer in zip(pending, cached):
+            if answer is not None:
+                results[i] = QueryResult(question, answer, docs)
+        pending = [entry for entry, answer in zip(pending, cached) if answer is None]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(pending) or 1))) as executor:
+            futures = [(i, executor.submit(self._answer, question, docs)) for i, question, docs in pending]
+            for i, future in futures:
+                results[i] = future.result()
+        self._remember_answers(
+            [results[i].question for i, _, _ in pending], [vectors[i] for i, _, _ in pending],
+            [docs for _, _, docs in pending], [results[i].answer for i, _, _ in pending],
+        )
+        timings["generate"] = time.perf_counter() - started_at
+
+        tracing.observe(
+            "rag.query_many", questions=len(questions),
+            failed=sum(result.error is not None for result in results),
+            **{f"{stage}_ms": seconds * 1000 for stage, seconds in timings.items()},
+        )
+        return QueryBatch(results=results, timings=timings)
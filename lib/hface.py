@@ -1,29 +1,150 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as date_type, timedelta
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from config.config import Config
 
+
 class HuggingFaceClient:
-    def __init__(self, api_token=None):
-        self.api_token = Config.get("HUGGING_FACE_READ_ONLY_TOKEN")
-        self.base_url = "https://huggingface.co/api/daily_papers?date=2025-07-22"
+    """
+    Client for the Hugging Face daily papers feed.
+
+    With `cache_dir` set, each day's response is kept on disk together with
+    its ETag and Last-Modified headers and revalidated on the next fetch, so
+    an unchanged day costs a single 304 round trip. Parsed responses are also
+    kept in memory for the lifetime of the client.
+    """
+
+    def __init__(self, api_token=None, cache_dir=None, max_workers: int = 4, timeout=(10.0, 30.0)):
+        self.api_token = api_token or Config.load().hugging_face_read_only_token
+        self.base_url = "https://huggingface.co/api/daily_papers"
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._memory = {}
+        self._lock = threading.Lock()
+        self._session = None
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def session(self) -> requests.Session:
+        with self._lock:
+            if self._session is None:
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_workers)
+                self._session = requests.Session()
+                self._session.mount("https://", adapter)
+                self._session.mount("http://", adapter)
+            return self._session
+
+    @staticmethod
+    def _date_str(date) -> str:
+        return date.strftime("%Y-%m-%d") if isinstance(date, date_type) else str(date)
+
+    def _cache_path(self, date: str) -> str:
+        return os.path.join(self.cache_dir, f"daily_papers_{date}.json")
+
+    def _cached(self, date: str):
+        """
+        Returns the cached entry for a date ({"etag", "last_modified",
+        "data"}) from memory, else from disk, else None.
+        """
+        with self._lock:
+            entry = self._memory.get(date)
+        if entry is not None or not self.cache_dir:
+            return entry
+        try:
+            with open(self._cache_path(date), "rb") as f:
+                entry = orjson.loads(f.read())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+        with self._lock:
+            self._memory[date] = entry
+        return entry
+
+    def _store(self, date: str, entry: dict, body: bytes):
+        with self._lock:
+            self._memory[date] = entry
+        if not self.cache_dir:
+            return
+        # Written next to the final name and renamed, never half-written.
+        path = self._cache_path(date)
+        with open(path + ".part", "wb") as f:
+            f.write(orjson.dumps({
+                "etag": entry["etag"],
+                "last_modified": entry["last_modified"],
+                "data": orjson.Fragment(body),
+            }))
+        os.replace(path + ".part", path)
 
     def get_research_papers(self, date):
-        url = f"{self.base_url}".format(date=date)
+        date = self._date_str(date)
         headers = {}
         if self.api_token:
             headers["Authorization"] = f"Bearer {self.api_token}"
-        response = requests.get(url, headers=headers)
+        cached = self._cached(date)
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        response = self.session.get(self.base_url, params={"date": date}, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            return cached["data"]
         response.raise_for_status()
-        data = response.json()
+        data = orjson.loads(response.content)
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag or last_modified:
+            self._store(date, {"etag": etag, "last_modified": last_modified, "data": data}, response.content)
         return data
 
+    def get_research_papers_range(self, start, end):
+        """
+        Papers for every day from `start` to `end` (inclusive), fetched
+        concurrently. A paper featured on several days is returned once, at
+        its first day; order is by day, then feed order.
+        """
+        start = date_type.fromisoformat(self._date_str(start))
+        end = date_type.fromisoformat(self._date_str(end))
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not days:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(days)))) as executor:
+            per_day = list(executor.map(self.get_research_papers, days))
+        return self.deduplicate(paper for papers in per_day for paper in papers)
+
+    @staticmethod
+    def deduplicate(papers):
+        seen = set()
+        unique = []
+        for paper in papers:
+            paper_id = (paper.get("paper") or {}).get("id") or paper.get("title")
+            if paper_id in seen:
+                continue
+            seen.add(paper_id)
+            unique.append(paper)
+        return unique
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
 if __name__ == "__main__":
     # Example usage
     client = HuggingFaceClient()
     try:
-        papers = client.get_research_papers()
+        papers = client.get_research_papers(date_type.today())
         for paper in papers:
             print(f"Title: {paper.get('title', 'No title')}")
             print(f"Authors: {paper.get('authors', 'No authors')}")
             print(f"Summary: {paper.get('summary', 'No summary')}\n")
     except requests.RequestException as e:
-        print(f"Error fetching papers: {e}")
\ No newline at end of file
+        print(f"Error fetching papers: {e}")
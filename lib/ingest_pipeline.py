@@ -0,0 +1,40 @@
+from lib.pdf_loader import iter_pdf_pages
+from lib.pdf_parallel import extract_documents
+from lib.rag_chunking import iter_chunks
+
+
+def tap(items, callback):
+    """
+    Pass items through unchanged, calling `callback` on each one.
+    """
+    for item in items:
+        callback(item)
+        yield item
+
+
+def ingest_pdf(file_path, elastic_rag, chunk_size: int = 1000, chunk_overlap: int = 100, on_chunk=None,
+               max_workers=None, executor=None):
+    """
+    Stream a PDF into ElasticRAG: lazy page iteration, incremental chunking,
+    then micro-batched embedding and bulk indexing. At most
+    `elastic_rag.batch_size` chunks are held at once and the first batch is
+    indexed before the rest of the PDF is parsed.
+
+    With `max_workers`, or a shared process pool as `executor`, the pages are
+    extracted up front instead, trading the streaming behaviour for
+    parallel parsing.
+    """
+    if max_workers or executor is not None:
+        pages = iter(extract_documents([file_path], max_workers, executor))
+    else:
+        pages = iter_pdf_pages(file_path)
+    chunks = iter_chunks(pages, chunk_size, chunk_overlap)
+    if on_chunk is not None:
+        chunks = tap(chunks, on_chunk)
+    # Index at ElasticRAG's own chunk size, as ingest_documents does.
+    index_chunks = (
+        piece
+        for chunk in chunks
+        for piece in elastic_rag.text_splitter.split_documents([chunk])
+    )
+    return elastic_rag.ingest_chunks(index_chunks)
@@ -0,0 +1,67 @@
+import time
+
+# Explicit mappings for the fields written by LogRecordSerializer. Mapping is
+# not dynamic: other `extra` fields are kept in _source but never indexed, so
+# new field names do not grow the cluster mapping.
+LOG_MAPPINGS = {
+    "dynamic": False,
+    "properties": {
+        "@timestamp": {"type": "date"},
+        "host": {"type": "keyword"},
+        "logger": {"type": "keyword"},
+        "level": {"type": "keyword"},
+        "message": {"type": "text"},
+        "module": {"type": "keyword"},
+        "line": {"type": "integer"},
+        "func": {"type": "keyword"},
+        "process": {"type": "integer"},
+        "thread": {"type": "keyword"},
+        "exception": {"type": "text", "index": False},
+        "job_id": {"type": "keyword"},
+    },
+}
+
+_DAY = 24 * 60 * 60
+
+
+class DailyIndex:
+    """
+    Resolves `<prefix><YYYY.MM.DD>` for the current UTC day.
+
+    The name is formatted once per day; `resolve()` is a single comparison
+    until UTC midnight passes, so it is cheap enough to call per batch.
+    """
+
+    def __init__(self, prefix: str, date_format: str = "%Y.%m.%d"):
+        self.prefix = prefix
+        self.date_format = date_format
+        self._current = ("", 0.0, 0.0)
+
+    def resolve(self, now=None) -> str:
+        now = time.time() if now is None else now
+        name, day_start, rollover_at = self._current
+        if day_start <= now < rollover_at:
+            return name
+        day_start = now - (now % _DAY)
+        name = f"{self.prefix}{time.strftime(self.date_format, time.gmtime(day_start))}"
+        self._current = (name, day_start, day_start + _DAY)
+        return name
+
+
+def ensure_index_template(es, prefix: str, name=None, shards: int = 1, replicas: int = 1):
+    """
+    Create or update the index template applied to every daily log index.
+    """
+    es.indices.put_index_template(
+        name=name or f"{prefix.rstrip('-_.')}-template",
+        index_patterns=[f"{prefix}*"],
+        priority=100,
+        template={
+            "settings": {
+                "number_of_shards": shards,
+                "number_of_replicas": replicas,
+                "refresh_interval": "5s",
+            },
+            "mappings": LOG_MAPPINGS,
+        },
+    )
@@ -0,0 +1,93 @@
+import logging
+import socket
+import time
+
+import orjson
+
+# Attributes every LogRecord carries; anything else came in through `extra`.
+_RECORD_ATTRS = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+# Top level fields written by the serializer, `extra` may not override them.
+SCHEMA_FIELDS = (
+    "@timestamp",
+    "host",
+    "logger",
+    "level",
+    "message",
+    "module",
+    "line",
+    "func",
+    "process",
+    "thread",
+    "exception",
+)
+_RESERVED = frozenset(SCHEMA_FIELDS)
+
+
+class LogRecordSerializer:
+    """
+    Encodes a LogRecord to a JSON document with a fixed field schema.
+
+    Only the known fields plus `extra` attributes are written, so `args`,
+    `exc_info` and other LogRecord internals never reach Elasticsearch.
+    Parts that do not change between records (host, logger name, level and
+    the timestamp up to the second) are encoded once and reused.
+    """
+
+    def __init__(self, hostname=None, formatter=None):
+        self.hostname = hostname or socket.gethostname()
+        self.formatter = formatter or logging.Formatter()
+        self._headers = {}
+        self._second = (None, "")
+
+    def _header(self, record) -> bytes:
+        key = (record.name, record.levelname)
+        header = self._headers.get(key)
+        if header is None:
+            header = orjson.dumps({
+                "host": self.hostname,
+                "logger": record.name,
+                "level": record.levelname,
+            })[:-1] + b","
+            self._headers[key] = header
+        return header
+
+    def timestamp(self, record) -> str:
+        second = int(record.created)
+        cached_second, prefix = self._second
+        if cached_second != second:
+            prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(second))
+            self._second = (second, prefix)
+        return f"{prefix}.{int(record.msecs):03d}Z"
+
+    def fields(self, record) -> dict:
+        """
+        Dynamic fields of the document, everything except the cached header.
+        """
+        fields = {
+            "@timestamp": self.timestamp(record),
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "func": record.funcName,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatter.formatException(record.exc_info)
+        if record.exc_text:
+            fields["exception"] = record.exc_text
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and key not in _RESERVED:
+                fields[key] = value
+        return fields
+
+    def encode(self, record) -> bytes:
+        body = orjson.dumps(self.fields(record), default=str)
+        return self._header(record) + body[1:]
+
+    def to_document(self, record) -> dict:
+        return orjson.loads(self.encode(record))
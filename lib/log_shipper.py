@@ -0,0 +1,297 @@
+import atexit
+import threading
+import time
+from collections import deque
+
+import orjson
+
+from lib.log_spool import CircuitBreaker
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST)
+
+
+class BulkShipper:
+    """
+    Background shipper that batches encoded log documents into `_bulk` requests.
+
+    Documents are queued as bytes by the caller and shipped from a single
+    daemon thread. A batch is flushed once it reaches `max_batch_size`
+    documents, `max_batch_bytes` bytes, or `flush_interval` seconds after
+    its first document was queued, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        es,
+        index_fn,
+        max_queue_size: int = 10000,
+        max_batch_size: int = 500,
+        max_batch_bytes: int = 5 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        overflow_policy: str = OVERFLOW_DROP_OLDEST,
+        block_timeout=None,
+        spool=None,
+        breaker=None,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unsupported overflow policy: {overflow_policy}")
+        self.es = es
+        self.index_fn = index_fn
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_bytes = max_batch_bytes
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.block_timeout = block_timeout
+        # With a spool, batches that cannot be shipped are written to disk
+        # while the circuit is open and replayed once the cluster recovers.
+        self.spool = spool
+        self.breaker = breaker
+        if spool is not None and breaker is None:
+            self.breaker = CircuitBreaker()
+
+        self.shipped = 0
+        self.dropped = 0
+        self.failed = 0
+        self.spooled = 0
+        self.replayed = 0
+
+        self._queue = deque()
+        self._queued_bytes = 0
+        self._first_queued_at = None
+        self._in_flight = 0
+        self._flush_requested = False
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._thread = threading.Thread(
+            target=self._run, name="es-bulk-shipper", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, document: bytes) -> bool:
+        """
+        Queue one encoded document. Returns False if it was dropped.
+        """
+        with self._cond:
+            if self._closed:
+                self.dropped += 1
+                return False
+            if len(self._queue) >= self.max_queue_size:
+                if not self._make_room():
+                    self.dropped += 1
+                    return False
+            if not self._queue:
+                self._first_queued_at = time.monotonic()
+                self._cond.notify_all()
+            self._queue.append(document)
+            self._queued_bytes += len(document)
+            if (
+                len(self._queue) >= self.max_batch_size
+                or self._queued_bytes >= self.max_batch_bytes
+            ):
+                self._cond.notify_all()
+            return True
+
+    def _make_room(self) -> bool:
+        # Called with the lock held and the queue full.
+        if self.overflow_policy == OVERFLOW_DROP_NEWEST:
+            return False
+        if self.overflow_policy == OVERFLOW_DROP_OLDEST:
+            oldest = self._queue.popleft()
+            self._queued_bytes -= len(oldest)
+            self.dropped += 1
+            return True
+        deadline = None
+        if self.block_timeout is not None:
+            deadline = time.monotonic() + self.block_timeout
+        while len(self._queue) >= self.max_queue_size and not self._closed:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+            self._cond.wait(remaining)
+        return not self._closed
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Ship everything queued so far and wait for it to complete.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._queue or self._in_flight:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                if not self._thread.is_alive():
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: float = 5.0):
+        """
+        Flush pending documents and stop the background thread.
+        """
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+        if self.spool is not None:
+            self.spool.close()
+        try:
+            atexit.unregister(self.close)
+        except Exception:
+            pass
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "shipped": self.shipped,
+                "dropped": self.dropped,
+                "failed": self.failed,
+                "spooled": self.spooled,
+                "replayed": self.replayed,
+            }
+
+    def _batch_ready(self) -> bool:
+        if not self._queue:
+            return False
+        if self._closed or self._flush_requested:
+            return True
+        if len(self._queue) >= self.max_batch_size:
+            return True
+        if self._queued_bytes >= self.max_batch_bytes:
+            return True
+        return time.monotonic() - self._first_queued_at >= self.flush_interval
+
+    def _take_batch(self):
+        with self._cond:
+            while not self._batch_ready():
+                if self._closed and not self._queue:
+                    return None
+                if not self._queue:
+                    self._flush_requested = False
+                    if self.spool is not None and self.spool.has_pending:
+                        # Wake up periodically to retry the spooled backlog.
+                        self._cond.wait(self.breaker.reset_timeout)
+                        if not self._queue:
+                            return []
+                        continue
+                    self._cond.wait()
+                    continue
+                wait_for = self.flush_interval - (
+                    time.monotonic() - self._first_queued_at
+                )
+                self._cond.wait(max(wait_for, 0))
+
+            batch = []
+            batch_bytes = 0
+            while self._queue and len(batch) < self.max_batch_size:
+                size = len(self._queue[0])
+                if batch and batch_bytes + size > self.max_batch_bytes:
+                    break
+                batch.append(self._queue.popleft())
+                batch_bytes += size
+            self._queued_bytes -= batch_bytes
+            if self._queue:
+                self._first_queued_at = time.monotonic()
+            else:
+                self._flush_requested = False
+            self._in_flight = len(batch)
+            # Wake up producers blocked on a full queue.
+            self._cond.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if batch is None:
+                return
+            try:
+                if batch:
+                    self._ship(batch)
+                if self.spool is not None and self.spool.has_pending and self.breaker.allow():
+                    self._replay()
+            except Exception as e:
+                print(f"Log shipper error: {e}")
+            finally:
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _ship(self, batch):
+        action = orjson.dumps({"index": {"_index": self.index_fn()}})
+        operations = []
+        for document in batch:
+            operations.append(action)
+            operations.append(document)
+
+        if self.spool is not None and not self.breaker.allow():
+            self._spool(operations)
+            return
+        try:
+            response = self.es.bulk(operations=operations)
+        except Exception as e:
+            if self.spool is not None:
+                self.breaker.record_failure()
+                self._spool(operations)
+                return
+            self.failed += len(batch)
+            print(f"Failed to ship {len(batch)} logs to Elasticsearch: {e}")
+            return
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        failed = self._count_errors(response)
+        self.failed += failed
+        self.shipped += len(batch) - failed
+
+    def _spool(self, operations):
+        # Disk I/O outside the lock; `dropped` is shared with the producers.
+        dropped = self.spool.append(operations)
+        with self._cond:
+            self.dropped += dropped
+            self.spooled += len(operations) // 2
+
+    def _replay(self):
+        # Operations are replayed in `max_batch_size` chunks; a failure keeps
+        # the unsent remainder of the segment for the next attempt.
+        step = self.max_batch_size * 2
+        for segment in self.spool.segments():
+            operations = self.spool.read(segment)
+            for start in range(0, len(operations), step):
+                chunk = operations[start:start + step]
+                try:
+                    response = self.es.bulk(operations=chunk)
+                except Exception as e:
+                    self.breaker.record_failure()
+                    self.spool.rewrite(segment, operations[start:])
+                    print(f"Failed to replay spooled logs to Elasticsearch: {e}")
+                    return
+                self.breaker.record_success()
+                failed = self._count_errors(response)
+                self.failed += failed
+                self.replayed += len(chunk) // 2 - failed
+            self.spool.remove(segment)
+
+    @staticmethod
+    def _count_errors(response) -> int:
+        failed = 0
+        if response.get("errors"):
+            for item in response.get("items", []):
+                result = next(iter(item.values()), {})
+                if "error" in result:
+                    failed += 1
+        return failed
@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_SEGMENT_PREFIX = "spool-"
+_SEGMENT_SUFFIX = ".ndjson"
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and lets a single
+    probe through once `reset_timeout` seconds have passed.
+    """
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.state = HALF_OPEN
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.state = CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+
+class DiskSpool:
+    """
+    Append-only, size-bounded spool of `_bulk` operations on local disk.
+
+    Each entry is the action line and the document line exactly as they
+    would be sent to `_bulk`, so replay needs no re-serialization and keeps
+    the original index and `@timestamp`. Entries are written sequentially
+    to segment files; once `max_bytes` is exceeded the oldest segments are
+    deleted.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024,
+                 segment_bytes: int = 8 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._active = None
+        self._active_path = None
+        self._active_bytes = 0
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments = sorted(
+            name for name in os.listdir(directory)
+            if name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)
+        )
+        self._sizes = {
+            name: os.path.getsize(os.path.join(directory, name)) for name in self._segments
+        }
+        self._next_seq = 1
+        if self._segments:
+            last = self._segments[-1][len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]
+            self._next_seq = int(last) + 1
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._segments)
+
+    @property
+    def pending_bytes(self) -> int:
+        with self._lock:
+            return sum(self._sizes.values())
+
+    def append(self, operations) -> int:
+        """
+        Append action/document line pairs. Returns the number of records
+        dropped to stay within `max_bytes`.
+        """
+        data = b"\n".join(operations) + b"\n"
+        with self._lock:
+            dropped_before = self.dropped
+            if not self._make_room(len(data)):
+                self.dropped += len(operations) // 2
+                return self.dropped - dropped_before
+            if self._active is None or self._active_bytes >= self.segment_bytes:
+                self._open_segment()
+            self._active.write(data)
+            self._active.flush()
+            self._active_bytes += len(data)
+            self._sizes[self._active_path] = self._active_bytes
+            return self.dropped - dropped_before
+
+    def _make_room(self, size: int) -> bool:
+        # Drop the oldest segments until `size` more bytes fit. A batch that
+        # can never fit is dropped on its own, the spooled records are kept.
+        if size > self.max_bytes:
+            return False
+        while sum(self._sizes.values()) + size > self.max_bytes:
+            if not self._segments:
+                return False
+            if self._segments[0] == self._active_path:
+                self._seal()
+            oldest = self._segments[0]
+            self.dropped += self._read_lines(oldest).count(b"\n") // 2
+            self._delete(oldest)
+        return True
+
+    def _open_segment(self):
+        self._seal()
+        name = f"{_SEGMENT_PREFIX}{self._next_seq:012d}{_SEGMENT_SUFFIX}"
+        self._next_seq += 1
+        self._active = open(os.path.join(self.directory, name), "ab")
+        self._active_path = name
+        self._active_bytes = 0
+        self._segments.append(name)
+        self._sizes[name] = 0
+
+    def _seal(self):
+        if self._active is not None:
+            self._active.close()
+        self._active = None
+        self._active_path = None
+        self._active_bytes = 0
+
+    def _read_lines(self, name) -> bytes:
+        with open(os.path.join(self.directory, name), "rb") as f:
+            return f.read()
+
+    def _delete(self, name):
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except FileNotFoundError:
+            pass
+        self._segments.remove(name)
+        self._sizes.pop(name, None)
+
+    def segments(self):
+        """
+        Seal the active segment and return all segment names, oldest first.
+        """
+        with self._lock:
+            self._seal()
+            return list(self._segments)
+
+    def read(self, name):
+        """
+        Operations (action and document lines) stored in a segment.
+        """
+        with self._lock:
+            data = self._read_lines(name)
+        return [line for line in data.split(b"\n") if line]
+
+    def remove(self, name):
+        with self._lock:
+            self._delete(name)
+
+    def rewrite(self, name, operations):
+        """
+        Replace a segment with the operations that were not replayed yet.
+        """
+        with self._lock:
+            path = os.path.join(self.directory, name)
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(b"\n".join(operations) + b"\n")
+            os.replace(tmp_path, path)
+            self._sizes[name] = os.path.getsize(path)
+
+    def close(self):
+        with self._lock:
+            self._seal()
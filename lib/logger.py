@@ -1,16 +1,25 @@
 import logging
 import socket
-import json
-from datetime import datetime, UTC
+import threading
 from elasticsearch import Elasticsearch
 from config.config import Config
+from lib.log_index import DailyIndex, ensure_index_template
+from lib.log_serializer import LogRecordSerializer
+from lib.log_shipper import BulkShipper
+from lib.log_spool import CircuitBreaker, DiskSpool
 
 class ElasticsearchHandler(logging.Handler):
-    def __init__(self, hosts, index, username=None, password=None, api_key=None):
+    def __init__(self, hosts, index, username=None, password=None, api_key=None,
+                 async_shipping=False, shipper_options=None, manage_template=False,
+                 spool_dir=None, spool_max_bytes=256 * 1024 * 1024):
         super().__init__()
         self.hostname = socket.gethostname()
-        today = datetime.now(UTC).strftime("%Y.%m.%d")
-        self.index = f"{index}{today}"
+        self.serializer = LogRecordSerializer(self.hostname)
+        # The daily index is resolved per batch (per record in sync mode)
+        # and rolls over at UTC midnight.
+        self.daily_index = DailyIndex(index)
+        self.manage_template = manage_template
+        self._template_lock = threading.Lock()
 
         if api_key:
             self.es = Elasticsearch(
@@ -26,30 +35,90 @@ class ElasticsearchHandler(logging.Handler):
         else:
             self.es = Elasticsearch(hosts)
 
+        # In async mode records are queued and shipped in `_bulk` batches
+        # from a background thread instead of one `index()` call per record.
+        # A spool directory implies async mode: during an outage batches go
+        # to disk instead of stalling the logging threads.
+        self.shipper = None
+        if async_shipping or spool_dir:
+            options = dict(shipper_options or {})
+            if spool_dir:
+                options["spool"] = DiskSpool(spool_dir, max_bytes=spool_max_bytes)
+                options.setdefault("breaker", CircuitBreaker())
+            self.shipper = BulkShipper(self.es, self._current_index, **options)
+
+    @property
+    def index(self):
+        return self.daily_index.resolve()
+
+    def _current_index(self):
+        if self.manage_template:
+            self._ensure_template()
+        return self.daily_index.resolve()
+
+    def _ensure_template(self):
+        with self._template_lock:
+            if not self.manage_template:
+                return
+            # Only attempted once; a failure must not block log shipping.
+            self.manage_template = False
+            try:
+                ensure_index_template(self.es, self.daily_index.prefix)
+            except Exception as e:
+                print(f"Failed to create Elasticsearch index template: {e}")
+
     def emit(self, record):
-        log_entry = self.format(record)
         try:
+            document = self.serializer.encode(record)
+            if self.shipper is not None:
+                self.shipper.submit(document)
+                return
             self.es.index(
-                index=self.index,
-                body={
-                    "@timestamp": datetime.utcnow().isoformat(),
-                    "host": self.hostname,
-                    **record.__dict__
-                }
+                index=self._current_index(),
+                body=document
             )
         except Exception as e:
             print(f"Failed to send log to Elasticsearch: {e}")
 
+    def flush(self):
+        if self.shipper is not None:
+            self.shipper.flush()
+
+    def close(self):
+        if self.shipper is not None:
+            self.shipper.close()
+        super().close()
+
+    def stats(self):
+        """
+        Shipped, dropped and failed record counters of the async shipper.
+        """
+        if self.shipper is None:
+            return {}
+        return self.shipper.stats()
+
 def get_logger(name="app_logger"):
     logger = logging.getLogger(name)
     logger.setLevel(logging.DEBUG)
 
     if not logger.handlers:
+        settings = Config.load()
         es_handler = ElasticsearchHandler(
-            hosts=[Config.get("ES_HOST")],
-            index=Config.get("ES_INDEX"),
-            username=Config.get("ES_USERNAME"),
-            password=Config.get("ES_PASSWORD")
+            hosts=[settings.es_host],
+            index=settings.es_index,
+            username=settings.es_username,
+            password=settings.es_password,
+            manage_template=settings.es_manage_template,
+            spool_dir=settings.es_spool_dir,
+            spool_max_bytes=settings.es_spool_max_bytes,
+            async_shipping=settings.es_async_shipping,
+            shipper_options={
+                "max_queue_size": settings.es_queue_size,
+                "max_batch_size": settings.es_bulk_size,
+                "max_batch_bytes": settings.es_bulk_bytes,
+                "flush_interval": settings.es_flush_interval,
+                "overflow_policy": settings.es_queue_overflow,
+            }
         )
         es_handler.setFormatter(logging.Formatter('%(message)s'))
 
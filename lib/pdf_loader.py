@@ -1,11 +1,36 @@
 import asyncio
-from langchain_community.document_loaders import PyPDFLoader
+import time
+from lib import tracing
+from lib.pdf_parallel import extract_documents
 
-def pdf_loader(file_path):
+def iter_pdf_pages(file_path):
+    """
+    Yield pages one at a time without loading the whole document.
+    """
+    from langchain_community.document_loaders import PyPDFLoader
     loader = PyPDFLoader(file_path)
-    pages = []
+    if not tracing.is_enabled():
+        yield from loader.lazy_load()
+        return
+    # Time spent parsing each page, excluding the consumer's time between pages.
+    started_at = time.perf_counter()
     for page in loader.lazy_load():
-        pages.append(page)
+        tracing.observe("pdf.page", duration_ms=(time.perf_counter() - started_at) * 1000,
+                        chars=len(page.page_content))
+        yield page
+        started_at = time.perf_counter()
+
+def pdf_loader(file_path, max_workers=None, executor=None):
+    """
+    Load all pages. With `max_workers`, or a shared process pool as
+    `executor`, pages are extracted in a process pool.
+    """
+    with tracing.span("pdf.load") as span:
+        if max_workers or executor is not None:
+            pages = extract_documents([file_path], max_workers, executor)
+        else:
+            pages = list(iter_pdf_pages(file_path))
+        span.add("pages", len(pages))
     return pages
 
 if __name__ == "__main__":
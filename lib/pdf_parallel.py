@@ -0,0 +1,121 @@
+import functools
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional
+
+from pypdf import PdfReader
+from langchain_core.documents import Document
+
+
+class PageText(NamedTuple):
+    source: str
+    page: int
+    text: str
+    error: Optional[str] = None
+
+
+def _extract_with_pdfplumber(path: str, start: int, stop: Optional[int]):
+    import pdfplumber  # fallback only
+    with pdfplumber.open(path) as pdf:
+        pages = pdf.pages[start:stop]
+        return [(start + i, page.extract_text() or "") for i, page in enumerate(pages)]
+
+
+@functools.lru_cache(maxsize=8)
+def _open(path: str, mtime_ns: int) -> PdfReader:
+    return PdfReader(path)
+
+
+def _reader(path: str) -> PdfReader:
+    # Parsed once per process and reused by every page range of the file.
+    return _open(path, os.stat(path).st_mtime_ns)
+
+
+def _extract_range(task):
+    """
+    Worker: extract pages [start, stop) of one PDF. Falls back to
+    pdfplumber when pypdf cannot parse the file.
+    """
+    path, start, stop = task
+    try:
+        reader = _reader(path)
+        stop = len(reader.pages) if stop is None else stop
+        return path, [(i, reader.pages[i].extract_text() or "") for i in range(start, stop)], None
+    except Exception as e:
+        try:
+            return path, _extract_with_pdfplumber(path, start, stop), None
+        except Exception:
+            return path, [], f"{type(e).__name__}: {e}"
+
+
+def _page_count(path: str) -> Optional[int]:
+    try:
+        return len(_reader(path).pages)
+    except Exception:
+        return None
+
+
+def _tasks(paths: List[str], pages_per_task: int):
+    for path in paths:
+        count = _page_count(path)
+        if count is None:
+            # Unknown length (malformed file): one task, the worker falls back.
+            yield path, 0, None
+            continue
+        for start in range(0, count, pages_per_task):
+            yield path, start, min(start + pages_per_task, count)
+
+
+def extract_pages(
+    paths: Iterable[str],
+    max_workers: Optional[int] = None,
+    pages_per_task: int = 4,
+    executor: Optional[Executor] = None,
+) -> List[PageText]:
+    """
+    Extract page texts from many PDFs across a process pool.
+
+    Each PDF is split into ranges of `pages_per_task` pages so a single
+    large paper is also spread over the workers. Results are ordered by
+    input path, then page number. A PDF neither pypdf nor pdfplumber can read
+    yields one PageText with `error` set instead of raising.
+
+    Pass a long-lived `executor` to share one pool between papers; without
+    it a pool of `max_workers` is created for this call.
+    """
+    paths = list(paths)
+    order = {path: i for i, path in enumerate(paths)}
+    tasks = list(_tasks(paths, pages_per_task))
+    max_workers = max_workers or os.cpu_count() or 1
+
+    if len(tasks) <= 1 or (executor is None and max_workers == 1):
+        collected = [_extract_range(task) for task in tasks]
+    elif executor is not None:
+        collected = list(executor.map(_extract_range, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            collected = list(executor.map(_extract_range, tasks, chunksize=1))
+
+    pages = []
+    for path, page_texts, error in collected:
+        if error is not None:
+            pages.append(PageText(path, 0, "", error))
+        for page, text in page_texts:
+            pages.append(PageText(path, page, text))
+    pages.sort(key=lambda p: (order[p.source], p.page))
+    return pages
+
+
+def extract_documents(
+    paths: Iterable[str], max_workers: Optional[int] = None, executor: Optional[Executor] = None
+) -> List[Document]:
+    """
+    Same as `extract_pages`, as LangChain Documents shaped like PyPDFLoader's.
+    Failed PDFs are skipped.
+    """
+    return [
+        Document(page_content=page.text, metadata={"source": page.source, "page": page.page})
+        for page in extract_pages(paths, max_workers, executor=executor)
+        if page.error is None
+    ]
+
@@ -0,0 +1,250 @@
+import functools
+import os
+import queue
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from lib import tracing
+
+_DONE = object()
+
+
+class CheckpointStore:
+    """
+    Per-paper, per-stage checkpoints in SQLite.
+
+    A stage marked done keeps its (JSON serializable) result so a rerun can
+    skip the stage and hand the stored result to the next one. Failures are
+    recorded too, but never skip anything.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints (paper_id TEXT NOT NULL, stage TEXT NOT NULL, "
+            "status TEXT NOT NULL, result BLOB, error TEXT, updated_at REAL NOT NULL, "
+            "PRIMARY KEY (paper_id, stage))"
+        )
+        self._db.commit()
+
+    def get(self, paper_id: str, stage: str) -> Tuple[bool, Any]:
+        """
+        Returns (done, result) for a stage of a paper.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT result FROM checkpoints WHERE paper_id = ? AND stage = ? AND status = 'done'",
+                (paper_id, stage),
+            ).fetchone()
+        if row is None:
+            return False, None
+        return True, orjson.loads(row[0])
+
+    def mark_done(self, paper_id: str, stage: str, result: Any = None):
+        self._write(paper_id, stage, "done", orjson.dumps(result, default=str), None)
+
+    def mark_failed(self, paper_id: str, stage: str, error: str):
+        self._write(paper_id, stage, "failed", None, error)
+
+    def _write(self, paper_id, stage, status, result, error):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (paper_id, stage, status, result, error, time.time()),
+            )
+            self._db.commit()
+
+    def failures(self) -> Dict[str, Tuple[str, str]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT paper_id, stage, error FROM checkpoints WHERE status = 'failed'"
+            ).fetchall()
+        return {paper_id: (stage, error) for paper_id, stage, error in rows}
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+@dataclass
+class Stage:
+    name: str
+    # Called with the PaperTask, returns the stage result.
+    fn: Callable[["PaperTask"], Any]
+    workers: int = 1
+    # Called with a checkpointed result; False re-runs the stage, e.g. when
+    # a downloaded file has since been removed.
+    still_valid: Optional[Callable[[Any], bool]] = None
+
+
+@dataclass
+class PaperTask:
+    paper_id: str
+    paper: dict = field(default_factory=dict)
+    # Stage name -> result, filled in as the paper moves through the stages.
+    results: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class RunReport:
+    completed: List[str] = field(default_factory=list)
+    # Paper ID -> (stage, error).
+    failed: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    # Stage name -> papers skipped thanks to a checkpoint.
+    skipped: Dict[str, int] = field(default_factory=dict)
+    # Stage name -> seconds spent in the stage, summed over papers.
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+class Orchestrator:
+    """
+    Runs papers through a sequence of stages.
+
+    Every stage has its own worker threads and reads from a bounded queue,
+    so a slow stage holds back the ones before it instead of letting work
+    pile up in memory. A paper whose stage raises is recorded and dropped;
+    the other papers carry on. With a CheckpointStore, stages a paper
+    already completed are skipped on the next run.
+    """
+
+    def __init__(self, stages: List[Stage], checkpoints: Optional[CheckpointStore] = None, queue_size: int = 4):
+        if not stages:
+            raise ValueError("At least one stage is required.")
+        self.stages = stages
+        self.checkpoints = checkpoints
+        self.queue_size = queue_size
+
+    def _process(self, stage: Stage, task: PaperTask, report: RunReport, lock: threading.Lock) -> bool:
+        """
+        Run one stage for one paper. Never raises: any failure, including
+        one of the checkpoint store, drops the paper and keeps the worker.
+        """
+        try:
+            return self._run_stage(stage, task, report, lock)
+        except Exception as e:
+            with lock:
+                # Keep the stage's own error if recording it is what failed.
+                report.failed.setdefault(task.paper_id, (stage.name, f"{type(e).__name__}: {e}"))
+            return False
+
+    def _run_stage(self, stage: Stage, task: PaperTask, report: RunReport, lock: threading.Lock) -> bool:
+        if self.checkpoints is not None:
+            done, result = self.checkpoints.get(task.paper_id, stage.name)
+            if done and (stage.still_valid is None or stage.still_valid(result)):
+                task.results[stage.name] = result
+                with lock:
+                    report.skipped[stage.name] = report.skipped.get(stage.name, 0) + 1
+                return True
+
+        started_at = time.perf_counter()
+        try:
+            with tracing.span(f"stage.{stage.name}"):
+                result = stage.fn(task)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            with lock:
+                report.failed[task.paper_id] = (stage.name, error)
+            if self.checkpoints is not None:
+                self.checkpoints.mark_failed(task.paper_id, stage.name, error)
+            return False
+        finally:
+            with lock:
+                report.stage_seconds[stage.name] = (
+                    report.stage_seconds.get(stage.name, 0.0) + time.perf_counter() - started_at
+                )
+
+        task.results[stage.name] = result
+        if self.checkpoints is not None:
+            self.checkpoints.mark_done(task.paper_id, stage.name, result)
+        return True
+
+    def _worker(self, index: int, queues: List[queue.Queue], report: RunReport, lock: threading.Lock):
+        stage = self.stages[index]
+        inbox = queues[index]
+        while True:
+            task = inbox.get()
+            if task is _DONE:
+                # Leave the marker for the other workers of this stage.
+                inbox.put(_DONE)
+                return
+            if not self._process(stage, task, report, lock):
+                continue
+            if index + 1 < len(self.stages):
+                queues[index + 1].put(task)
+            else:
+                with lock:
+                    report.completed.append(task.paper_id)
+
+    def run(self, tasks: Iterable[PaperTask]) -> RunReport:
+        report = RunReport()
+        lock = threading.Lock()
+        started_at = time.perf_counter()
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        workers = []
+        for index, stage in enumerate(self.stages):
+            threads = [
+                threading.Thread(
+                    target=self._worker, args=(index, queues, report, lock),
+                    name=f"stage-{stage.name}-{n}", daemon=True,
+                )
+                for n in range(max(1, stage.workers))
+            ]
+            for thread in threads:
+                thread.start()
+            workers.append(threads)
+
+        for task in tasks:
+            queues[0].put(task)
+        # Close the stages in order: a stage is done once its workers are.
+        for index, threads in enumerate(workers):
+            queues[index].put(_DONE)
+            for thread in threads:
+                thread.join()
+
+        report.seconds = time.perf_counter() - started_at
+        return report
+
+
+def exclusive(lock_path: Optional[str] = None):
+    """
+    Decorator: skip a call while another call is still running, in this
+    process and, with `lock_path`, in any other process using the same file.
+    A skipped call returns None. Used to keep scheduled runs from overlapping.
+    """
+    def decorator(fn):
+        running = threading.Lock()
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not running.acquire(blocking=False):
+                return None
+            handle = None
+            try:
+                if lock_path:
+                    import fcntl
+                    handle = open(lock_path, "a")
+                    try:
+                        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    except BlockingIOError:
+                        return None
+                return fn(*args, **kwargs)
+            finally:
+                if handle is not None:
+                    handle.close()
+                running.release()
+
+        return wrapper
+
+    return decorator
@@ -1,16 +1,178 @@
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional
 
+from langchain_core.documents import Document
 
-def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 100):
-    splitter = RecursiveCharacterTextSplitter(
+from lib import tracing
+
+
+@lru_cache(maxsize=32)
+def _splitter(chunk_size: int, chunk_overlap: int):
+    # Splitters are stateless, build one per configuration.
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+    return RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
     )
-    return splitter.split_text(text)
+
+
+def chunk_text(text: str, chunk_size: int = 500, chunk_overlap: int = 100):
+    return _splitter(chunk_size, chunk_overlap).split_text(text)
 
 def chunk_documents(documents, chunk_size: int = 1000, chunk_overlap: int = 100):
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=chunk_size,
-        chunk_overlap=chunk_overlap
-    )
-    return text_splitter.split_documents(documents)
\ No newline at end of file
+    with tracing.span("chunk.documents") as span:
+        chunks = _splitter(chunk_size, chunk_overlap).split_documents(documents)
+        span.add("chunks", len(chunks))
+    return chunks
+
+def iter_chunks(documents, chunk_size: int = 1000, chunk_overlap: int = 100):
+    """
+    Chunk documents (e.g. pages) as they arrive, yielding chunks lazily.
+    Produces the same chunks as `chunk_documents`.
+    """
+    text_splitter = _splitter(chunk_size, chunk_overlap)
+    for document in documents:
+        with tracing.span("chunk.documents") as span:
+            chunks = text_splitter.split_documents([document])
+            span.add("chunks", len(chunks))
+        yield from chunks
+
+
+class ChunkSpan(NamedTuple):
+    """
+    A chunk as [start, end) offsets into its page text. `offset` is where
+    that page starts in the concatenated text of all pages seen so far.
+    """
+    start: int
+    end: int
+    page: Optional[int] = None
+    offset: int = 0
+
+    def text(self, source: str) -> str:
+        return source[self.start:self.end]
+
+
+class SpanChunker:
+    """
+    Recursive-separator chunker that returns offsets instead of strings.
+
+    Chunks end on the strongest separator ("\\n\\n", "\\n", " ") inside the
+    size limit and the next chunk starts `chunk_overlap` back, snapped to a
+    word boundary. No substrings are created unless asked for, so spans can
+    be used for dedup or citations by position.
+
+    By default sizes are in characters. Pass `length_function` (e.g. a
+    tokenizer's `len(encode(text))`) to size chunks in tokens instead;
+    `max_chars_per_token` bounds the initial window in that mode.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 100,
+        separators=("\n\n", "\n", " "),
+        length_function: Optional[Callable[[str], int]] = None,
+        max_chars_per_token: int = 6,
+    ):
+        if chunk_overlap >= chunk_size:
+            raise ValueError("chunk_overlap must be smaller than chunk_size")
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.separators = tuple(separators)
+        self.length_function = length_function
+        self.max_chars_per_token = max_chars_per_token
+
+    def _break(self, text: str, start: int, limit: int) -> int:
+        if limit >= len(text):
+            return len(text)
+        for separator in self.separators:
+            index = text.rfind(separator, start + 1, limit)
+            if index > start:
+                return index
+        return limit
+
+    def _end(self, text: str, start: int) -> int:
+        if self.length_function is None:
+            return self._break(text, start, start + self.chunk_size)
+        fits = lambda stop: self.length_function(text[start:stop]) <= self.chunk_size
+        end = self._break(text, start, start + self.chunk_size * self.max_chars_per_token)
+        if fits(end):
+            # Grow while the text is denser than the initial guess.
+            while end < len(text):
+                candidate = self._break(text, start, start + int((end - start) * 1.25) + 1)
+                if candidate <= end or not fits(candidate):
+                    break
+                end = candidate
+            return end
+        while end - start > 1 and not fits(end):
+            end = self._break(text, start, start + max(1, int((end - start) * 0.85)))
+        return end
+
+    def _overlap_chars(self, start: int, end: int) -> int:
+        if self.length_function is None:
+            return self.chunk_overlap
+        return (end - start) * self.chunk_overlap // self.chunk_size
+
+    def spans(self, text: str, page: Optional[int] = None, offset: int = 0) -> List[ChunkSpan]:
+        return list(self._iter_spans(text, page, offset))
+
+    def _iter_spans(self, text: str, page: Optional[int], offset: int) -> Iterator[ChunkSpan]:
+        length = len(text)
+        start = 0
+        while start < length and text[start].isspace():
+            start += 1
+        while start < length:
+            end = self._end(text, start)
+            stripped_end = end
+            while stripped_end > start and text[stripped_end - 1].isspace():
+                stripped_end -= 1
+            if stripped_end > start:
+                yield ChunkSpan(start, stripped_end, page, offset)
+            if end >= length:
+                return
+
+            # Step back by the overlap, then forward to the next word start.
+            next_start = end - self._overlap_chars(start, end)
+            if next_start > start:
+                space = text.find(" ", next_start, end)
+                if space != -1 and space + 1 < end:
+                    next_start = space + 1
+            else:
+                next_start = end
+            while next_start < length and text[next_start].isspace():
+                next_start += 1
+            start = max(next_start, start + 1)
+
+    def iter_spans(self, pages: Iterable) -> Iterator[ChunkSpan]:
+        """
+        Stream spans for pages (Documents or strings) as they arrive.
+        """
+        offset = 0
+        for number, page in enumerate(pages):
+            text = getattr(page, "page_content", page)
+            metadata = getattr(page, "metadata", {}) or {}
+            yield from self._iter_spans(text, metadata.get("page", number), offset)
+            offset += len(text)
+
+    def iter_documents(self, pages: Iterable) -> Iterator[Document]:
+        """
+        Stream chunks as Documents carrying page and offset metadata. The
+        chunk substring is only created here, when a Document is needed.
+        """
+        offset = 0
+        for number, page in enumerate(pages):
+            text = getattr(page, "page_content", page)
+            metadata = getattr(page, "metadata", {}) or {}
+            page_number = metadata.get("page", number)
+            for span in self._iter_spans(text, page_number, offset):
+                yield Document(
+                    page_content=span.text(text),
+                    metadata={
+                        **metadata,
+                        "page": page_number,
+                        "start": span.start,
+                        "end": span.end,
+                        "offset": span.offset + span.start,
+                    },
+                )
+            offset += len(text)
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from lib.answer_cache import SemanticAnswerCache
+
+
+class TestSemanticAnswerCache(unittest.TestCase):
+
+    def test_similar_question_with_same_chunks_hits(self):
+        cache = SemanticAnswerCache(threshold=0.95)
+        cache.put("What is RAG?", [1.0, 0.0, 0.0], ["c1", "c2"], "Retrieval augmented generation.")
+
+        self.assertEqual(cache.get([0.99, 0.05, 0.0], ["c2", "c1"]), "Retrieval augmented generation.")
+        # Not similar enough.
+        self.assertIsNone(cache.get([0.5, 0.5, 0.0], ["c1", "c2"]))
+        # Same question, different chunks retrieved.
+        self.assertIsNone(cache.get([1.0, 0.0, 0.0], ["c1", "c3"]))
+        self.assertEqual(cache.stats()["hits"], 1)
+        self.assertEqual(cache.stats()["misses"], 2)
+        self.assertAlmostEqual(cache.stats()["hit_ratio"], 1 / 3)
+
+    def test_batched_lookup_and_model_isolation(self):
+        cache = SemanticAnswerCache(model="a")
+        cache.put_many(["q1", "q2"], [[1.0, 0.0], [0.0, 1.0]], [["x"], ["y"]], ["one", "two"])
+        self.assertEqual(cache.get_many([[0.0, 1.0], [1.0, 0.0], [1.0, 0.0]], [["y"], ["x"], ["y"]]), ["two", "one", None])
+        self.assertIsNone(SemanticAnswerCache(model="b").get([1.0, 0.0], ["x"]))
+
+    def test_lru_eviction(self):
+        cache = SemanticAnswerCache(max_entries=2)
+        cache.put("q1", [1.0, 0.0, 0.0], ["c"], "one")
+        cache.put("q2", [0.0, 1.0, 0.0], ["c"], "two")
+        self.assertEqual(cache.get([1.0, 0.0, 0.0], ["c"]), "one")
+        cache.put("q3", [0.0, 0.0, 1.0], ["c"], "three")
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.get([1.0, 0.0, 0.0], ["c"]), "one")
+        self.assertIsNone(cache.get([0.0, 1.0, 0.0], ["c"]))
+        self.assertEqual(cache.get([0.0, 0.0, 1.0], ["c"]), "three")
+
+    def test_persists_across_instances(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "answers.db")
+            cache = SemanticAnswerCache(path, max_entries=2)
+            cache.put("q1", [1.0, 0.0], ["c"], "one")
+            cache.put("q2", [0.0, 1.0], ["c"], "two")
+            cache.put("q1", [1.0, 0.0], ["c"], "one, again")
+            cache.close()
+
+            reopened = SemanticAnswerCache(path, max_entries=2)
+            self.assertEqual(len(reopened), 2)
+            self.assertEqual(reopened.get([1.0, 0.0], ["c"]), "one, again")
+            reopened.put("q3", [0.7, 0.7], ["d"], "three")
+            reopened.close()
+
+            # q2 was least recently used and is gone from disk too.
+            reopened = SemanticAnswerCache(path, max_entries=10)
+            self.assertEqual(len(reopened), 2)
+            self.assertIsNone(reopened.get([0.0, 1.0], ["c"]))
+            reopened.close()
+
+    def test_lookup_is_vectorized(self):
+        rng = np.random.default_rng(3)
+        cache = SemanticAnswerCache(max_entries=20_000)
+        vectors = rng.normal(size=(20_000, 64)).astype(np.float32)
+        chunk_ids = [[f"c{i % 50}"] for i in range(len(vectors))]
+        cache.put_many([f"q{i}" for i in range(len(vectors))], vectors, chunk_ids, [f"a{i}" for i in range(len(vectors))])
+
+        started_at = time.perf_counter()
+        answers = cache.get_many(vectors[:5], chunk_ids[:5])
+        elapsed = time.perf_counter() - started_at
+
+        self.assertEqual(answers, [f"a{i}" for i in range(5)])
+        # Generous bound for slow CI machines; typically well under 10ms.
+        self.assertLess(elapsed, 0.5)
+
+
+if __name__ == "__main__":
+    unittest.main()
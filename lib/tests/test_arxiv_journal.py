@@ -0,0 +1,42 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from lib.arxiv_journal import ArxivClient
+
+
+def _result(short_id):
+    return SimpleNamespace(
+        title=f"Title {short_id}",
+        authors=[SimpleNamespace(name="Ada")],
+        summary="summary",
+        published=None,
+        pdf_url=f"https://arxiv.org/pdf/{short_id}",
+        get_short_id=lambda: short_id,
+    )
+
+
+class TestGetPapersByIds(unittest.TestCase):
+
+    def test_resolves_many_ids_with_one_query(self):
+        client = ArxivClient()
+        with patch.object(client.client, "results", return_value=iter(
+            [_result("2507.00002v2"), _result("2507.00001v1")]
+        )) as results:
+            papers = client.get_papers_by_ids(["2507.00001", "2507.00002", "2507.99999", "2507.00001"])
+
+        results.assert_called_once()
+        search = results.call_args.args[0]
+        self.assertEqual(search.id_list, ["2507.00001", "2507.00002", "2507.99999"])
+        self.assertEqual(list(papers), ["2507.00001", "2507.00002"])
+        self.assertEqual(papers["2507.00001"]["id"], "arxiv_2507.00001")
+        self.assertEqual(papers["2507.00002"]["pdf_url"], "https://arxiv.org/pdf/2507.00002v2")
+
+    def test_get_paper_by_id_returns_none_when_unknown(self):
+        client = ArxivClient()
+        with patch.object(client.client, "results", return_value=iter([])):
+            self.assertIsNone(client.get_paper_by_id("2507.99999"))
+
+
+if __name__ == "__main__":
+    unittest.main()
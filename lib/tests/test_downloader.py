@@ -0,0 +1,123 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.downloader import Downloader
+
+BODY = os.urandom(300 * 1024)
+GZIPPED = gzip.compress(b"%PDF " * 20000)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def _send_headers(self):
+        if self.path == "/missing.pdf":
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return False
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        if self.path == "/gzipped.pdf":
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(GZIPPED)))
+            self.end_headers()
+            return True
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        return True
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", self.path))
+        self._send_headers()
+
+    def do_GET(self):
+        self.server.requests.append(("GET", self.path))
+        if not self._send_headers():
+            return
+        if self.path == "/gzipped.pdf":
+            self.wfile.write(GZIPPED)
+            return
+        if self.path == "/truncated.pdf":
+            self.wfile.write(BODY[:1000])
+            self.close_connection = True
+            return
+        self.wfile.write(BODY)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestDownloader(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.downloader = Downloader(max_workers=4, timeout=(5, 5), max_retries=0)
+        self.addCleanup(self.downloader.close)
+
+    def test_downloads_many_concurrently_in_order(self):
+        items = [(f"{self.base}/paper_{i}.pdf", os.path.join(self.tmp.name, f"paper_{i}.pdf")) for i in range(6)]
+        results = self.downloader.download_many(items)
+
+        self.assertEqual([r.path for r in results], [path for _, path in items])
+        for result in results:
+            self.assertTrue(result.ok)
+            self.assertFalse(result.skipped)
+            with open(result.path, "rb") as f:
+                self.assertEqual(f.read(), BODY)
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), sorted(f"paper_{i}.pdf" for i in range(6)))
+
+    def test_skips_file_already_present_with_matching_size(self):
+        path = os.path.join(self.tmp.name, "paper.pdf")
+        self.downloader.download(f"{self.base}/paper.pdf", path)
+        self.server.requests.clear()
+
+        result = self.downloader.download(f"{self.base}/paper.pdf", path)
+        self.assertTrue(result.skipped)
+        self.assertEqual(self.server.requests, [("HEAD", "/paper.pdf")])
+
+    def test_content_encoding_does_not_fail_size_checks(self):
+        path = os.path.join(self.tmp.name, "gzipped.pdf")
+        result = self.downloader.download(f"{self.base}/gzipped.pdf", path)
+        self.assertTrue(result.ok)
+        with open(path, "rb") as f:
+            self.assertEqual(f.read(), b"%PDF " * 20000)
+
+        self.server.requests.clear()
+        self.assertTrue(self.downloader.download(f"{self.base}/gzipped.pdf", path).skipped)
+        self.assertEqual(self.server.requests, [("HEAD", "/gzipped.pdf")])
+
+    def test_redownloads_file_with_wrong_size(self):
+        path = os.path.join(self.tmp.name, "paper.pdf")
+        with open(path, "wb") as f:
+            f.write(b"partial")
+
+        result = self.downloader.download(f"{self.base}/paper.pdf", path)
+        self.assertFalse(result.skipped)
+        self.assertEqual(os.path.getsize(path), len(BODY))
+
+    def test_failures_are_isolated_and_leave_no_partial_files(self):
+        items = [
+            (f"{self.base}/missing.pdf", os.path.join(self.tmp.name, "missing.pdf")),
+            (f"{self.base}/truncated.pdf", os.path.join(self.tmp.name, "truncated.pdf")),
+            (f"{self.base}/good.pdf", os.path.join(self.tmp.name, "good.pdf")),
+        ]
+        results = self.downloader.download_many(items)
+
+        self.assertIn("404", results[0].error)
+        self.assertIsNotNone(results[1].error)
+        self.assertTrue(results[2].ok)
+        self.assertEqual(os.listdir(self.tmp.name), ["good.pdf"])
+
+
+if __name__ == "__main__":
+    unittest.main()
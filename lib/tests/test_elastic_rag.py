@@ -0,0 +1,251 @@
+import unittest
+from unittest.mock import patch, MagicMock
+
+from langchain_core.embeddings import Embeddings
+
+from lib.answer_cache import SemanticAnswerCache
+from lib.elastic_rag import ElasticRAG, content_id
+from lib.vector_store import NumpyVectorStore
+
+
+class FakeEmbeddings(Embeddings):
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class TopicEmbeddings(FakeEmbeddings):
+    """One dimension per topic word, so similar texts share a topic."""
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [float(text.count("alpha")), float(text.count("beta")), 0.1]
+
+
+class FakeCluster:
+    """Just enough of the Elasticsearch client for ingestion."""
+
+    def __init__(self):
+        self.docs = {}
+        self.indices = MagicMock()
+        self.indices.exists.side_effect = lambda index: bool(self.docs)
+
+    def mget(self, index, ids, source=True):
+        docs = []
+        for i in ids:
+            doc = {"_id": i, "found": i in self.docs}
+            if source and i in self.docs:
+                doc["_source"] = {key: value for key, value in self.docs[i].items() if not key.startswith("_")}
+            docs.append(doc)
+        return {"docs": docs}
+
+
+def fake_streaming_bulk(client, actions, chunk_size, **kwargs):
+    for action in actions:
+        client.docs[action["_id"]] = action
+        yield True, {"index": {"_id": action["_id"], "status": 201}}
+
+
+@patch("lib.elastic_rag.streaming_bulk", side_effect=fake_streaming_bulk)
+@patch("langchain_community.vectorstores.ElasticsearchStore")
+@patch("lib.elastic_rag.Elasticsearch")
+class TestElasticRAGIngest(unittest.TestCase):
+
+    def _rag(self, mock_es_class, batch_size=2):
+        self.cluster = FakeCluster()
+        mock_es_class.return_value = self.cluster
+        self.embeddings = FakeEmbeddings()
+        return ElasticRAG("user", "pass", self.embeddings, MagicMock(), chunk_size=50, chunk_overlap=0, batch_size=batch_size)
+
+    def test_ingest_uses_content_hash_ids_and_batches(self, mock_es_class, mock_store, mock_bulk):
+        rag = self._rag(mock_es_class)
+        report = rag.ingest_documents(["alpha", "beta", "gamma"])
+
+        self.assertEqual(report.indexed, 3)
+        self.assertEqual(report.batches, 2)
+        self.assertEqual(set(self.cluster.docs), {content_id(t) for t in ("alpha", "beta", "gamma")})
+        self.assertEqual(len(self.embeddings.calls), 2)
+        mock_store.assert_called_once()
+
+    def test_reingest_is_a_noop(self, mock_es_class, mock_store, mock_bulk):
+        rag = self._rag(mock_es_class)
+        rag.ingest_documents(["alpha", "beta"])
+        self.embeddings.calls.clear()
+
+        report = rag.ingest_documents(["beta", "alpha"])
+        self.assertEqual(report.skipped, 2)
+        self.assertEqual(report.indexed, 0)
+        self.assertEqual(self.embeddings.calls, [])
+
+    def test_batch_errors_are_reported(self, mock_es_class, mock_store, mock_bulk):
+        rag = self._rag(mock_es_class, batch_size=1)
+        self.embeddings.embed_documents = MagicMock(side_effect=[RuntimeError("rate limited"), [[1.0, 1.0]]])
+        report = rag.ingest_documents(["alpha", "beta"])
+
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.indexed, 1)
+        self.assertIn("rate limited", report.errors[0])
+
+
+@patch("langchain_community.vectorstores.ElasticsearchStore")
+@patch("lib.elastic_rag.Elasticsearch")
+class TestElasticRAGQueryMany(unittest.TestCase):
+
+    def test_query_many_batches_each_stage(self, mock_es_class, mock_store_class):
+        es = MagicMock()
+        es.indices.exists.return_value = True
+        es.msearch.return_value = {"responses": [
+            {"hits": {"hits": [{"_id": "1", "_score": 0.9, "_source": {"text": "chunk one", "metadata": {"page": 1}}}]}},
+            {"error": {"type": "search_phase_execution_exception"}},
+            {"hits": {"hits": [{"_id": "2", "_score": 0.8, "_source": {"text": "chunk two", "metadata": {}}}]}},
+        ]}
+        mock_es_class.return_value = es
+        store = mock_store_class.return_value
+        store.query_field, store.vector_query_field = "text", "vector"
+
+        embeddings = FakeEmbeddings()
+        rag = ElasticRAG("user", "pass", embeddings, MagicMock(), k=3, num_candidates=20)
+        rag.qa_chain = MagicMock()
+        rag.qa_chain.combine_documents_chain.output_key = "output_text"
+        rag.qa_chain.combine_documents_chain.invoke.side_effect = lambda inputs: {
+            "output_text": f"{inputs['question']} -> {inputs['input_documents'][0].page_content}"
+        }
+
+        batch = rag.query_many(["q1", "q2", "q3"])
+
+        self.assertEqual(embeddings.calls, [["q1", "q2", "q3"]])
+        es.msearch.assert_called_once()
+        searches = es.msearch.call_args.kwargs["searches"]
+        self.assertEqual(len(searches), 6)
+        self.assertEqual(searches[1]["knn"]["k"], 3)
+        self.assertEqual(searches[1]["knn"]["num_candidates"], 20)
+        self.assertEqual(searches[1]["_source"], {"excludes": ["vector"]})
+        self.assertEqual(batch.answers, ["q1 -> chunk one", None, "q3 -> chunk two"])
+        self.assertIsNotNone(batch.results[1].error)
+        self.assertEqual(batch.results[0].sources[0].metadata["page"], 1)
+        self.assertEqual(set(batch.timings), {"embed", "retrieve", "generate"})
+
+
+def _answer_with_first_source(rag):
+    chain = MagicMock()
+    chain.output_key = "output_text"
+    chain.invoke.side_effect = lambda inputs: {
+        "output_text": f"{inputs['question']} -> {inputs['input_documents'][0].page_content}"
+    }
+    rag._combine_chain = chain
+    return chain
+
+
+@patch("lib.elastic_rag.streaming_bulk", side_effect=fake_streaming_bulk)
+@patch("langchain_community.vectorstores.ElasticsearchStore")
+@patch("lib.elastic_rag.Elasticsearch")
+class TestElasticRAGVectorStore(unittest.TestCase):
+
+    def test_standalone_never_touches_elasticsearch(self, mock_es_class, mock_store_class, mock_bulk):
+        es = mock_es_class.return_value
+        rag = ElasticRAG(
+            "user", "pass", FakeEmbeddings(), MagicMock(), chunk_size=50, chunk_overlap=0, k=1,
+            vector_store=NumpyVectorStore(), vector_store_mode="standalone",
+        )
+        _answer_with_first_source(rag)
+        with self.assertRaises(ValueError):
+            rag.query("anything")
+
+        report = rag.ingest_documents(["a", "bbbb", "cccccccc"])
+        self.assertEqual(report.indexed, 3)
+        self.assertEqual(rag.ingest_documents(["a"]).skipped, 1)
+
+        self.assertEqual(rag.query("abcd"), "abcd -> bbbb")
+        batch = rag.query_many(["xyzxyzxy", "q"], metadata_filter=lambda metadata: True)
+        self.assertEqual(batch.answers, ["xyzxyzxy -> cccccccc", "q -> a"])
+        mock_bulk.assert_not_called()
+        mock_store_class.assert_not_called()
+        es.msearch.assert_not_called()
+        es.indices.refresh.assert_not_called()
+
+    def test_cache_serves_confident_local_hits_only(self, mock_es_class, mock_store_class, mock_bulk):
+        cluster = FakeCluster()
+        remote = {"hits": {"hits": [{"_id": "r", "_score": 0.5, "_source": {"text": "remote", "metadata": {}}}]}}
+        cluster.msearch = MagicMock(return_value={"responses": [remote, remote]})
+        mock_es_class.return_value = cluster
+        store = mock_store_class.return_value
+        store.query_field, store.vector_query_field = "text", "vector"
+        # Paper B was indexed by an earlier run.
+        ElasticRAG("user", "pass", TopicEmbeddings(), MagicMock(), chunk_size=50, chunk_overlap=0).ingest_documents(
+            ["beta beta paper"]
+        )
+
+        rag = ElasticRAG(
+            "user", "pass", TopicEmbeddings(), MagicMock(), chunk_size=50, chunk_overlap=0, k=1,
+            vector_store=NumpyVectorStore(),
+        )
+        chain = _answer_with_first_source(rag)
+        rag.qa_chain = MagicMock(combine_documents_chain=chain)
+
+        rag.ingest_documents(["alpha alpha paper"])
+        self.assertEqual(rag.ingest_documents(["beta beta paper"]).skipped, 1)
+        self.assertEqual(set(cluster.docs), {content_id("alpha alpha paper"), content_id("beta beta paper")})
+        self.assertEqual(len(rag.local_store), 2)
+
+        batch = rag.query_many(["what about beta?", "and alpha?"])
+        self.assertEqual(batch.answers, ["what about beta? -> beta beta paper", "and alpha? -> alpha alpha paper"])
+        cluster.msearch.assert_not_called()
+
+        # Nothing local is similar enough: Elasticsearch decides.
+        batch = rag.query_many(["gamma?", "alpha?"])
+        self.assertEqual(len(cluster.msearch.call_args.kwargs["searches"]), 2)
+        self.assertEqual(batch.answers, ["gamma? -> remote", "alpha? -> alpha alpha paper"])
+
+        batch = rag.query_many(["q1", "q2"], metadata_filter={"paper": ["2401.00001"], "page": 3})
+        searches = cluster.msearch.call_args.kwargs["searches"]
+        self.assertEqual(len(searches), 4)
+        self.assertEqual(searches[1]["knn"]["filter"], [
+            {"terms": {"metadata.paper.keyword": ["2401.00001"]}},
+            {"term": {"metadata.page": 3}},
+        ])
+        self.assertEqual(batch.answers[0], "q1 -> remote")
+
+        with self.assertRaises(ValueError):
+            rag.query_many(["q"], metadata_filter=lambda metadata: True)
+
+    def test_answer_cache_skips_generation_for_repeated_questions(self, mock_es_class, mock_store_class, mock_bulk):
+        rag = ElasticRAG(
+            "user", "pass", FakeEmbeddings(), MagicMock(), chunk_size=50, chunk_overlap=0, k=1,
+            vector_store=NumpyVectorStore(), vector_store_mode="standalone",
+            answer_cache=SemanticAnswerCache(threshold=0.999),
+        )
+        chain = _answer_with_first_source(rag)
+        rag.ingest_documents(["a", "bbbb"])
+
+        self.assertEqual(rag.query("abcd"), "abcd -> bbbb")
+        self.assertEqual(chain.invoke.call_count, 1)
+        # Same embedding and chunks: served from the cache.
+        batch = rag.query_many(["wxyz", "q"])
+        self.assertEqual(batch.answers, ["abcd -> bbbb", "q -> a"])
+        self.assertEqual(batch.results[0].sources[0].page_content, "bbbb")
+        self.assertEqual(chain.invoke.call_count, 2)
+        self.assertEqual(rag.query("z"), "q -> a")
+        self.assertEqual(rag.answer_cache.stats()["hits"], 2)
+
+        # New chunks change what is retrieved, and the cached answer no longer applies.
+        rag.local_store.clear()
+        rag.ingest_documents(["cccc"])
+        self.assertEqual(rag.query("abcd"), "abcd -> cccc")
+        self.assertEqual(chain.invoke.call_count, 3)
+
+    def test_standalone_needs_a_store(self, mock_es_class, mock_store_class, mock_bulk):
+        with self.assertRaises(ValueError):
+            ElasticRAG("user", "pass", FakeEmbeddings(), MagicMock(), vector_store_mode="standalone")
+
+
+if __name__ == "__main__":
+    unittest.main()
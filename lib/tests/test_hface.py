@@ -0,0 +1,77 @@
+import json
+import tempfile
+import threading
+import unittest
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from lib.hface import HuggingFaceClient
+
+FEED = {
+    "2025-07-21": [{"title": "A", "paper": {"id": "2507.00001"}}],
+    "2025-07-22": [{"title": "A", "paper": {"id": "2507.00001"}}, {"title": "B", "paper": {"id": "2507.00002"}}],
+    "2025-07-23": [{"title": "C", "paper": {"id": "2507.00003"}}],
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        day = parse_qs(urlparse(self.path).query)["date"][0]
+        self.server.requests.append((day, self.headers.get("If-None-Match")))
+        etag = f'"{day}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(FEED.get(day, [])).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Tue, 22 Jul 2025 00:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHuggingFaceClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _client(self):
+        client = HuggingFaceClient(api_token="token", cache_dir=self.tmp.name)
+        client.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api/daily_papers"
+        self.addCleanup(client.close)
+        return client
+
+    def test_fetches_the_requested_date(self):
+        papers = self._client().get_research_papers(date(2025, 7, 23))
+        self.assertEqual([p["title"] for p in papers], ["C"])
+        self.assertEqual(self.server.requests, [("2025-07-23", None)])
+
+    def test_repeated_run_revalidates_from_disk_cache(self):
+        first = self._client().get_research_papers("2025-07-22")
+        # A fresh client, as on the next scheduled run.
+        second = self._client().get_research_papers("2025-07-22")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.server.requests, [("2025-07-22", None), ("2025-07-22", '"2025-07-22"')])
+
+    def test_range_is_fetched_for_every_day_and_deduplicated(self):
+        papers = self._client().get_research_papers_range("2025-07-21", date(2025, 7, 23))
+        self.assertEqual([p["title"] for p in papers], ["A", "B", "C"])
+        self.assertEqual(sorted(day for day, _ in self.server.requests), ["2025-07-21", "2025-07-22", "2025-07-23"])
+
+
+if __name__ == "__main__":
+    unittest.main()
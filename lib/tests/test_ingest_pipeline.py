@@ -0,0 +1,48 @@
+import unittest
+from unittest.mock import patch
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from lib.ingest_pipeline import ingest_pdf
+
+
+class RecordingRAG:
+    def __init__(self, events, batch_size=2):
+        self.events = events
+        self.batch_size = batch_size
+        self.text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
+
+    def ingest_chunks(self, chunks):
+        batch = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                self.events.append(("indexed", len(batch)))
+                batch = []
+        if batch:
+            self.events.append(("indexed", len(batch)))
+        return "report"
+
+
+class TestIngestPdf(unittest.TestCase):
+
+    def test_first_batch_indexed_before_parsing_finishes(self):
+        events = []
+
+        def pages(file_path):
+            for n in range(3):
+                events.append(("page", n))
+                yield Document(page_content=f"page {n} " * 60, metadata={"page": n})
+
+        seen = []
+        with patch("lib.ingest_pipeline.iter_pdf_pages", side_effect=pages):
+            result = ingest_pdf("paper.pdf", RecordingRAG(events), on_chunk=seen.append)
+
+        self.assertEqual(result, "report")
+        self.assertEqual(len(seen), 3)
+        self.assertLess(events.index(("indexed", 2)), events.index(("page", 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
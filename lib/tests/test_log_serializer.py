@@ -0,0 +1,63 @@
+import logging
+import sys
+import unittest
+
+import orjson
+
+from lib.log_serializer import LogRecordSerializer
+
+
+def _record(msg="hello %s", args=("world",), exc_info=None, extra=None):
+    record = logging.LogRecord("app_logger", logging.INFO, "/app/main.py", 12, msg, args, exc_info, func="startup")
+    for key, value in (extra or {}).items():
+        setattr(record, key, value)
+    return record
+
+
+class TestLogRecordSerializer(unittest.TestCase):
+
+    def setUp(self):
+        self.serializer = LogRecordSerializer(hostname="test-host")
+
+    def test_fixed_schema(self):
+        document = orjson.loads(self.serializer.encode(_record()))
+        self.assertEqual(document["message"], "hello world")
+        self.assertEqual(document["host"], "test-host")
+        self.assertEqual(document["logger"], "app_logger")
+        self.assertEqual(document["level"], "INFO")
+        self.assertEqual(document["line"], 12)
+        self.assertEqual(document["func"], "startup")
+        self.assertTrue(document["@timestamp"].endswith("Z"))
+        for internal in ("args", "msg", "exc_info", "levelno", "pathname"):
+            self.assertNotIn(internal, document)
+
+    def test_timestamp_from_record(self):
+        record = _record()
+        record.created = 1746846912.123456
+        record.msecs = 123.456
+        self.assertEqual(self.serializer.timestamp(record), "2025-05-10T03:15:12.123Z")
+
+    def test_extra_fields_and_unserializable_values(self):
+        document = self.serializer.to_document(
+            _record(extra={"job_id": "abc", "payload": object(), "host": "spoofed"})
+        )
+        self.assertEqual(document["job_id"], "abc")
+        self.assertIsInstance(document["payload"], str)
+        self.assertEqual(document["host"], "test-host")
+
+    def test_exception_text(self):
+        try:
+            raise RuntimeError("boom")
+        except RuntimeError:
+            record = _record(exc_info=sys.exc_info())
+        document = self.serializer.to_document(record)
+        self.assertIn("RuntimeError: boom", document["exception"])
+
+    def test_header_cached_per_logger_and_level(self):
+        self.serializer.encode(_record())
+        self.serializer.encode(_record())
+        self.assertEqual(len(self.serializer._headers), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+import orjson
+
+from lib.log_shipper import BulkShipper, OVERFLOW_DROP_NEWEST, OVERFLOW_DROP_OLDEST
+
+
+def _doc(n):
+    return orjson.dumps({"message": f"log {n}"})
+
+
+class TestBulkShipper(unittest.TestCase):
+
+    def setUp(self):
+        self.es = MagicMock()
+        self.es.bulk.return_value = {"errors": False, "items": []}
+
+    def test_flush_ships_in_batches(self):
+        shipper = BulkShipper(self.es, lambda: "logs-test", max_batch_size=3, flush_interval=60)
+        for n in range(7):
+            shipper.submit(_doc(n))
+        self.assertTrue(shipper.flush(timeout=5))
+        shipper.close()
+
+        sizes = [len(call.kwargs["operations"]) // 2 for call in self.es.bulk.call_args_list]
+        self.assertEqual(sum(sizes), 7)
+        self.assertTrue(all(size <= 3 for size in sizes))
+        operations = self.es.bulk.call_args_list[0].kwargs["operations"]
+        self.assertEqual(orjson.loads(operations[0]), {"index": {"_index": "logs-test"}})
+        self.assertEqual(shipper.stats()["shipped"], 7)
+
+    def test_flush_on_interval(self):
+        shipped = threading.Event()
+        self.es.bulk.side_effect = lambda **kwargs: shipped.set() or {"errors": False}
+        shipper = BulkShipper(self.es, lambda: "logs-test", max_batch_size=100, flush_interval=0.05)
+        shipper.submit(_doc(1))
+        self.assertTrue(shipped.wait(2))
+        shipper.close()
+
+    def test_drop_newest_when_full(self):
+        gate = threading.Event()
+        self.es.bulk.side_effect = lambda **kwargs: gate.wait(5) and {"errors": False}
+        shipper = BulkShipper(
+            self.es, lambda: "logs-test", max_queue_size=2, max_batch_size=1,
+            flush_interval=0, overflow_policy=OVERFLOW_DROP_NEWEST,
+        )
+        results = [shipper.submit(_doc(n)) for n in range(10)]
+        gate.set()
+        shipper.close()
+        self.assertIn(False, results)
+        self.assertEqual(shipper.stats()["dropped"], results.count(False))
+
+    def test_drop_oldest_keeps_latest(self):
+        shipper = BulkShipper(
+            self.es, lambda: "logs-test", max_queue_size=2, max_batch_size=10,
+            flush_interval=60, overflow_policy=OVERFLOW_DROP_OLDEST,
+        )
+        for n in range(5):
+            self.assertTrue(shipper.submit(_doc(n)))
+        shipper.close()
+        shipped = [orjson.loads(op)["message"]
+                   for call in self.es.bulk.call_args_list
+                   for op in call.kwargs["operations"][1::2]]
+        self.assertEqual(shipped[-1], "log 4")
+        self.assertEqual(shipper.stats()["dropped"] + len(shipped), 5)
+
+    def test_counts_failed_items(self):
+        self.es.bulk.return_value = {
+            "errors": True,
+            "items": [{"index": {"status": 201}}, {"index": {"status": 400, "error": {}}}],
+        }
+        shipper = BulkShipper(self.es, lambda: "logs-test", flush_interval=60)
+        shipper.submit(_doc(1))
+        shipper.submit(_doc(2))
+        shipper.close()
+        self.assertEqual(shipper.stats()["shipped"], 1)
+        self.assertEqual(shipper.stats()["failed"], 1)
+
+    def test_rejects_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            BulkShipper(self.es, lambda: "logs-test", overflow_policy="spill")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+import orjson
+
+from lib.log_shipper import BulkShipper
+from lib.log_spool import CircuitBreaker, DiskSpool, OPEN, CLOSED
+
+
+def _operations(n, index="logs-2025.05.10"):
+    operations = []
+    for i in range(n):
+        operations.append(orjson.dumps({"index": {"_index": index}}))
+        operations.append(orjson.dumps({"@timestamp": f"2025-05-10T03:15:{i:02d}.000Z", "message": f"log {i}"}))
+    return operations
+
+
+class TestDiskSpool(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_append_and_read_segments(self):
+        spool = DiskSpool(self.tmp.name, segment_bytes=50)
+        spool.append(_operations(2))
+        spool.append(_operations(2))
+        segments = spool.segments()
+        self.assertEqual(len(segments), 2)
+        self.assertEqual(spool.read(segments[0]), _operations(2))
+
+    def test_existing_segments_are_picked_up(self):
+        DiskSpool(self.tmp.name).append(_operations(3))
+        spool = DiskSpool(self.tmp.name)
+        self.assertTrue(spool.has_pending)
+        self.assertEqual(len(spool.read(spool.segments()[0])), 6)
+
+    def test_disk_bound_drops_oldest_segment(self):
+        size = len(b"\n".join(_operations(1)) + b"\n")
+        spool = DiskSpool(self.tmp.name, max_bytes=size * 2, segment_bytes=1)
+        spool.append(_operations(1))
+        spool.append(_operations(1))
+        self.assertEqual(spool.append(_operations(1)), 1)
+        self.assertLessEqual(spool.pending_bytes, size * 2)
+        self.assertEqual(len(os.listdir(self.tmp.name)), 2)
+
+    def test_oversized_batch_does_not_evict_spooled_records(self):
+        spool = DiskSpool(self.tmp.name, max_bytes=1000)
+        spool.append(_operations(5))
+        pending = spool.pending_bytes
+
+        self.assertEqual(spool.append(_operations(30)), 30)
+        self.assertEqual(spool.pending_bytes, pending)
+        self.assertEqual(spool.read(spool.segments()[0]), _operations(5))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_opens_after_threshold_and_half_opens(self):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CLOSED)
+        breaker.record_failure()
+        self.assertEqual(breaker.state, OPEN)
+        self.assertTrue(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, CLOSED)
+
+
+class TestShipperSpooling(unittest.TestCase):
+
+    def test_spools_during_outage_and_replays(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        es = MagicMock()
+        es.bulk.side_effect = ConnectionError("cluster down")
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        shipper = BulkShipper(es, lambda: "logs-2025.05.10", flush_interval=60,
+                              spool=DiskSpool(tmp.name), breaker=breaker)
+
+        shipper.submit(orjson.dumps({"@timestamp": "2025-05-10T03:15:12.123Z", "message": "a"}))
+        shipper.flush(timeout=5)
+        shipper.submit(orjson.dumps({"@timestamp": "2025-05-10T03:15:13.000Z", "message": "b"}))
+        shipper.flush(timeout=5)
+        self.assertEqual(es.bulk.call_count, 1)
+        self.assertEqual(shipper.stats()["spooled"], 2)
+
+        es.bulk.side_effect = None
+        es.bulk.return_value = {"errors": False, "items": []}
+        breaker.reset_timeout = 0
+        shipper.submit(orjson.dumps({"@timestamp": "2025-05-10T03:15:14.000Z", "message": "c"}))
+        shipper.flush(timeout=5)
+        shipper.close()
+
+        self.assertEqual(shipper.stats()["replayed"], 2)
+        replayed = es.bulk.call_args_list[-1].kwargs["operations"]
+        self.assertEqual(orjson.loads(replayed[1])["@timestamp"], "2025-05-10T03:15:12.123Z")
+        self.assertFalse(shipper.spool.has_pending)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
+import logging
 import unittest
 from unittest.mock import patch, MagicMock
-from lib.logger import get_logger
+from lib.logger import get_logger, ElasticsearchHandler
+from lib.log_index import DailyIndex, LOG_MAPPINGS
 from datetime import datetime, UTC
 
 
@@ -27,6 +29,31 @@ class TestElasticLogger(unittest.TestCase):
         logger = get_logger()
         self.assertGreater(len(logger.handlers), 0)
 
+    def test_daily_index_rolls_over_at_utc_midnight(self):
+        daily_index = DailyIndex("logs-")
+        before_midnight = datetime(2025, 5, 10, 23, 59, 59, tzinfo=UTC).timestamp()
+        after_midnight = datetime(2025, 5, 11, 0, 0, 0, tzinfo=UTC).timestamp()
+        self.assertEqual(daily_index.resolve(before_midnight), "logs-2025.05.10")
+        self.assertEqual(daily_index.resolve(before_midnight - 3600), "logs-2025.05.10")
+        self.assertEqual(daily_index.resolve(after_midnight), "logs-2025.05.11")
+
+    @patch("lib.logger.Elasticsearch")
+    def test_index_template_created_once(self, mock_es_class):
+        mock_es = MagicMock()
+        mock_es_class.return_value = mock_es
+        handler = ElasticsearchHandler(["http://localhost:9200"], "logs-", manage_template=True)
+        logger = logging.getLogger("template_test_logger")
+        logger.addHandler(handler)
+        logger.warning("first")
+        logger.warning("second")
+        logger.removeHandler(handler)
+
+        mock_es.indices.put_index_template.assert_called_once()
+        kwargs = mock_es.indices.put_index_template.call_args.kwargs
+        self.assertEqual(kwargs["index_patterns"], ["logs-*"])
+        self.assertEqual(kwargs["template"]["mappings"], LOG_MAPPINGS)
+        self.assertEqual(mock_es.index.call_count, 2)
+
 if __name__ == "__main__":
     # unittest.main()
     logger = get_logger()
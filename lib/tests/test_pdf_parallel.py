@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest.mock import patch
+
+from pypdf import PdfReader
+
+from lib import pdf_parallel
+from lib.pdf_parallel import extract_pages, extract_documents
+
+SAMPLE_PDF = os.path.join(os.path.dirname(__file__), "..", "..", "local", "docs", "arxiv_2507.15846.pdf")
+
+
+class TestExtractPages(unittest.TestCase):
+
+    def test_parallel_matches_serial_order_and_text(self):
+        serial = [page.extract_text() or "" for page in PdfReader(SAMPLE_PDF).pages]
+        with tempfile.TemporaryDirectory() as tmp:
+            copy = os.path.join(tmp, "copy.pdf")
+            shutil.copy(SAMPLE_PDF, copy)
+            pages = extract_pages([copy, SAMPLE_PDF], max_workers=2, pages_per_task=5)
+
+        self.assertEqual([p.source for p in pages], [copy] * len(serial) + [SAMPLE_PDF] * len(serial))
+        self.assertEqual([p.page for p in pages], list(range(len(serial))) * 2)
+        self.assertEqual([p.text for p in pages[len(serial):]], serial)
+
+    def test_shared_executor_is_reused_and_left_open(self):
+        serial = [page.extract_text() or "" for page in PdfReader(SAMPLE_PDF).pages]
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            first = extract_pages([SAMPLE_PDF], pages_per_task=5, executor=executor)
+            second = extract_documents([SAMPLE_PDF], executor=executor)
+        self.assertEqual([p.text for p in first], serial)
+        self.assertEqual([d.page_content for d in second], serial)
+
+    def test_each_pdf_is_parsed_once_per_process(self):
+        pdf_parallel._open.cache_clear()
+        self.addCleanup(pdf_parallel._open.cache_clear)
+        with patch("lib.pdf_parallel.PdfReader", wraps=PdfReader) as reader:
+            pages = extract_pages([SAMPLE_PDF], max_workers=1, pages_per_task=2)
+        self.assertGreater(len(pages), 2)
+        self.assertEqual(reader.call_count, 1)
+
+    def test_malformed_pdf_does_not_fail_the_batch(self):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as f:
+            f.write(b"%PDF-1.4 this is not really a pdf")
+        self.addCleanup(os.remove, f.name)
+
+        pages = extract_pages([f.name, SAMPLE_PDF], max_workers=2)
+        self.assertEqual(pages[0].source, f.name)
+        self.assertIsNotNone(pages[0].error)
+        self.assertTrue(all(p.error is None for p in pages[1:]))
+
+        documents = extract_documents([f.name, SAMPLE_PDF], max_workers=1)
+        self.assertTrue(all(d.metadata["source"] == SAMPLE_PDF for d in documents))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from lib.pipeline_orchestrator import CheckpointStore, Orchestrator, PaperTask, Stage, exclusive
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, "checkpoints.db")
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def _stage(self, name, fn, workers=1):
+        def wrapped(task):
+            with self.lock:
+                self.calls.append((name, task.paper_id))
+            return fn(task)
+        return Stage(name, wrapped, workers)
+
+    def _stages(self, fail_on=None):
+        def parse(task):
+            if task.paper_id == fail_on:
+                raise RuntimeError("bad pdf")
+            return task.results["download"].upper()
+        return [
+            self._stage("download", lambda task: f"{task.paper_id}.pdf", workers=3),
+            self._stage("parse", parse, workers=2),
+            self._stage("query", lambda task: [task.results["parse"]]),
+        ]
+
+    def test_failure_is_isolated_to_one_paper(self):
+        store = CheckpointStore(self.path)
+        self.addCleanup(store.close)
+        report = Orchestrator(self._stages(fail_on="p2"), store, queue_size=1).run(
+            PaperTask(f"p{i}") for i in range(5)
+        )
+
+        self.assertEqual(sorted(report.completed), ["p0", "p1", "p3", "p4"])
+        self.assertEqual(report.failed, {"p2": ("parse", "RuntimeError: bad pdf")})
+        self.assertEqual(store.failures(), {"p2": ("parse", "RuntimeError: bad pdf")})
+        self.assertNotIn(("query", "p2"), self.calls)
+
+    def test_rerun_skips_completed_stages(self):
+        store = CheckpointStore(self.path)
+        Orchestrator(self._stages(fail_on="p1"), store).run([PaperTask("p0"), PaperTask("p1")])
+        store.close()
+
+        self.calls.clear()
+        store = CheckpointStore(self.path)
+        self.addCleanup(store.close)
+        report = Orchestrator(self._stages(), store).run([PaperTask("p0"), PaperTask("p1")])
+
+        self.assertEqual(sorted(report.completed), ["p0", "p1"])
+        # p0 finished last time; p1 only needs the stages from its failure on.
+        self.assertEqual(report.skipped, {"download": 2, "parse": 1, "query": 1})
+        self.assertEqual(sorted(self.calls), [("parse", "p1"), ("query", "p1")])
+
+    def test_invalid_checkpoint_reruns_the_stage(self):
+        store = CheckpointStore(self.path)
+        self.addCleanup(store.close)
+        store.mark_done("p0", "download", "gone.pdf")
+        store.mark_done("p1", "download", "kept.pdf")
+        stages = self._stages()
+        stages[0].still_valid = lambda path: path != "gone.pdf"
+
+        report = Orchestrator(stages, store).run([PaperTask("p0"), PaperTask("p1")])
+
+        self.assertEqual(report.skipped, {"download": 1})
+        self.assertIn(("download", "p0"), self.calls)
+        self.assertNotIn(("download", "p1"), self.calls)
+        self.assertEqual(store.get("p0", "download"), (True, "p0.pdf"))
+
+    def test_checkpoint_errors_fail_the_paper_not_the_worker(self):
+        class LockedStore(CheckpointStore):
+            def mark_done(self, paper_id, stage, result=None):
+                if paper_id == "p1":
+                    raise sqlite3.OperationalError("database is locked")
+                super().mark_done(paper_id, stage, result)
+
+        store = LockedStore(self.path)
+        self.addCleanup(store.close)
+        report = Orchestrator(self._stages(), store, queue_size=1).run(PaperTask(f"p{i}") for i in range(4))
+
+        self.assertEqual(sorted(report.completed), ["p0", "p2", "p3"])
+        self.assertEqual(report.failed, {"p1": ("download", "OperationalError: database is locked")})
+
+    def test_checkpointed_result_is_passed_to_next_stage(self):
+        store = CheckpointStore(self.path)
+        self.addCleanup(store.close)
+        store.mark_done("p0", "download", "cached.pdf")
+        task = PaperTask("p0")
+        Orchestrator(self._stages(), store).run([task])
+        self.assertEqual(task.results["query"], ["CACHED.PDF"])
+
+    def test_bounded_queues_apply_backpressure(self):
+        in_flight = []
+        gate = threading.Event()
+
+        def slow(task):
+            gate.wait(5)
+            return None
+
+        def fast(task):
+            in_flight.append(task.paper_id)
+            return None
+
+        orchestrator = Orchestrator([Stage("fast", fast), Stage("slow", slow)], queue_size=1)
+        thread = threading.Thread(target=orchestrator.run, args=([PaperTask(f"p{i}") for i in range(20)],))
+        thread.start()
+        time.sleep(0.3)
+        # One paper in the slow stage, one queued for it, one held by the fast worker.
+        self.assertLessEqual(len(in_flight), 3)
+        gate.set()
+        thread.join(5)
+        self.assertEqual(len(in_flight), 20)
+
+
+class TestExclusive(unittest.TestCase):
+
+    def test_overlapping_call_is_skipped(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        @exclusive()
+        def job():
+            started.set()
+            release.wait(5)
+            return "ran"
+
+        results = []
+        thread = threading.Thread(target=lambda: results.append(job()))
+        thread.start()
+        started.wait(5)
+        self.assertIsNone(job())
+        release.set()
+        thread.join(5)
+        self.assertEqual(results, ["ran"])
+        self.assertEqual(job(), "ran")
+
+    def test_lock_file_blocks_other_holders(self):
+        import fcntl
+        with tempfile.TemporaryDirectory() as tmp:
+            lock_path = os.path.join(tmp, "job.lock")
+
+            @exclusive(lock_path)
+            def job():
+                return "ran"
+
+            with open(lock_path, "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.assertIsNone(job())
+            self.assertEqual(job(), "ran")
+
+
+if __name__ == "__main__":
+    unittest.main()
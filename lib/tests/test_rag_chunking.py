@@ -0,0 +1,80 @@
+import unittest
+
+from langchain.schema import Document
+
+from lib.rag_chunking import chunk_documents, iter_chunks, SpanChunker
+
+
+def _pages():
+    text = " ".join(f"Sentence {i} about retrieval augmented generation." for i in range(200))
+    return [Document(page_content=text[i:i + 2500], metadata={"page": n}) for n, i in enumerate(range(0, len(text), 2500))]
+
+
+class TestIterChunks(unittest.TestCase):
+
+    def test_matches_chunk_documents(self):
+        expected = chunk_documents(_pages())
+        actual = list(iter_chunks(iter(_pages())))
+        self.assertEqual([c.page_content for c in actual], [c.page_content for c in expected])
+        self.assertEqual([c.metadata for c in actual], [c.metadata for c in expected])
+
+    def test_is_lazy(self):
+        consumed = []
+
+        def pages():
+            for page in _pages():
+                consumed.append(page.metadata["page"])
+                yield page
+
+        chunks = iter_chunks(pages())
+        next(chunks)
+        self.assertEqual(consumed, [0])
+
+
+class TestSpanChunker(unittest.TestCase):
+
+    def setUp(self):
+        self.text = "\n\n".join(
+            " ".join(f"word{p}_{w}" for w in range(120)) for p in range(6)
+        )
+
+    def test_spans_respect_size_and_cover_every_word(self):
+        chunker = SpanChunker(chunk_size=300, chunk_overlap=60)
+        spans = chunker.spans(self.text, page=3)
+        self.assertTrue(all(0 < span.end - span.start <= 300 for span in spans))
+        self.assertTrue(all(span.page == 3 for span in spans))
+        covered = " ".join(span.text(self.text) for span in spans).split()
+        self.assertEqual(set(covered), set(self.text.split()))
+        for span in spans:
+            chunk = span.text(self.text)
+            self.assertEqual(chunk, chunk.strip())
+            self.assertFalse(chunk.startswith("_"))
+
+    def test_consecutive_spans_overlap(self):
+        spans = SpanChunker(chunk_size=300, chunk_overlap=60).spans(self.text)
+        overlapping = [a for a, b in zip(spans, spans[1:]) if b.start < a.end]
+        self.assertGreater(len(overlapping), 0)
+        self.assertTrue(all(b.start > a.start for a, b in zip(spans, spans[1:])))
+
+    def test_prefers_paragraph_breaks(self):
+        text = "a" * 50 + "\n\n" + "b b b " * 20
+        spans = SpanChunker(chunk_size=80, chunk_overlap=10).spans(text)
+        self.assertEqual(spans[0].text(text), "a" * 50)
+
+    def test_token_sizing_mode(self):
+        count_words = lambda chunk: len(chunk.split())
+        spans = SpanChunker(chunk_size=50, chunk_overlap=5, length_function=count_words).spans(self.text)
+        self.assertTrue(all(count_words(span.text(self.text)) <= 50 for span in spans))
+        self.assertTrue(any(count_words(span.text(self.text)) > 40 for span in spans))
+
+    def test_streaming_documents_carry_page_and_offsets(self):
+        pages = [Document(page_content=self.text, metadata={"page": n, "source": "paper.pdf"}) for n in range(2)]
+        documents = list(SpanChunker(chunk_size=300, chunk_overlap=60).iter_documents(iter(pages)))
+        last = documents[-1]
+        self.assertEqual(last.metadata["page"], 1)
+        self.assertEqual(last.metadata["source"], "paper.pdf")
+        self.assertEqual(last.page_content, self.text[last.metadata["start"]:last.metadata["end"]])
+        self.assertEqual(last.metadata["offset"], len(self.text) + last.metadata["start"])
+
+if __name__ == "__main__":
+    unittest.main()
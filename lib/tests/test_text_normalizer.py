@@ -0,0 +1,35 @@
+import json
+import os
+import unittest
+
+from lib.arxiv_journal import ArxivClient
+from lib.text_normalizer import normalize_text, normalize_texts
+
+GOLDEN = os.path.join(os.path.dirname(__file__), "fixtures", "clean_text_golden.json")
+
+
+class TestTextNormalizer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        # Expected values were produced by the original ArxivClient.clean_text.
+        with open(GOLDEN, encoding="utf-8") as f:
+            cls.fixtures = json.load(f)
+
+    def test_matches_golden_fixtures(self):
+        for fixture in self.fixtures:
+            with self.subTest(text=fixture["input"][:40]):
+                self.assertEqual(normalize_text(fixture["input"]), fixture["expected"])
+
+    def test_bulk_api(self):
+        inputs = [fixture["input"] for fixture in self.fixtures]
+        expected = [fixture["expected"] for fixture in self.fixtures]
+        self.assertEqual(list(normalize_texts(iter(inputs))), expected)
+
+    def test_clean_text_works_on_class_and_instance(self):
+        self.assertEqual(ArxivClient.clean_text("ﬁne\n  text©"), "fine text")
+        self.assertEqual(ArxivClient().clean_text("ﬁne\n  text©"), "fine text")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import logging
+import unittest
+from unittest.mock import patch
+
+import httpx
+
+from lib import tracing
+from core.http_retry import send_with_retry
+
+
+class TracingTestCase(unittest.TestCase):
+
+    def setUp(self):
+        tracing.reset()
+        tracing.enable()
+        self.addCleanup(tracing.reset)
+        self.addCleanup(tracing.disable)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_quantiles_are_within_bucket_error(self):
+        histogram = tracing.Histogram()
+        for value in range(1, 1001):
+            histogram.record(value)
+        stats = histogram.to_dict()
+        self.assertEqual((stats["count"], stats["min"], stats["max"]), (1000, 1, 1000))
+        self.assertAlmostEqual(stats["mean"], 500.5)
+        self.assertLess(abs(stats["p50"] - 500) / 500, 0.2)
+        self.assertLess(abs(stats["p95"] - 950) / 950, 0.2)
+        self.assertEqual(histogram.quantile(1.0), 1000)
+
+    def test_zero_values(self):
+        histogram = tracing.Histogram()
+        histogram.record(0)
+        histogram.record(0)
+        self.assertEqual(histogram.quantile(0.5), 0)
+
+
+class TestSpans(TracingTestCase):
+
+    def test_span_records_duration_and_metrics(self):
+        with tracing.span("llm.generate") as span:
+            span.add("completion_tokens", 12)
+            tracing.add("retries")
+        with tracing.span("llm.generate") as span:
+            span.add("completion_tokens", 30)
+
+        summary = tracing.summary()["llm.generate"]
+        self.assertEqual(summary["duration_ms"]["count"], 2)
+        self.assertEqual(summary["completion_tokens"]["sum"], 42)
+        self.assertEqual(summary["retries"]["count"], 1)
+
+    def test_errors_are_counted_and_raised(self):
+        with self.assertRaises(ValueError):
+            with tracing.span("rag.query"):
+                raise ValueError("boom")
+        self.assertEqual(tracing.summary()["rag.query"]["errors"]["sum"], 1)
+
+    def test_retries_reach_the_open_span(self):
+        responses = iter([httpx.Response(503), httpx.Response(200, json={})])
+        client = httpx.Client(transport=httpx.MockTransport(lambda request: next(responses)))
+        with patch("core.http_retry.time.sleep"), tracing.span("embeddings.batch"):
+            send_with_retry(client, "POST", "http://stub/v1/embeddings")
+        self.assertEqual(tracing.summary()["embeddings.batch"]["retries"]["sum"], 1)
+
+    def test_disabled_records_nothing(self):
+        tracing.disable()
+        with tracing.span("pdf.load") as span:
+            span.add("pages", 3)
+        tracing.observe("pdf.page", chars=10)
+        tracing.add("retries")
+        self.assertIs(tracing.span("pdf.load"), tracing.span("other"))
+        self.assertEqual(tracing.summary(), {})
+
+
+class TestShip(TracingTestCase):
+
+    def test_summary_is_shipped_as_one_record(self):
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        logger = logging.Logger("tracing-test")
+        logger.addHandler(handler)
+
+        for pages in (3, 5):
+            tracing.observe("pdf.load", duration_ms=1.5, pages=pages)
+        tracing.ship(logger, job_id="run-1")
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0].job_id, "run-1")
+        self.assertEqual(records[0].metrics["pdf.load"]["pages"]["sum"], 8)
+        self.assertIn("pdf.load", tracing.format_summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from lib.vector_store import NumpyVectorStore
+
+
+def _unit(rows):
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+class TestNumpyVectorStore(unittest.TestCase):
+
+    def setUp(self):
+        self.rng = np.random.default_rng(7)
+        self.vectors = self.rng.normal(size=(200, 16)).astype(np.float32)
+        self.ids = [f"doc-{i}" for i in range(len(self.vectors))]
+        self.texts = [f"text {i}" for i in range(len(self.vectors))]
+        self.metadatas = [{"paper": f"p{i % 4}", "page": i % 10} for i in range(len(self.vectors))]
+
+    def _filled(self, **kwargs):
+        store = NumpyVectorStore(**kwargs)
+        self.assertEqual(store.add(self.ids, self.texts, self.vectors, self.metadatas), len(self.ids))
+        return store
+
+    def test_search_matches_brute_force(self):
+        store = self._filled()
+        queries = self.rng.normal(size=(5, 16))
+        expected = _unit(queries) @ _unit(self.vectors).T
+
+        results = store.search(queries, k=7)
+
+        self.assertEqual(len(results), 5)
+        for hits, scores in zip(results, expected):
+            best = np.argsort(-scores)[:7]
+            self.assertEqual([hit.id for hit in hits], [self.ids[i] for i in best])
+            np.testing.assert_allclose([hit.score for hit in hits], scores[best], rtol=1e-5)
+            self.assertEqual(hits[0].text, self.texts[best[0]])
+
+    def test_metadata_filters(self):
+        store = self._filled()
+        query = self.vectors[3]
+
+        hits = store.search(query, k=10, metadata_filter={"paper": "p1", "page": [1, 5]})[0]
+        self.assertTrue(hits)
+        self.assertTrue(all(h.metadata["paper"] == "p1" and h.metadata["page"] in (1, 5) for h in hits))
+
+        hits = store.search(query, k=3, metadata_filter=lambda m: m["page"] == 3)[0]
+        self.assertEqual(len(hits), 3)
+        self.assertTrue(all(h.metadata["page"] == 3 for h in hits))
+
+        self.assertEqual(store.search(query, k=3, metadata_filter={"paper": "missing"}), [[]])
+
+    def test_upsert_and_remove_keep_rows_contiguous(self):
+        store = self._filled()
+        self.assertEqual(store.add(["doc-0"], ["new text"], [self.vectors[1]], [{"paper": "p9"}]), 0)
+        self.assertEqual(len(store), 200)
+        self.assertEqual(store.search(self.vectors[1], k=1, metadata_filter={"paper": "p9"})[0][0].text, "new text")
+
+        self.assertEqual(store.remove(["doc-5", "doc-6", "unknown"]), 2)
+        self.assertEqual(len(store), 198)
+        self.assertEqual(store.contains(["doc-5", "doc-199"]), {"doc-199"})
+        # doc-199 took one of the freed rows and is still found by its own vector.
+        self.assertEqual(store.search(self.vectors[199], k=1)[0][0].id, "doc-199")
+
+    def test_in_memory_store_grows(self):
+        store = NumpyVectorStore()
+        vectors = self.rng.normal(size=(1100, 8)).astype(np.float32)
+        ids = [f"row-{i}" for i in range(len(vectors))]
+        store.add(ids[:1000], ids[:1000], vectors[:1000])
+        store.add(ids[1000:], ids[1000:], vectors[1000:])
+
+        self.assertEqual(len(store), 1100)
+        self.assertEqual(store.search(vectors[3], k=1)[0][0].id, "row-3")
+        self.assertEqual(store.search(vectors[1099], k=1)[0][0].id, "row-1099")
+
+    def test_max_entries_evicts_oldest(self):
+        store = NumpyVectorStore(max_entries=3)
+        for i in range(5):
+            store.add([self.ids[i]], [self.texts[i]], [self.vectors[i]])
+        self.assertEqual(store.contains(self.ids[:5]), set(self.ids[2:5]))
+
+    def test_dimension_mismatch(self):
+        store = self._filled()
+        with self.assertRaises(ValueError):
+            store.add(["x"], ["x"], [[1.0, 2.0]])
+
+    def test_memmap_survives_reopen(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = self._filled(path=tmp)
+            store.remove(["doc-0"])
+            store.close()
+            self.assertTrue(os.path.exists(os.path.join(tmp, "vectors.f32")))
+
+            reopened = NumpyVectorStore(path=tmp)
+            self.assertEqual(len(reopened), 199)
+            self.assertEqual(reopened.dims, 16)
+            hit = reopened.search(self.vectors[42], k=1)[0][0]
+            self.assertEqual((hit.id, hit.text, hit.metadata), ("doc-42", "text 42", self.metadatas[42]))
+            reopened.add(["extra"], ["extra"], [self.vectors[0]])
+            self.assertEqual(reopened.search(self.vectors[0], k=1)[0][0].id, "extra")
+            reopened.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
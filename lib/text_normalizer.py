@@ -0,0 +1,36 @@
+import re
+import unicodedata
+from typing import Iterable, Iterator
+
+# Everything clean_text drops after NFKD: non-printable characters and
+# anything that is not a word character, a space or common punctuation.
+# Word characters are always printable and ' ' is the only printable
+# whitespace, so a single character class covers both steps.
+_DROP = re.compile(r"[^\w .,;:?!'\"-]+")
+# The same set restricted to ASCII, for the bytes.translate fast path.
+_ASCII_DROP = bytes(c for c in range(128) if _DROP.match(chr(c)))
+
+
+def normalize_text(text: str) -> str:
+    """
+    NFKD-normalize, drop non-printable and special characters and collapse
+    whitespace to single spaces. Same output as the previous
+    ArxivClient.clean_text, with one precompiled deletion pass instead of a
+    per-character generator and two regex substitutions.
+    """
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+    if text.isascii():
+        text = text.encode("ascii").translate(None, _ASCII_DROP).decode("ascii")
+    else:
+        text = _DROP.sub("", text)
+    # Only ' ' survives as whitespace, so split/join collapses and strips it.
+    return " ".join(text.split())
+
+
+def normalize_texts(texts: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize a list or stream of texts (e.g. pages) lazily.
+    """
+    for text in texts:
+        yield normalize_text(text)
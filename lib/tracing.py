@@ -0,0 +1,218 @@
+"""
+Lightweight in-process spans and histograms.
+
+Tracing is off by default. While disabled `span()` returns a shared no-op
+object and `observe()`/`add()` return after one flag check, so
+instrumented code pays next to nothing. Once enabled, every span records
+its duration in milliseconds plus any metrics added to it (bytes, tokens,
+retries, ...) into a histogram per (span name, metric):
+
+    tracing.enable()
+    with tracing.span("llm.generate") as s:
+        body = call()
+        s.add("completion_tokens", body["usage"]["completion_tokens"])
+    tracing.summary()   # {"llm.generate": {"duration_ms": {...}, ...}}
+
+`add()` without a span object adds to the innermost span of the current
+thread or task, which is how the HTTP retry helpers report retries.
+"""
+import math
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+# Histogram buckets grow by 2**(1/4), i.e. ~19% relative error on quantiles.
+_BUCKETS_PER_DOUBLING = 4
+
+_enabled = False
+_current: ContextVar = ContextVar("tracing_span", default=None)
+
+
+class Histogram:
+    __slots__ = ("count", "total", "min", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.buckets: Dict[int, int] = {}
+
+    def record(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        bucket = math.ceil(math.log2(value) * _BUCKETS_PER_DOUBLING) if value > 0 else -10 ** 6
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                upper = 2 ** (bucket / _BUCKETS_PER_DOUBLING) if bucket > -10 ** 6 else 0.0
+                return min(max(upper, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "min": self.min,
+            "max": self.max,
+            "mean": self.total / self.count,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[str, Histogram]] = {}
+
+    def record(self, name: str, metrics: dict):
+        with self._lock:
+            histograms = self._histograms.setdefault(name, {})
+            for metric, value in metrics.items():
+                histogram = histograms.get(metric)
+                if histogram is None:
+                    histogram = histograms[metric] = Histogram()
+                histogram.record(value)
+
+    def summary(self) -> dict:
+        with self._lock:
+            return {
+                name: {metric: histogram.to_dict() for metric, histogram in histograms.items()}
+                for name, histograms in sorted(self._histograms.items())
+            }
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+
+
+registry = Registry()
+
+
+class Span:
+    __slots__ = ("name", "metrics", "_started_at", "_token")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.metrics = {}
+
+    def add(self, metric: str, value: float = 1):
+        self.metrics[metric] = self.metrics.get(metric, 0) + value
+        return self
+
+    def __enter__(self):
+        self._token = _current.set(self)
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics["duration_ms"] = (time.perf_counter() - self._started_at) * 1000
+        if exc_type is not None:
+            self.metrics["errors"] = self.metrics.get("errors", 0) + 1
+        _current.reset(self._token)
+        registry.record(self.name, self.metrics)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def add(self, metric: str, value: float = 1):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def span(name: str):
+    if not _enabled:
+        return _NOOP
+    return Span(name)
+
+
+def add(metric: str, value: float = 1):
+    """
+    Add to a metric of the innermost open span, if any.
+    """
+    if not _enabled:
+        return
+    current = _current.get()
+    if current is not None:
+        current.add(metric, value)
+
+
+def observe(name: str, **metrics):
+    """
+    Record one event with already measured metrics, without opening a span.
+    """
+    if _enabled:
+        registry.record(name, metrics)
+
+
+def summary() -> dict:
+    return registry.summary()
+
+
+def reset():
+    registry.reset()
+
+
+def format_summary(data: Optional[dict] = None) -> str:
+    """
+    Human readable table of a summary: one line per span and metric.
+    """
+    data = summary() if data is None else data
+    lines = [f"{'span':28} {'metric':20} {'count':>7} {'sum':>12} {'p50':>10} {'p95':>10} {'max':>10}"]
+    for name, metrics in data.items():
+        for metric, stats in metrics.items():
+            if not stats.get("count"):
+                continue
+            lines.append(
+                f"{name:28} {metric:20} {stats['count']:7d} {stats['sum']:12.1f} "
+                f"{stats['p50']:10.1f} {stats['p95']:10.1f} {stats['max']:10.1f}"
+            )
+    return "\n".join(lines)
+
+
+def ship(logger, message: str = "Run metrics", **extra):
+    """
+    Log the summary as a single record, so it reaches Elasticsearch as one
+    metrics document instead of a line per event.
+    """
+    logger.info(message, extra={**extra, "metrics": summary()})
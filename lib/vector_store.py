@@ -0,0 +1,261 @@
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Union
+
+import numpy as np
+import orjson
+
+MetadataFilter = Union[Dict[str, Any], Callable[[dict], bool]]
+
+
+class SearchHit(NamedTuple):
+    id: str
+    score: float
+    text: str
+    metadata: dict
+
+
+class NumpyVectorStore:
+    """
+    In-process vector store: unit-normalized float32 embeddings in one
+    contiguous matrix, searched by cosine similarity with a single matrix
+    product per batch of queries.
+
+    With `path` the matrix is a memory-mapped file (`vectors.f32`) and ids,
+    texts and metadata live in SQLite next to it, so the store survives
+    restarts. Rows stay contiguous: removing one moves the last row into
+    its place. With `max_entries` the oldest entries are evicted first.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_entries: Optional[int] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.dims: Optional[int] = None
+        self._lock = threading.RLock()
+        self._vectors: Optional[np.ndarray] = None
+        self._capacity = 0
+        self._ids: List[str] = []
+        self._texts: List[str] = []
+        self._metadatas: List[dict] = []
+        self._rows: Dict[str, int] = {}
+        # Insertion order, oldest first, for eviction.
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+        self._db = None
+        if path:
+            os.makedirs(path, exist_ok=True)
+            self._vectors_path = os.path.join(path, "vectors.f32")
+            self._db = sqlite3.connect(os.path.join(path, "documents.db"), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS documents (seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "id TEXT UNIQUE NOT NULL, row INTEGER NOT NULL, text TEXT NOT NULL, metadata BLOB NOT NULL)"
+            )
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER)")
+            self._db.commit()
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _load(self):
+        row = self._db.execute("SELECT value FROM meta WHERE name = 'dims'").fetchone()
+        if row is None:
+            return
+        self.dims = row[0]
+        self._open_vectors()
+        documents = self._db.execute("SELECT id, row, text, metadata FROM documents ORDER BY row").fetchall()
+        for doc_id, row, text, metadata in documents:
+            self._rows[doc_id] = row
+            self._ids.append(doc_id)
+            self._texts.append(text)
+            self._metadatas.append(orjson.loads(metadata))
+        for (doc_id,) in self._db.execute("SELECT id FROM documents ORDER BY seq"):
+            self._order[doc_id] = None
+
+    def _open_vectors(self):
+        self._capacity = os.path.getsize(self._vectors_path) // (self.dims * 4) if os.path.exists(self._vectors_path) else 0
+        self._vectors = None
+        if self._capacity:
+            self._vectors = np.memmap(
+                self._vectors_path, dtype=np.float32, mode="r+", shape=(self._capacity, self.dims)
+            )
+
+    def _ensure_capacity(self, rows: int):
+        if rows <= self._capacity:
+            return
+        new_capacity = max(rows, self._capacity * 2, 1024)
+        if self._db is None:
+            grown = np.zeros((new_capacity, self.dims), dtype=np.float32)
+            if self._vectors is not None:
+                # Called after the new ids are recorded: copy every old row.
+                grown[:self._capacity] = self._vectors
+            self._vectors = grown
+            self._capacity = new_capacity
+            return
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(new_capacity * self.dims * 4)
+        self._open_vectors()
+
+    @staticmethod
+    def _normalize(vectors) -> np.ndarray:
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def contains(self, ids: Iterable[str]) -> set:
+        with self._lock:
+            return {doc_id for doc_id in ids if doc_id in self._rows}
+
+    def add(self, ids: List[str], texts: List[str], vectors, metadatas: Optional[List[dict]] = None) -> int:
+        """
+        Insert or replace entries. Returns the number of new entries.
+        """
+        if not ids:
+            return 0
+        vectors = self._normalize(vectors)
+        metadatas = metadatas or [{} for _ in ids]
+        with self._lock:
+            if self.dims is None:
+                self.dims = int(vectors.shape[1])
+                if self._db is not None:
+                    self._db.execute("INSERT OR REPLACE INTO meta VALUES ('dims', ?)", (self.dims,))
+            elif vectors.shape[1] != self.dims:
+                raise ValueError(f"Vector dimension {vectors.shape[1]} does not match store dimension {self.dims}")
+
+            added = 0
+            rows = []
+            for doc_id, text, metadata in zip(ids, texts, metadatas):
+                row = self._rows.get(doc_id)
+                if row is None:
+                    row = len(self._ids)
+                    self._rows[doc_id] = row
+                    self._ids.append(doc_id)
+                    self._texts.append(text)
+                    self._metadatas.append(dict(metadata))
+                    added += 1
+                else:
+                    self._texts[row] = text
+                    self._metadatas[row] = dict(metadata)
+                self._order[doc_id] = None
+                self._order.move_to_end(doc_id)
+                rows.append(row)
+            self._ensure_capacity(len(self._ids))
+            self._vectors[rows] = vectors
+
+            if self._db is not None:
+                self._db.executemany(
+                    "INSERT INTO documents (id, row, text, metadata) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET row = excluded.row, text = excluded.text, "
+                    "metadata = excluded.metadata",
+                    [
+                        (doc_id, self._rows[doc_id], text, orjson.dumps(metadata, default=str))
+                        for doc_id, text, metadata in zip(ids, texts, metadatas)
+                    ],
+                )
+            if self.max_entries is not None and len(self._ids) > self.max_entries:
+                self._remove(list(self._order)[:len(self._ids) - self.max_entries])
+            self._commit()
+        return added
+
+    def remove(self, ids: Iterable[str]) -> int:
+        with self._lock:
+            removed = self._remove(list(ids))
+            self._commit()
+        return removed
+
+    def _remove(self, ids: List[str]) -> int:
+        removed = 0
+        for doc_id in ids:
+            row = self._rows.pop(doc_id, None)
+            if row is None:
+                continue
+            self._order.pop(doc_id, None)
+            last = len(self._ids) - 1
+            if row != last:
+                # Keep rows contiguous: the last entry takes the free row.
+                moved = self._ids[last]
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved
+                self._texts[row] = self._texts[last]
+                self._metadatas[row] = self._metadatas[last]
+                self._rows[moved] = row
+                if self._db is not None:
+                    self._db.execute("UPDATE documents SET row = ? WHERE id = ?", (row, moved))
+            self._ids.pop()
+            self._texts.pop()
+            self._metadatas.pop()
+            if self._db is not None:
+                self._db.execute("DELETE FROM documents WHERE id = ?", (doc_id,))
+            removed += 1
+        return removed
+
+    def _commit(self):
+        if self._db is not None:
+            if self._vectors is not None:
+                self._vectors.flush()
+            self._db.commit()
+
+    def _mask(self, metadata_filter: Optional[MetadataFilter]) -> Optional[np.ndarray]:
+        if metadata_filter is None:
+            return None
+        if callable(metadata_filter):
+            return np.fromiter((bool(metadata_filter(m)) for m in self._metadatas), dtype=bool, count=len(self))
+        mask = np.ones(len(self), dtype=bool)
+        for key, expected in metadata_filter.items():
+            if isinstance(expected, (list, tuple, set, frozenset)):
+                allowed = set(expected)
+                values = (m.get(key) in allowed for m in self._metadatas)
+            else:
+                values = (m.get(key) == expected for m in self._metadatas)
+            mask &= np.fromiter(values, dtype=bool, count=len(self))
+        return mask
+
+    def search(self, query_vectors, k: int = 4, metadata_filter: Optional[MetadataFilter] = None) -> List[List[SearchHit]]:
+        """
+        Top-`k` entries by cosine similarity for each query vector.
+        `metadata_filter` is a {key: value or [values]} dict or a predicate
+        over an entry's metadata.
+        """
+        queries = self._normalize(query_vectors)
+        with self._lock:
+            size = len(self)
+            if not size or k <= 0:
+                return [[] for _ in range(len(queries))]
+            scores = queries @ self._vectors[:size].T
+            mask = self._mask(metadata_filter)
+            if mask is not None:
+                scores[:, ~mask] = -np.inf
+                k = min(k, int(mask.sum()))
+            k = min(k, size)
+            if k == 0:
+                return [[] for _ in range(len(queries))]
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1)
+            top = np.take_along_axis(top, order, axis=1)
+            top_scores = np.take_along_axis(top_scores, order, axis=1)
+            return [
+                [
+                    SearchHit(self._ids[row], float(score), self._texts[row], self._metadatas[row])
+                    for row, score in zip(rows, row_scores)
+                ]
+                for rows, row_scores in zip(top.tolist(), top_scores.tolist())
+            ]
+
+    def clear(self):
+        with self._lock:
+            self._remove(list(self._ids))
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._commit()
+                self._db.close()
+                self._db = None
+            self._vectors = None